@@ -0,0 +1,13 @@
+from fastapi import Depends, Request
+from src.database.registry import ClientRegistry, client_registry
+
+
+def get_client_registry(request: Request) -> ClientRegistry:
+    """Registro de clientes compartido, inicializado en el `lifespan` de la aplicación."""
+    return getattr(request.app.state, "clients", client_registry)
+
+
+def get_mongo_collection(registry: ClientRegistry = Depends(get_client_registry)):
+    """Colección de propiedades en MongoDB (cliente asíncrono)."""
+    return registry.async_mongo_collection()
+
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends
+from src.api.dependencies import get_client_registry, get_mongo_collection
+from src.database.indexes import index_usage
+from src.database.registry import ClientRegistry
+
+
+def create_admin_router() -> APIRouter:
+    """Router para endpoints de administración y diagnóstico"""
+    router = APIRouter(prefix="/admin", tags=["Admin"])
+
+    @router.get("/clients")
+    async def get_clients_stats(registry: ClientRegistry = Depends(get_client_registry)):
+        """
+        Estado de los pools de conexión de los clientes compartidos (MongoDB,
+        PostgreSQL, ChromaDB) y del caché de embeddings.
+        """
+        return registry.stats()
+
+    @router.get("/indexes")
+    async def get_index_stats(collection=Depends(get_mongo_collection)):
+        """
+        Índices de la colección de propiedades con su uso (`$indexStats`): operaciones
+        desde el último reinicio de MongoDB, si están declarados y si falta alguno.
+        """
+        return {"collection": collection.full_name, "indexes": await index_usage(collection)}
+
+    return router
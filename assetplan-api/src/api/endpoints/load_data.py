@@ -1,24 +1,147 @@
-import os
-from fastapi import APIRouter, HTTPException
-from src.schemas.chroma import Response
+import zlib
+from typing import Callable
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.routing import APIRoute
+from src.schemas.chroma import JobStatusResponse, TaskResponse
+from src.services.ingestion_jobs import ingestion_job_manager
 from src.services.load_data_service import load_data_service
+from src.services.ndjson_stream import NDJSONFormatError, iter_batches
+from src.services.snapshot_codec import SnapshotFormatError, SnapshotTooLargeError, load_snapshot_bytes
+from src.core.config import settings
 from src.core.logging import logger
 
+def decompress_gzip(body: bytes, max_bytes: int) -> bytes:
+    """
+    Decompresses a gzip body producing at most `max_bytes`, so a small, highly
+    compressed body (gzip bomb) cannot expand into an unbounded buffer.
+    Raises 413 when the limit is exceeded and 400 when the body is not valid gzip.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        data = decompressor.decompress(body, max_bytes + 1)
+    except zlib.error as e:
+        raise HTTPException(status_code=400, detail=f"Body is not valid gzip: {e}")
+    if len(data) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Decompressed body exceeds {max_bytes} bytes.")
+    if not decompressor.eof:
+        raise HTTPException(status_code=400, detail="Body is not valid gzip: truncated gzip body.")
+    return data
+
+
+class GzipRequest(Request):
+    """Request that transparently decompresses gzip bodies (Content-Encoding: gzip)."""
+
+    async def body(self) -> bytes:
+        if not hasattr(self, "_body"):
+            body = await super().body()
+            if "gzip" in self.headers.getlist("Content-Encoding"):
+                body = decompress_gzip(body, settings.INGEST_MAX_DECOMPRESSED_BYTES)
+            self._body = body
+        return self._body
+
+
+class GzipRoute(APIRoute):
+    """Route class that accepts gzip-compressed chunks sent by the scraper."""
+
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+
+        async def custom_route_handler(request: Request):
+            request = GzipRequest(request.scope, request.receive)
+            return await original_route_handler(request)
+
+        return custom_route_handler
+
+
 def load_data_router() -> APIRouter:
-    router = APIRouter(prefix="/load-deptos", tags=["Document Management"])
+    router = APIRouter(prefix="/load-deptos", tags=["Document Management"], route_class=GzipRoute)
 
-    @router.post("/", response_model=Response, status_code=200)
+    def enqueue(deptos: dict, source: str) -> TaskResponse:
+        if not isinstance(deptos.get("propiedades"), list):
+            raise HTTPException(
+                status_code=400,
+                detail="El formato de datos es incorrecto. Se esperaba una clave 'propiedades' con una lista."
+            )
+        task_id = ingestion_job_manager.submit(deptos, source=source)
+        logger.info(f"📥 Trabajo de ingesta {task_id} encolado ({len(deptos['propiedades'])} propiedades)")
+        return TaskResponse(message="Ingestion job queued.", task_id=task_id)
+
+    @router.post("/", response_model=TaskResponse, status_code=202)
     async def load_deptos_endpoint(
         deptos: dict
     ):
         try:
-            data = await load_data_service.load_deptos(deptos)
-
-            return Response(
-                data=data,
-            )
+            return enqueue(deptos, source="load-deptos")
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error in load data endpoint: {e}", exc_info=True)
             raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
     
-    return router
\ No newline at end of file
+    @router.post("/snapshot", response_model=TaskResponse, status_code=202)
+    async def load_snapshot_endpoint(request: Request):
+        """Queues a compact columnar snapshot (gzip) produced by the scraper's `snapshot.py`."""
+        body = await request.body()
+        try:
+            propiedades = load_snapshot_bytes(body, settings.INGEST_MAX_DECOMPRESSED_BYTES)
+        except SnapshotTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except SnapshotFormatError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        try:
+            logger.info(f"📦 Cargando instantánea columnar con {len(propiedades)} propiedades")
+            return enqueue({"propiedades": propiedades}, source="snapshot")
+        except Exception as e:
+            logger.error(f"Error in load snapshot endpoint: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+    @router.post("/stream", response_model=TaskResponse, status_code=202)
+    async def load_stream_endpoint(request: Request):
+        """
+        Ingests an NDJSON body (one property per line, optionally `Content-Encoding: gzip`)
+        without buffering it: properties are written to MongoDB in batches of
+        `INGEST_STREAM_BATCH_SIZE` as the body arrives, and a ChromaDB sync of each batch's
+        ids is requested after writing it. The returned job tracks the final sync, which
+        also removes stale ids; if the body fails midway the final sync is still requested.
+        """
+        compressed = "gzip" in request.headers.getlist("Content-Encoding")
+        summary = {"inserted_count": 0, "updated_count": 0, "updated_price_count": 0, "deleted_count": 0, "batches": 0}
+        processed = 0
+        completed = False
+        try:
+            async for batch in iter_batches(request.stream(), compressed, settings.INGEST_STREAM_BATCH_SIZE):
+                result = await load_data_service.write_deptos(batch)
+                if result.get("status") != "success":
+                    raise ValueError(result.get("message", "Error escribiendo en MongoDB."))
+                processed += len(batch["propiedades"])
+                summary["inserted_count"] += result["inserted_count"]
+                summary["updated_count"] += result["updated_count"]
+                summary["updated_price_count"] += result["price_update_summary"].get("updated_price_count", 0)
+                summary["deleted_count"] += result["deleted_count"]
+                summary["batches"] += 1
+                ingestion_job_manager.request_sync([p["id"] for p in batch["propiedades"] if p.get("id") is not None])
+            summary["status"] = "success"
+            task_id = ingestion_job_manager.submit_written(summary, processed, source="stream")
+            completed = True
+        except NDJSONFormatError as e:
+            raise HTTPException(status_code=400, detail=f"{e} ({processed} properties were already written).")
+        except Exception as e:
+            logger.error(f"Error in load stream endpoint: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+        finally:
+            # The job submitted on success runs the final sync; a failed body still gets one
+            if summary["batches"] > 0 and not completed:
+                ingestion_job_manager.request_sync()
+
+        logger.info(f"🌊 Ingesta en streaming: {processed} propiedades en {summary['batches']} lotes (trabajo {task_id})")
+        return TaskResponse(message="Properties written; ChromaDB sync queued.", task_id=task_id)
+
+    @router.get("/{task_id}", response_model=JobStatusResponse)
+    async def get_job_status(task_id: str):
+        job = ingestion_job_manager.get(task_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Ingestion job not found.")
+        return JobStatusResponse(**job)
+
+    return router
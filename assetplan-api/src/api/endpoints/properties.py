@@ -0,0 +1,55 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.api.dependencies import get_mongo_collection
+from src.schemas.properties import PropertyFilters, PropertyPage, PropertySort
+from src.services.property_search_service import PropertyQueryError, property_search_service
+from src.core.logging import logger
+
+
+def create_properties_router() -> APIRouter:
+    """Router para la búsqueda estructurada de propiedades (MongoDB, sin embeddings)"""
+    router = APIRouter(prefix="/properties", tags=["Properties"])
+
+    @router.get("", response_model=PropertyPage)
+    async def search_properties(
+        comuna: Optional[List[str]] = Query(None, description="Comuna exacta; se puede repetir"),
+        precio_min_uf: Optional[float] = Query(None, ge=0, description="Precio desde mínimo en UF"),
+        precio_max_uf: Optional[float] = Query(None, ge=0, description="Precio desde máximo en UF"),
+        dormitorios: Optional[int] = Query(None, ge=0, description="Dormitorios (0 = estudio)"),
+        tiene_descuento: Optional[bool] = None,
+        garantia_cuotas: Optional[bool] = None,
+        sin_aval: Optional[bool] = None,
+        servicio_pro: Optional[bool] = None,
+        sort: PropertySort = PropertySort.PRECIO_ASC,
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description="`next_cursor` de la página anterior"),
+        fields: Optional[str] = Query(None, description="Campos separados por coma, p. ej. id,informacion_basica.titulo,precio"),
+        collection=Depends(get_mongo_collection),
+    ):
+        """
+        Lista propiedades con filtros estructurados, ordenadas por precio y paginadas con
+        cursor. Responde consultas como "Independencia bajo 15 UF" sin pasar por el LLM
+        ni por la búsqueda semántica.
+        """
+        filters = PropertyFilters(
+            comuna=comuna,
+            precio_min_uf=precio_min_uf,
+            precio_max_uf=precio_max_uf,
+            dormitorios=dormitorios,
+            tiene_descuento=tiene_descuento,
+            garantia_cuotas=garantia_cuotas,
+            sin_aval=sin_aval,
+            servicio_pro=servicio_pro,
+        )
+        field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        try:
+            return await property_search_service.search(
+                collection, filters, sort=sort, limit=limit, cursor=cursor, fields=field_list
+            )
+        except PropertyQueryError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            logger.error(f"❌ Error buscando propiedades: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail=f"An unexpected error occurred: {str(e)}")
+
+    return router
@@ -1,10 +1,12 @@
 from fastapi import APIRouter
-from . import user, load_data
+from . import admin, properties, user, load_data
 
 def create_api_router() -> APIRouter:
     main_router = APIRouter()
     
     main_router.include_router(user.create_users_router())
     main_router.include_router(load_data.load_data_router())
+    main_router.include_router(properties.create_properties_router())
+    main_router.include_router(admin.create_admin_router())
 
     return main_router
\ No newline at end of file
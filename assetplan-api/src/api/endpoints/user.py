@@ -8,8 +8,10 @@ def create_users_router() -> APIRouter:
     """Router para endpoints de gestión de usuarios"""
     router = APIRouter(prefix="/user", tags=["Users"])
     
+    # Endpoints síncronos: FastAPI los ejecuta en su threadpool, así las consultas a
+    # PostgreSQL no bloquean el event loop que comparten con la ingesta.
     @router.post("/")
-    async def create_or_get_user(
+    def create_or_get_user(
         email: str = Form(None),
         username: str = Form(None),
     ):
@@ -23,7 +25,7 @@ def create_users_router() -> APIRouter:
             raise HTTPException(status_code=500, detail=f"Error con usuario: {str(e)}")
     
     @router.post("/{user_id}/sessions")
-    async def create_user_session(user_id: int):
+    def create_user_session(user_id: int):
         """
         Crea una nueva sesión de chat para un usuario.
         """
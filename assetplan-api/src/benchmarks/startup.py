@@ -0,0 +1,118 @@
+"""
+Benchmark de arranque de la API.
+
+Mide dos tiempos, cada uno en un proceso nuevo:
+
+- importación: cuánto tarda `import src.main` (no debe conectarse a nada ni cargar
+  backends pesados como chromadb, openai o numpy);
+- disponibilidad: desde que se lanza uvicorn hasta que `GET /` responde, lo que
+  incluye el `lifespan` (tablas de PostgreSQL y clientes del registro).
+
+Uso (dentro del contenedor, desde /app):
+
+    python -m src.benchmarks.startup --runs 5 --output startup.json
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+# Módulos que no deben cargarse solo por importar la aplicación
+HEAVY_MODULES = ["chromadb", "openai", "numpy", "sentence_transformers", "cohere", "onnxruntime"]
+
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "started = time.perf_counter()\n"
+    "import src.main\n"
+    "elapsed = time.perf_counter() - started\n"
+    f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n"
+    "print(json.dumps({'seconds': elapsed, 'heavy_modules': heavy}))\n"
+)
+
+
+def measure_import(runs):
+    """Importa `src.main` en `runs` procesos nuevos y devuelve los tiempos."""
+    timings = []
+    heavy = set()
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE], capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result["seconds"])
+        heavy.update(result["heavy_modules"])
+    return {
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "max_s": max(timings),
+        "heavy_modules": sorted(heavy),
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_readiness(timeout):
+    """Lanza uvicorn y mide cuánto tarda `GET /` en responder (lifespan incluido)."""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+        env=os.environ.copy(),
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError(f"uvicorn terminó con código {server.returncode} antes de estar disponible")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as response:
+                    if response.status == 200:
+                        return {"seconds": time.perf_counter() - started}
+            except OSError:
+                time.sleep(0.05)
+        raise TimeoutError(f"La API no respondió en {timeout}s")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mide el tiempo de importación y disponibilidad de la API.")
+    parser.add_argument("--runs", type=int, default=5, help="Importaciones a medir")
+    parser.add_argument("--skip-readiness", action="store_true", help="Solo medir la importación (sin servicios)")
+    parser.add_argument("--timeout", type=float, default=60, help="Tiempo máximo de espera para la disponibilidad")
+    parser.add_argument("--max-import-s", type=float, default=None, help="Falla si la mediana de importación lo supera")
+    parser.add_argument("--output", help="Guarda el resultado en este archivo JSON")
+    args = parser.parse_args()
+
+    report = {"import": measure_import(args.runs)}
+    print(f"Importación de src.main: mediana {report['import']['median_s'] * 1000:.0f} ms "
+          f"(mín {report['import']['min_s'] * 1000:.0f} ms, máx {report['import']['max_s'] * 1000:.0f} ms)")
+    if not args.skip_readiness:
+        report["readiness"] = measure_readiness(args.timeout)
+        print(f"API disponible en {report['readiness']['seconds'] * 1000:.0f} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if report["import"]["heavy_modules"]:
+        failures.append(f"módulos pesados cargados al importar: {', '.join(report['import']['heavy_modules'])}")
+    if args.max_import_s is not None and report["import"]["median_s"] > args.max_import_s:
+        failures.append(f"importación sobre el límite de {args.max_import_s}s")
+    for failure in failures:
+        print(f"Error: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,26 @@
 import chromadb
-from chromadb.utils import embedding_functions
 from chromadb.config import Settings as ChromaSettings
 from src.core.config import settings
 from src.core.logging import logger
+from src.database.embedding_cache import wrap_with_cache
 
 def get_embedding_function(name: str):
-    """Devuelve un objeto de función de embedding basado en el nombre."""
+    """
+    Devuelve un objeto de función de embedding basado en el nombre.
+    El backend se importa solo cuando se pide, para no cargarlo al iniciar la API.
+    """
     if name == "openai":
-        return embedding_functions.OpenAIEmbeddingFunction(
+        from chromadb.utils.embedding_functions.openai_embedding_function import OpenAIEmbeddingFunction
+        openai_ef = OpenAIEmbeddingFunction(
             api_key=settings.OPENAI_API_KEY,
             model_name=settings.OPENAI_EMBEDDINGS_MODEL
         )
+        return wrap_with_cache(
+            openai_ef,
+            model_name=f"openai:{settings.OPENAI_EMBEDDINGS_MODEL}",
+            path=settings.EMBEDDING_CACHE_PATH,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
     raise ValueError(f"Función de embedding desconocida: {name}")
 
 def get_chroma_client():
@@ -45,15 +55,3 @@ def get_chroma_client():
         )
     else:
         raise ValueError(f"Tipo de cliente Chroma no soportado: {settings.CHROMA_CLIENT_TYPE}")
-
-def get_chroma_collection(collection_name: str, embedding_function_name: str = "openai"):
-    """
-    Obtiene o crea una colección en ChromaDB.
-    """
-    client = get_chroma_client()
-    embedding_function = get_embedding_function(embedding_function_name)
-
-    return client.get_or_create_collection(
-        name=collection_name,
-        embedding_function=embedding_function
-    )
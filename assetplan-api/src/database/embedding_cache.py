@@ -0,0 +1,176 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+from src.core.config import settings
+from src.core.logging import logger
+
+
+class EmbeddingCache:
+    """
+    Almacén persistente de embeddings en SQLite, direccionado por contenido.
+
+    Cada vector se guarda como bytes float32 bajo la clave sha256(modelo + texto).
+    Al superar `max_entries` se eliminan las entradas usadas hace más tiempo (LRU).
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, "
+            "vector BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Devuelve los vectores cacheados de `keys` y marca esas entradas como usadas."""
+        if not keys:
+            return {}
+        found: Dict[str, np.ndarray] = {}
+        now = time.time()
+        with self._lock:
+            # SQLite limita la cantidad de parámetros por consulta
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = np.frombuffer(vector, dtype=np.float32)
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [now, *[key for key, _ in rows]],
+                    )
+            self._conn.commit()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, Any]) -> None:
+        """Guarda los vectores `{clave: embedding}` y aplica el límite de tamaño."""
+        if not items:
+            return
+        now = time.time()
+        rows = []
+        for key, embedding in items.items():
+            vector = np.asarray(embedding, dtype=np.float32)
+            rows.append((key, model, int(vector.shape[0]), vector.tobytes(), now))
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO embeddings VALUES (?, ?, ?, ?, ?)", rows)
+            self._count += self._conn.total_changes - before
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        )
+        self._count -= excess
+        logger.info(f"Caché de embeddings: {excess} entradas antiguas eliminadas (límite {self.max_entries}).")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Envuelve una función de embedding de Chroma y solo calcula los textos que no
+    están en el caché. El nombre y la configuración se delegan a la función original
+    para que Chroma siga viendo la misma función en las colecciones existentes.
+    """
+
+    def __init__(self, inner: EmbeddingFunction, cache: EmbeddingCache, model_name: str):
+        self.inner = inner
+        self.cache = cache
+        self.model_name = model_name
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, input: Documents) -> Embeddings:
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in input]
+        cached = self.cache.get_many(list(dict.fromkeys(keys)))
+        # Aciertos por texto distinto: un texto repetido en el lote no es un acierto
+        hits = len(cached)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, input):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            computed = self.inner(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), computed))
+            self.cache.put_many(self.model_name, new_vectors)
+            cached.update({key: np.asarray(vector, dtype=np.float32) for key, vector in new_vectors.items()})
+
+        self.hits += hits
+        self.misses += len(missing)
+        if missing:
+            logger.info(f"Embeddings: {hits} desde caché, {len(missing)} calculados.")
+        return [cached[key] for key in keys]
+
+    def embed_query(self, input: Documents) -> Embeddings:
+        return self.inner.embed_query(input)
+
+    def name(self) -> str:
+        return self.inner.name()
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.inner.get_config()
+
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "EmbeddingFunction[Documents]":
+        """Reconstruye la función de OpenAI desde la configuración guardada y la envuelve con el caché."""
+        from chromadb.utils.embedding_functions.openai_embedding_function import OpenAIEmbeddingFunction
+        return wrap_with_cache(
+            OpenAIEmbeddingFunction.build_from_config(config),
+            model_name=f"openai:{config['model_name']}",
+            path=settings.EMBEDDING_CACHE_PATH,
+            max_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        )
+
+    def default_space(self):
+        return self.inner.default_space()
+
+    def supported_spaces(self):
+        return self.inner.supported_spaces()
+
+    def is_legacy(self) -> bool:
+        return False
+
+
+def wrap_with_cache(inner: EmbeddingFunction, model_name: str, path: Optional[str], max_entries: int):
+    """Devuelve `inner` envuelta con el caché persistente, o `inner` si el caché está deshabilitado."""
+    if not path:
+        return inner
+    return CachedEmbeddingFunction(inner, EmbeddingCache(path, max_entries), model_name)
@@ -0,0 +1,143 @@
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from src.core.logging import logger
+
+# Índices declarados de la colección de propiedades. Se reconcilian al iniciar la API:
+# se crean los que faltan y se recrean los que existen con otra definición.
+# Los de comuna y precio terminan en (precio, id) para servir el orden y la paginación
+# por keyset de `GET /properties`; sus prefijos siguen sirviendo las búsquedas simples.
+PROPERTY_INDEXES: List[IndexModel] = [
+    IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    IndexModel(
+        [("informacion_basica.comuna", ASCENDING), ("precio.precio_desde_uf", ASCENDING), ("id", ASCENDING)],
+        name="comuna",
+    ),
+    IndexModel([("precio.precio_desde_uf", ASCENDING), ("id", ASCENDING)], name="precio_desde_uf"),
+]
+
+# Opciones de índice que forman parte de la definición (además de la clave)
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+# Sufijo del índice temporal que sirve las consultas mientras se reemplaza un índice
+_TEMPORARY_SUFFIX = "_reconcile"
+
+
+def _key(spec: Any) -> list:
+    return [(field, direction) for field, direction in (spec.items() if isinstance(spec, dict) else spec)]
+
+
+def _definition(spec: Dict[str, Any]) -> tuple:
+    """Clave y opciones relevantes de un índice, comparables entre lo declarado y lo existente."""
+    options = {option: spec[option] for option in _COMPARED_OPTIONS if spec.get(option)}
+    return _key(spec["key"]), options
+
+
+def _temporary_model(model: IndexModel) -> IndexModel:
+    """
+    Índice que cubre las mismas consultas que `model` mientras se reemplaza el existente.
+    La clave termina en `_id` para no chocar con un índice de la misma clave; sin `unique`,
+    que sobre una clave que incluye `_id` no restringe nada.
+    """
+    spec = model.document
+    key = _key(spec["key"])
+    if "_id" not in dict(key):
+        key.append(("_id", ASCENDING))
+    options = {option: spec[option] for option in ("sparse", "partialFilterExpression") if spec.get(option)}
+    return IndexModel(key, name=f"{spec['name']}{_TEMPORARY_SUFFIX}", **options)
+
+
+async def reconcile_indexes(collection, declared: List[IndexModel] = PROPERTY_INDEXES) -> Dict[str, Any]:
+    """
+    Asegura que los índices declarados existan en la colección con la definición declarada.
+
+    Un índice existente con la misma clave pero otro nombre u opciones se reemplaza sin
+    dejar las consultas sin índice: primero se construye un índice temporal equivalente,
+    luego se elimina el anterior, se crea el declarado y al final se elimina el temporal.
+    Los índices no declarados se conservan y solo se informan. Si un índice no se puede
+    construir (p. ej. ids duplicados para el índice único), el error se registra, el
+    temporal se conserva para seguir sirviendo las consultas y se continúa con los demás.
+
+    :param collection: Colección de MongoDB (cliente asíncrono).
+    :param declared: Índices declarados.
+    :return: Resumen con los índices creados, recreados, sin cambios, fallidos y no declarados.
+    """
+    existing = await collection.index_information()
+    summary = {"created": [], "recreated": [], "unchanged": [], "failed": {}, "undeclared": []}
+    dropped = set()
+
+    for model in declared:
+        spec = model.document
+        name = spec["name"]
+        wanted = _definition(spec)
+        current = existing.get(name)
+        conflicting = [
+            other for other, info in existing.items()
+            if other != name and _key(info["key"]) == wanted[0]
+        ]
+
+        if current is not None and _definition(current) == wanted and not conflicting:
+            summary["unchanged"].append(name)
+            continue
+
+        replaced = ([name] if current is not None else []) + conflicting
+        try:
+            if not replaced:
+                await collection.create_indexes([model])
+                # Temporal de una reconciliación anterior que no pudo crear el declarado
+                leftover = f"{name}{_TEMPORARY_SUFFIX}"
+                if leftover in existing:
+                    await collection.drop_index(leftover)
+                    dropped.add(leftover)
+                summary["created"].append(name)
+                continue
+
+            # El reemplazo se construye antes de eliminar el índice anterior
+            temporary = _temporary_model(model)
+            await collection.create_indexes([temporary])
+            for other in replaced:
+                await collection.drop_index(other)
+                dropped.add(other)
+            await collection.create_indexes([model])
+            await collection.drop_index(temporary.document["name"])
+        except OperationFailure as e:
+            logger.error(f"❌ No se pudo crear el índice '{name}': {e}")
+            summary["failed"][name] = str(e)
+            continue
+        summary["recreated"].append(name)
+
+    declared_names = {model.document["name"] for model in declared}
+    summary["undeclared"] = [
+        name for name in existing if name != "_id_" and name not in declared_names and name not in dropped
+    ]
+    if summary["created"] or summary["recreated"]:
+        logger.info(f"🗂️ Índices creados: {summary['created']}, recreados: {summary['recreated']}")
+    return summary
+
+
+async def index_usage(collection, declared: List[IndexModel] = PROPERTY_INDEXES) -> List[Dict[str, Any]]:
+    """
+    Estadísticas de uso de cada índice (`$indexStats`) junto a si está declarado y
+    cuáles de los declarados faltan en la colección.
+    """
+    declared_names = {model.document["name"] for model in declared}
+    stats = []
+    async for entry in await collection.aggregate([{"$indexStats": {}}]):
+        accesses = entry.get("accesses") or {}
+        stats.append({
+            "name": entry["name"],
+            "key": dict(entry["key"]),
+            "declared": entry["name"] in declared_names,
+            "ops": accesses.get("ops", 0),
+            "since": accesses.get("since"),
+        })
+
+    present = {entry["name"] for entry in stats}
+    for model in declared:
+        name = model.document["name"]
+        if name not in present:
+            stats.append({"name": name, "key": dict(model.document["key"]), "declared": True,
+                          "missing": True, "ops": 0, "since": None})
+    return sorted(stats, key=lambda entry: entry["name"])
@@ -1,10 +1,12 @@
-from sqlalchemy import create_engine, update
-from src.core.config import settings
 from src.models import Base, User, ChatSession
-from sqlalchemy.orm import sessionmaker
+from src.database.registry import client_registry
 
-engine = create_engine(settings.POSTGRES_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def open_session():
+    """
+    Opens a session on the shared, pooled engine owned by the client registry.
+    """
+    return client_registry.session_factory()
 
 
 def initialize_database():
@@ -12,7 +14,7 @@ def initialize_database():
     Initializes the database by creating all tables defined in the models.
     """
     try:
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=client_registry.engine)
         print("Database initialized successfully.")
     except Exception as e:
         print(f"Error initializing database: {e}")
@@ -22,8 +24,8 @@ def get_db():
     """
     Returns a new database session.
     """
-    db = SessionLocal()
+    db = open_session()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
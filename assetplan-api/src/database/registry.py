@@ -0,0 +1,197 @@
+import threading
+from typing import Any, Dict, Optional
+
+from pymongo import AsyncMongoClient
+from pymongo.monitoring import ConnectionPoolListener
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core.config import settings
+from src.core.logging import logger
+
+
+class PoolCounter(ConnectionPoolListener):
+    """Cuenta los eventos CMAP de un cliente de MongoDB para reportar el estado de su pool."""
+
+    def __init__(self):
+        self.created = 0
+        self.closed = 0
+        self.checked_out = 0
+        self.checked_in = 0
+        self.checkout_failed = 0
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+    def connection_created(self, event):
+        self.created += 1
+
+    def connection_closed(self, event):
+        self.closed += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_in += 1
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failed += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "open_connections": self.created - self.closed,
+            "in_use": self.checked_out - self.checked_in,
+            "connections_created": self.created,
+            "checkouts": self.checked_out,
+            "checkout_failures": self.checkout_failed,
+        }
+
+
+class ClientRegistry:
+    """
+    Dueño único de los clientes externos de la API: MongoDB (asíncrono), el engine de
+    PostgreSQL, el cliente de ChromaDB, sus colecciones y las funciones de
+    embedding. Cada cliente se crea una sola vez y mantiene su propio pool de conexiones.
+
+    `initialize()` los crea en el `lifespan` de FastAPI y `close()` los libera al apagar;
+    si algún código los pide antes (scripts, pruebas), se crean al primer uso.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._async_mongo_client: Optional[AsyncMongoClient] = None
+        self._async_mongo_pool = PoolCounter()
+        self._engine = None
+        self._session_factory = None
+        self._chroma_client = None
+        self._embedding_functions: Dict[str, Any] = {}
+        self._chroma_collections: Dict[str, Any] = {}
+
+    def initialize(self) -> None:
+        """Crea todos los clientes y la colección de Chroma por defecto."""
+        self.engine
+        self.async_mongo_client
+        self.chroma_collection(settings.CHROMA_COLLECTION_NAME)
+        logger.info("Registro de clientes inicializado (MongoDB, PostgreSQL, ChromaDB).")
+
+    # --- MongoDB ---
+
+    @property
+    def async_mongo_client(self) -> AsyncMongoClient:
+        with self._lock:
+            if self._async_mongo_client is None:
+                self._async_mongo_client = AsyncMongoClient(
+                    settings.MONGO_URL,
+                    maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                    event_listeners=[self._async_mongo_pool],
+                )
+            return self._async_mongo_client
+
+    def async_mongo_collection(self):
+        return self.async_mongo_client[settings.MONGO_DB_NAME][settings.MONGO_COLLECTION_NAME]
+
+    # --- PostgreSQL ---
+
+    @property
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                self._engine = create_engine(
+                    settings.POSTGRES_URL,
+                    pool_size=settings.POSTGRES_POOL_SIZE,
+                    max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+                    pool_pre_ping=True,
+                )
+                self._session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self._engine)
+            return self._engine
+
+    @property
+    def session_factory(self):
+        self.engine
+        return self._session_factory
+
+    # --- ChromaDB ---
+
+    @property
+    def chroma_client(self):
+        with self._lock:
+            if self._chroma_client is None:
+                from src.database.chroma_config import get_chroma_client
+                self._chroma_client = get_chroma_client()
+            return self._chroma_client
+
+    def embedding_function(self, name: str = "openai"):
+        with self._lock:
+            if name not in self._embedding_functions:
+                from src.database.chroma_config import get_embedding_function
+                self._embedding_functions[name] = get_embedding_function(name)
+            return self._embedding_functions[name]
+
+    def chroma_collection(self, name: str, embedding_function_name: str = "openai"):
+        """Obtiene (o crea) una colección de Chroma, una sola vez por nombre."""
+        with self._lock:
+            if name not in self._chroma_collections:
+                self._chroma_collections[name] = self.chroma_client.get_or_create_collection(
+                    name=name,
+                    embedding_function=self.embedding_function(embedding_function_name),
+                )
+            return self._chroma_collections[name]
+
+    # --- Estado y cierre ---
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado de los pools de cada cliente (solo de los que ya fueron creados)."""
+        stats: Dict[str, Any] = {}
+        if self._async_mongo_client is not None:
+            stats["mongo_async"] = {"max_pool_size": settings.MONGO_MAX_POOL_SIZE, **self._async_mongo_pool.stats()}
+        if self._engine is not None:
+            pool = self._engine.pool
+            stats["postgres"] = {
+                "pool_size": pool.size(),
+                "max_overflow": settings.POSTGRES_MAX_OVERFLOW,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        if self._chroma_client is not None:
+            stats["chroma"] = {
+                "client_type": settings.CHROMA_CLIENT_TYPE,
+                "collections": sorted(self._chroma_collections),
+            }
+        for name, function in self._embedding_functions.items():
+            cache = getattr(function, "cache", None)
+            stats[f"embedding_{name}"] = {
+                "cache_entries": len(cache) if cache is not None else None,
+                "cache_hits": getattr(function, "hits", None),
+                "cache_misses": getattr(function, "misses", None),
+            }
+        return stats
+
+    async def close(self) -> None:
+        """Cierra todos los clientes creados; el registro puede volver a inicializarse."""
+        with self._lock:
+            async_mongo_client, self._async_mongo_client = self._async_mongo_client, None
+            engine, self._engine, self._session_factory = self._engine, None, None
+            chroma_client, self._chroma_client = self._chroma_client, None
+            embedding_functions, self._embedding_functions = self._embedding_functions, {}
+            self._chroma_collections = {}
+
+        if async_mongo_client is not None:
+            await async_mongo_client.close()
+        if engine is not None:
+            engine.dispose()
+        if chroma_client is not None:
+            chroma_client.close()
+        for function in embedding_functions.values():
+            cache = getattr(function, "cache", None)
+            if cache is not None:
+                cache.close()
+        logger.info("Registro de clientes cerrado.")
+
+
+client_registry = ClientRegistry()
@@ -4,7 +4,9 @@ from contextlib import asynccontextmanager
 from src.core.logging import logger
 from src.api.endpoints import router
 from src.database.postgres_config import initialize_database
-from src.database.chroma_config import get_chroma_client, get_chroma_collection
+from src.database.registry import client_registry
+from src.database.indexes import reconcile_indexes
+from src.services.ingestion_jobs import ingestion_job_manager
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -12,7 +14,8 @@ async def lifespan(app: FastAPI):
     Maneja la lógica de inicio y apagado de la aplicación.
     """
     logger.info(f"Iniciando {settings.APP_NAME}...")
-    
+    app.state.clients = client_registry
+
     try:
         # Llama a la única función de inicialización de Postgres
         initialize_database()
@@ -21,19 +24,30 @@ async def lifespan(app: FastAPI):
         logger.critical(f"No se pudo inicializar la base de datos. Error: {e}", exc_info=True)
         raise
 
-    logger.info("Inicializando el cliente de ChromaDB.")
+    logger.info("Inicializando los clientes de MongoDB y ChromaDB.")
+    try:
+        # Un único cliente (con su pool) por servicio, compartido por toda la API
+        client_registry.initialize()
+    except Exception as e:
+        logger.critical(f"No se pudieron inicializar los clientes. Error: {e}", exc_info=True)
+        raise
+
     try:
-        # Inicializa el cliente de ChromaDB
-        get_chroma_client()
-        get_chroma_collection(settings.CHROMA_COLLECTION_NAME)
-        logger.info("Cliente de ChromaDB y colección por defecto inicializados correctamente.")
+        # Índices declarados de la colección de propiedades (búsquedas por id, comuna y precio)
+        await reconcile_indexes(client_registry.async_mongo_collection())
+        logger.info("Índices de MongoDB reconciliados correctamente.")
     except Exception as e:
-        logger.critical(f"No se pudo inicializar ChromaDB. Error: {e}", exc_info=True)
+        logger.critical(f"No se pudieron reconciliar los índices de MongoDB. Error: {e}", exc_info=True)
         raise
 
+    # Worker en segundo plano para los trabajos de ingesta de /load-deptos
+    ingestion_job_manager.start()
+
     yield
 
     logger.info(f"Apagando {settings.APP_NAME}...")
+    await ingestion_job_manager.stop()
+    await client_registry.close()
 
 
 app = FastAPI(
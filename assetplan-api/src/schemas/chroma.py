@@ -30,7 +30,7 @@ class HNSWConfig(BaseModel):
     resize_factor: Optional[float] = 1.2
 
 class CollectionCreate(CollectionBase):
-    embedding_function_name: str = "openai" # e.g., "default", "openai", "cohere"
+    embedding_function_name: str = "openai" # only "openai" is available
     hnsw_config: Optional[HNSWConfig] = None # Nested HNSW config
 
 class CollectionResponse(BaseModel):
@@ -103,7 +103,9 @@ class CountResponse(BaseModel):
 
 class JobStatusResponse(BaseModel):
     task_id: str
-    file_name: str
+    file_name: Optional[str] = None
     total_tokens: Optional[int] = None
     status: str
-    error_message: Optional[str] = None
\ No newline at end of file
+    error_message: Optional[str] = None
+    progress: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
\ No newline at end of file
@@ -0,0 +1,27 @@
+from enum import Enum
+from pydantic import BaseModel
+from typing import List, Dict, Any, Optional
+
+
+class PropertySort(str, Enum):
+    PRECIO_ASC = "precio_asc"
+    PRECIO_DESC = "precio_desc"
+
+
+class PropertyFilters(BaseModel):
+    """Filtros estructurados de `GET /properties` (todos opcionales y combinables)."""
+    comuna: Optional[List[str]] = None
+    precio_min_uf: Optional[float] = None
+    precio_max_uf: Optional[float] = None
+    dormitorios: Optional[int] = None
+    tiene_descuento: Optional[bool] = None
+    garantia_cuotas: Optional[bool] = None
+    sin_aval: Optional[bool] = None
+    servicio_pro: Optional[bool] = None
+
+
+class PropertyPage(BaseModel):
+    items: List[Dict[str, Any]]
+    count: int
+    sort: PropertySort
+    next_cursor: Optional[str] = None
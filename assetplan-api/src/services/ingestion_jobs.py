@@ -0,0 +1,204 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+from src.core.logging import logger
+from src.services.load_data_service import load_data_service
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class IngestionJobManager:
+    """
+    Cola de trabajos de ingesta de `/load-deptos` con un único worker en segundo plano.
+
+    Cada trabajo escribe sus propiedades en MongoDB; los trabajos que llegan mientras
+    otro se procesa se agrupan y comparten una sola sincronización con ChromaDB, de
+    modo que dos scrapes simultáneos no reconstruyen el índice dos veces.
+
+    La sincronización se limita a las propiedades escritas; la primera después de
+    iniciar y la siguiente a un fallo recorren todo el catálogo para reparar desvíos.
+    """
+
+    def __init__(self, max_finished_jobs: int = 200):
+        self.max_finished_jobs = max_finished_jobs
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._payloads: Dict[str, dict] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._full_sync_pending = True
+
+    def start(self) -> None:
+        """Inicia el worker en el event loop actual (se llama desde el lifespan)."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+            logger.info("Worker de ingesta iniciado.")
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+            logger.info("Worker de ingesta detenido.")
+
+    def submit(self, deptos_data: dict, source: Optional[str] = None) -> str:
+        """Encola un payload de propiedades y devuelve el id del trabajo."""
+        if self._queue is None:
+            raise RuntimeError("El worker de ingesta no está iniciado.")
+
+        task_id = self._new_job(source, len(deptos_data.get("propiedades") or []))
+        self._payloads[task_id] = deptos_data
+        self._queue.put_nowait(task_id)
+        self._prune()
+        return task_id
+
+    def submit_written(self, result: Dict[str, Any], properties_total: int, source: Optional[str] = None) -> str:
+        """
+        Registra un trabajo cuyas propiedades ya fueron escritas en MongoDB (ingesta en
+        streaming); solo queda pendiente su sincronización con ChromaDB.
+        """
+        if self._queue is None:
+            raise RuntimeError("El worker de ingesta no está iniciado.")
+
+        task_id = self._new_job(source, properties_total)
+        self.jobs[task_id]["result"] = result
+        self.jobs[task_id]["progress"]["properties_processed"] = properties_total
+        self._queue.put_nowait(task_id)
+        self._prune()
+        return task_id
+
+    def request_sync(self, ids: Optional[List[str]] = None) -> None:
+        """
+        Pide una sincronización con ChromaDB sin crear un trabajo visible. La usa la
+        ingesta en streaming después de cada lote para embeber mientras sigue llegando
+        el cuerpo; las solicitudes que se acumulan se agrupan en una sola sincronización.
+
+        :param ids: IDs escritos por el lote; solo se sincronizan esos y se omite la
+            pasada de eliminación. Sin ids es la sincronización final, que además
+            elimina de ChromaDB lo que ya no está en MongoDB.
+        """
+        if self._queue is None:
+            raise RuntimeError("El worker de ingesta no está iniciado.")
+        self._queue.put_nowait(None if ids is None else list(ids))
+
+    def _new_job(self, source: Optional[str], properties_total: int) -> str:
+        task_id = str(uuid.uuid4())
+        self.jobs[task_id] = {
+            "task_id": task_id,
+            "file_name": source,
+            "status": PENDING,
+            "created_at": time.time(),
+            "progress": {
+                "properties_total": properties_total,
+                "properties_processed": 0,
+                "batches_total": None,
+                "batches_embedded": 0,
+            },
+            "result": None,
+            "error_message": None,
+        }
+        return task_id
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(task_id)
+
+    def _prune(self) -> None:
+        """Descarta los trabajos terminados más antiguos por encima del límite."""
+        finished = [tid for tid, job in self.jobs.items() if job["status"] in (COMPLETED, FAILED)]
+        for task_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self.jobs[task_id]
+
+    def _drain(self, first: Union[str, List[str], None]) -> List[Union[str, List[str], None]]:
+        """Toma el trabajo recibido y todos los que ya esperan en la cola."""
+        batch = [first]
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = self._drain(await self._queue.get())
+            try:
+                await self._process(batch)
+            except Exception as e:
+                logger.error(f"Error en el worker de ingesta: {e}", exc_info=True)
+
+    async def _process(self, batch: List[Union[str, List[str], None]]) -> None:
+        written = []
+        sync_ids: Dict[Any, None] = {}  # conjunto ordenado: los ids se consultan tal cual en MongoDB
+        sync_requested = False
+        remove_stale = False
+        for task_id in batch:
+            if task_id is None:
+                sync_requested = remove_stale = True
+                continue
+            if isinstance(task_id, list):
+                sync_requested = True
+                sync_ids.update(dict.fromkeys(task_id))
+                continue
+            job = self.jobs[task_id]
+            job["status"] = RUNNING
+            if task_id not in self._payloads:
+                # Ingesta en streaming: el endpoint ya escribió las propiedades
+                written.append(task_id)
+                continue
+            payload = self._payloads.pop(task_id)
+            try:
+                result = await load_data_service.write_deptos(payload)
+                if result.get("status") != "success":
+                    raise ValueError(result.get("message", "Error escribiendo en MongoDB."))
+                job["result"] = result
+                job["progress"]["properties_processed"] = job["progress"]["properties_total"]
+                written.append(task_id)
+                sync_ids.update(dict.fromkeys(p["id"] for p in payload.get("propiedades") or [] if p.get("id") is not None))
+            except Exception as e:
+                logger.error(f"Error en el trabajo de ingesta {task_id}: {e}", exc_info=True)
+                job["status"] = FAILED
+                job["error_message"] = str(e)
+
+        if not written and not sync_requested:
+            return
+        # Los trabajos cierran la ingesta: su sincronización incluye la pasada de eliminación
+        remove_stale = remove_stale or bool(written)
+        full_sync = self._full_sync_pending
+
+        if len(batch) > 1:
+            logger.info(f"🔀 {len(batch)} solicitudes de ingesta agrupadas en una sola sincronización con ChromaDB")
+
+        def on_batch(done: int, total: int) -> None:
+            for task_id in written:
+                self.jobs[task_id]["progress"].update({"batches_total": total, "batches_embedded": done})
+
+        try:
+            chroma_sync_summary = await load_data_service.sync_mongo_to_chroma(
+                on_batch=on_batch,
+                ids=None if full_sync else list(sync_ids),
+                remove_stale=remove_stale or full_sync,
+            )
+        except Exception as e:
+            logger.error(f"Error sincronizando ChromaDB: {e}", exc_info=True)
+            self._full_sync_pending = True
+            for task_id in written:
+                self.jobs[task_id].update({"status": FAILED, "error_message": f"Chroma sync failed: {e}"})
+            return
+
+        if full_sync:
+            self._full_sync_pending = False
+        for task_id in written:
+            job = self.jobs[task_id]
+            job["result"]["chroma_sync_summary"] = chroma_sync_summary
+            job["result"]["coalesced_jobs"] = len(written)
+            job["status"] = COMPLETED
+        self._prune()
+
+
+ingestion_job_manager = IngestionJobManager()
@@ -1,18 +1,35 @@
 import os
 import json
+import hashlib
+import random
+import asyncio
+from pymongo import DeleteMany, InsertOne, UpdateOne
 from src.core.config import settings
 from src.core.logging import logger
-from src.database.mongo_config import get_collection
-from src.database.chroma_config import get_chroma_collection
+from src.database.registry import client_registry
+
+# Proyección del cursor de sincronización. Las imágenes no forman parte de la descripción,
+# pero se conservan en los metadatos: el servidor MCP devuelve los metadatos al agente.
+SYNC_PROJECTION = {"_id": 0}
 
 class LoadDataService:
     def __init__(self):
-        # --- Conexión a MongoDB ---
-        self.collection = get_collection()
-
-        # --- Conexión a ChromaDB ---
         self.chroma_collection_name = settings.CHROMA_COLLECTION_NAME
-        self.chroma_collection = get_chroma_collection(self.chroma_collection_name)
+        self._embed_resume_at = 0.0
+
+    # Los clientes vienen del registro compartido, que los crea una sola vez
+    @property
+    def collection(self):
+        """Colección de MongoDB (driver asíncrono: no bloquea el event loop)."""
+        return client_registry.async_mongo_collection()
+
+    @property
+    def chroma_collection(self):
+        return client_registry.chroma_collection(self.chroma_collection_name)
+
+    @property
+    def embedding_function(self):
+        return client_registry.embedding_function("openai")
 
     def _generate_property_description(self, prop: dict) -> str:
         """Genera una descripción en lenguaje natural para una propiedad, incluyendo todos los detalles."""
@@ -50,158 +67,387 @@ class LoadDataService:
             servicios_especiales_str = ", ".join(servicios_activos).replace('_', ' ')
             description += f"Además, cuenta con beneficios especiales como: {servicios_especiales_str}. "
 
+        # --- Unidades (página de detalle) ---
+        unidades = prop.get('unidades', [])
+        if unidades:
+            unidades_str = "; ".join(self._describe_unit(u) for u in unidades)
+            disponibles = sum(1 for u in unidades if u.get('disponible'))
+            description += f"Tiene {disponibles} de {len(unidades)} unidades disponibles: {unidades_str}. "
 
         return description.strip()
 
-    async def sync_mongo_to_chroma(self):
+    def _describe_unit(self, unit: dict) -> str:
+        """Describe una unidad en una frase corta (número, tipología, superficie, precio y estado)."""
+        partes = [f"depto {unit['numero']}" if unit.get('numero') else "unidad"]
+        if unit.get('dormitorios') == 0:
+            partes.append("estudio")
+        elif unit.get('dormitorios') is not None:
+            partes.append(f"{unit['dormitorios']} dormitorios")
+        if unit.get('banos') is not None:
+            partes.append(f"{unit['banos']} baños")
+        if unit.get('superficie_m2') is not None:
+            partes.append(f"{unit['superficie_m2']} m²")
+        if unit.get('precio'):
+            partes.append(f"${unit['precio']} CLP")
+        partes.append("disponible" if unit.get('disponible') else "no disponible")
+        return ", ".join(partes)
+
+    def _content_hash(self, text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _build_chroma_metadata(self, prop: dict) -> dict:
+        """Convierte un documento de MongoDB en metadatos válidos para Chroma."""
+        # Chroma no acepta el '_id' de MongoDB en los metadatos.
+        prop.pop('_id', None)
+        # Campos numéricos de tipología como escalares para poder filtrar con `where`.
+        dormitorios = prop.get('dormitorios') or {}
+        for key, value in (('dormitorios_min', dormitorios.get('min')), ('dormitorios_max', dormitorios.get('max'))):
+            if value is not None:
+                prop[key] = value
+        # Los metadatos en Chroma deben ser str, int, float o bool.
+        # Convertimos listas y dicts a JSON strings.
+        for key, value in prop.items():
+            if isinstance(value, (dict, list)):
+                prop[key] = json.dumps(value)
+        return prop
+
+    def _prepare_chroma_entry(self, prop: dict) -> tuple:
+        """Genera la descripción y los metadatos (con sus hashes) de un documento de MongoDB."""
+        description = self._generate_property_description(prop)
+        metadata = self._build_chroma_metadata(prop)
+        content_hash = self._content_hash(description)
+        metadata_hash = self._content_hash(json.dumps(metadata, sort_keys=True, default=str))
+        metadata["content_hash"] = content_hash
+        metadata["metadata_hash"] = metadata_hash
+        return description, metadata
+
+    async def _get_chroma_hashes(self, ids: list) -> dict:
+        """Obtiene los hashes guardados en Chroma para un lote de ids: {id: (content_hash, metadata_hash)}."""
+        page = await asyncio.to_thread(self.chroma_collection.get, ids=ids, include=["metadatas"])
+        return {
+            doc_id: ((metadata or {}).get("content_hash"), (metadata or {}).get("metadata_hash"))
+            for doc_id, metadata in zip(page.get("ids") or [], page.get("metadatas") or [])
+        }
+
+    async def _get_chroma_ids(self, page_size: int = 1000) -> list:
+        """Lee por páginas todos los ids guardados en Chroma (sin documentos ni metadatos)."""
+        ids = []
+        offset = 0
+        while True:
+            page = await asyncio.to_thread(self.chroma_collection.get, include=[], limit=page_size, offset=offset)
+            page_ids = page.get("ids") or []
+            ids.extend(page_ids)
+            if len(page_ids) < page_size:
+                return ids
+            offset += page_size
+
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+    def _rate_limit_delay(self, error: Exception, attempt: int) -> float:
+        """Usa el header Retry-After si viene; si no, backoff exponencial con jitter."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            if retry_after:
+                return float(retry_after)
+        except ValueError:
+            pass
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+    async def _embed_with_backoff(self, documents: list) -> list:
         """
-        Sincroniza todos los datos de MongoDB a ChromaDB.
-        Primero, limpia la colección de Chroma para asegurar consistencia y
-        luego carga los datos frescos desde MongoDB.
+        Calcula los embeddings de un lote fuera del event loop. Ante un 429 todos los
+        workers esperan hasta `_embed_resume_at` antes de volver a llamar al proveedor.
         """
-        # 1. Limpiar la colección en ChromaDB antes de sincronizar
-        try:
-            existing_ids = self.chroma_collection.get(include=[])['ids']
-            if existing_ids:
-                logger.info(f"Limpiando {len(existing_ids)} documentos de la colección '{self.chroma_collection_name}'...")
-                self.chroma_collection.delete(ids=existing_ids)
-                logger.info("Colección de ChromaDB limpiada exitosamente.")
-        except Exception as e:
-            logger.error(f"No se pudo limpiar la colección de ChromaDB (puede que estuviera vacía): {e}")
-
-        # 2. Cargar datos frescos desde MongoDB
-        all_props = list(self.collection.find({}))
-        
-        if not all_props:
-            logger.info("No hay propiedades en MongoDB para sincronizar con ChromaDB.")
-            return {"status": "skipped", "message": "No properties to sync."}
-
-        documents, metadatas, ids = [], [], []
-
-        for prop in all_props:
-            prop_id = str(prop.get("id"))
-            if not prop_id:
+        loop = asyncio.get_running_loop()
+        for attempt in range(settings.CHROMA_SYNC_MAX_RETRIES + 1):
+            wait = self._embed_resume_at - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await asyncio.to_thread(self.embedding_function, documents)
+            except Exception as e:
+                if not self._is_rate_limit_error(e) or attempt == settings.CHROMA_SYNC_MAX_RETRIES:
+                    raise
+                delay = self._rate_limit_delay(e, attempt)
+                self._embed_resume_at = max(self._embed_resume_at, loop.time() + delay)
+                logger.warning(f"⏳ Rate limit del proveedor de embeddings, reintentando en {delay:.1f}s")
+
+    async def _get_mongo_ids(self) -> set:
+        """Lee todos los ids de MongoDB (solo el campo `id`) para la pasada de eliminación."""
+        cursor = self.collection.find({}, {"_id": 0, "id": 1})
+        return {str(doc["id"]) async for doc in cursor if doc.get("id") is not None}
+
+    async def _read_changes(self, stats: dict, mongo_ids: set, embed_queue: asyncio.Queue, query: dict) -> None:
+        """
+        Etapa 1: recorre MongoDB (las propiedades de `query`) con un cursor proyectado y,
+        por cada lote, compara con los hashes de Chroma. Las descripciones nuevas o
+        modificadas se encolan para embeber; los cambios solo de metadatos se aplican
+        aquí mismo, sin embeber.
+        """
+        batch_size = settings.CHROMA_SYNC_BATCH_SIZE
+        upserts = ([], [], [])
+        updates = ([], [])
+
+        async def classify(chunk: list) -> None:
+            existing = await self._get_chroma_hashes([prop_id for prop_id, _ in chunk])
+            for prop_id, prop in chunk:
+                description, metadata = self._prepare_chroma_entry(prop)
+                previous = existing.get(prop_id)
+                if previous is None:
+                    stats["added"] += 1
+                elif previous[0] != metadata["content_hash"]:
+                    stats["updated"] += 1
+                elif previous[1] != metadata["metadata_hash"]:
+                    # Misma descripción: se actualizan los metadatos sin volver a embeber
+                    stats["metadata_updated"] += 1
+                    updates[0].append(prop_id)
+                    updates[1].append(metadata)
+                    continue
+                else:
+                    stats["unchanged"] += 1
+                    continue
+                for column, value in zip(upserts, (prop_id, description, metadata)):
+                    column.append(value)
+                if len(upserts[0]) >= batch_size:
+                    await flush_upserts()
+
+            if len(updates[0]) >= batch_size:
+                await flush_updates()
+
+        async def flush_upserts() -> None:
+            if upserts[0]:
+                await embed_queue.put(tuple(list(column) for column in upserts))
+                stats["batches_queued"] += 1
+                for column in upserts:
+                    column.clear()
+
+        async def flush_updates() -> None:
+            if updates[0]:
+                await asyncio.to_thread(self.chroma_collection.update, ids=list(updates[0]), metadatas=list(updates[1]))
+                for column in updates:
+                    column.clear()
+
+        chunk = []
+        async for prop in self.collection.find(query, SYNC_PROJECTION, batch_size=batch_size):
+            if prop.get("id") is None:
                 continue
-
-            description = self._generate_property_description(prop)
-            documents.append(description)
-            
-            # Chroma no acepta el '_id' de MongoDB en los metadatos.
-            prop.pop('_id', None)
-            # Los metadatos en Chroma deben ser str, int, float o bool.
-            # Convertimos listas y dicts a JSON strings.
-            for key, value in prop.items():
-                if isinstance(value, (dict, list)):
-                    prop[key] = json.dumps(value)
-            
-            metadatas.append(prop)
-            ids.append(prop_id)
-
-        logger.info(f"Sincronizando {len(documents)} propiedades a ChromaDB en la colección '{self.chroma_collection_name}'...")
-        
-        # Upsert en lotes para no sobrecargar la memoria o la red
-        batch_size = 100
-        for i in range(0, len(ids), batch_size):
-            self.chroma_collection.upsert(
-                ids=ids[i:i+batch_size],
-                documents=documents[i:i+batch_size],
-                metadatas=metadatas[i:i+batch_size]
+            prop_id = str(prop["id"])
+            mongo_ids.add(prop_id)
+            chunk.append((prop_id, prop))
+            if len(chunk) >= batch_size:
+                await classify(chunk)
+                chunk = []
+        if chunk:
+            await classify(chunk)
+        await flush_upserts()
+        await flush_updates()
+        stats["reading"] = False
+
+    async def _embed_worker(self, embed_queue: asyncio.Queue, upsert_queue: asyncio.Queue) -> None:
+        """Etapa 2: embebe lotes de descripciones (varios workers en paralelo)."""
+        while True:
+            batch = await embed_queue.get()
+            if batch is None:
+                return
+            ids, documents, metadatas = batch
+            embeddings = await self._embed_with_backoff(documents)
+            await upsert_queue.put((ids, documents, metadatas, embeddings))
+
+    async def _upsert_stage(self, upsert_queue: asyncio.Queue, stats: dict, on_batch) -> None:
+        """Etapa 3: escribe en Chroma los lotes con sus embeddings ya calculados."""
+        while True:
+            batch = await upsert_queue.get()
+            if batch is None:
+                return
+            ids, documents, metadatas, embeddings = batch
+            await asyncio.to_thread(
+                self.chroma_collection.upsert,
+                ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings
             )
-        
-        logger.info("Sincronización con ChromaDB completada.")
-        return {"status": "success", "synced_count": len(documents)}
+            stats["upserted"] += len(ids)
+            stats["batches_upserted"] += 1
+            if on_batch:
+                on_batch(stats["batches_upserted"], None if stats["reading"] else stats["batches_queued"])
 
-    async def compare_and_update_prices(self, deptos_data: dict) -> dict:
+    async def sync_mongo_to_chroma(self, on_batch=None, ids=None, remove_stale=True):
         """
-        Compara los precios de las propiedades entrantes con las existentes en MongoDB
-        y actualiza si hay diferencias. Se ejecuta solo si ya hay datos en la colección.
-
-        :param deptos_data: Diccionario que contiene la lista de propiedades.
-        :return: Resumen de la operación de actualización de precios.
+        Sincroniza de forma incremental MongoDB con ChromaDB en un pipeline de memoria acotada.
+
+        Cada documento guarda en sus metadatos el hash de su descripción (`content_hash`)
+        y el del resto de sus metadatos (`metadata_hash`). Un lector recorre MongoDB con
+        un cursor proyectado y compara cada lote con sus hashes en Chroma; solo las
+        descripciones que cambiaron pasan por una cola acotada a
+        `CHROMA_SYNC_EMBED_WORKERS` workers de embedding, y una última etapa hace el
+        upsert con los embeddings ya calculados. Al final se eliminan los ids que ya no
+        están en MongoDB. La colección nunca queda vacía durante la sincronización.
+
+        :param on_batch: Callback opcional `(lotes_escritos, total_lotes)` para reportar progreso;
+            el total es None mientras se sigue leyendo MongoDB.
+        :param ids: Si se indica, solo se sincronizan esas propiedades en lugar de recorrer
+            todo el catálogo (p. ej. las escritas por un lote).
+        :param remove_stale: Si es False se omite la pasada de eliminación.
         """
-        if self.collection.count_documents({}) == 0:
-            return {
-                "status": "skipped",
-                "message": "La colección está vacía, no se realizó ninguna comparación de precios."
-            }
-
-        if "propiedades" not in deptos_data or not isinstance(deptos_data["propiedades"], list):
-            return {"status": "error", "message": "El formato de datos es incorrecto."}
+        stats = {
+            "added": 0, "updated": 0, "metadata_updated": 0, "unchanged": 0,
+            "upserted": 0, "batches_queued": 0, "batches_upserted": 0, "reading": True,
+        }
+        mongo_ids = set()
+        query = {"id": {"$in": list(ids)}} if ids is not None else {}
+        workers = max(1, settings.CHROMA_SYNC_EMBED_WORKERS)
+        embed_queue = asyncio.Queue(maxsize=settings.CHROMA_SYNC_QUEUE_SIZE)
+        upsert_queue = asyncio.Queue(maxsize=settings.CHROMA_SYNC_QUEUE_SIZE)
+        if on_batch:
+            on_batch(0, None)
 
-        incoming_properties = deptos_data["propiedades"]
-        updated_count = 0
-        updated_ids = []
+        try:
+            async with asyncio.TaskGroup() as pipeline:
+                pipeline.create_task(self._upsert_stage(upsert_queue, stats, on_batch))
+                async with asyncio.TaskGroup() as producers:
+                    for _ in range(workers):
+                        producers.create_task(self._embed_worker(embed_queue, upsert_queue))
+                    await self._read_changes(stats, mongo_ids, embed_queue, query)
+                    for _ in range(workers):
+                        await embed_queue.put(None)
+                await upsert_queue.put(None)
+        except BaseExceptionGroup as group:
+            # Se propaga el primer error real en lugar del grupo de TaskGroup
+            while isinstance(group, BaseExceptionGroup):
+                group = group.exceptions[0]
+            raise group
+
+        removed_ids = []
+        if remove_stale:
+            if ids is not None:
+                mongo_ids = await self._get_mongo_ids()
+            chroma_ids = await self._get_chroma_ids()
+            if not mongo_ids and not chroma_ids:
+                logger.info("No hay propiedades en MongoDB para sincronizar con ChromaDB.")
+                return {"status": "skipped", "message": "No properties to sync."}
+
+            removed_ids = [doc_id for doc_id in chroma_ids if doc_id not in mongo_ids]
+            for i in range(0, len(removed_ids), 1000):
+                await asyncio.to_thread(self.chroma_collection.delete, ids=removed_ids[i:i+1000])
+
+        if on_batch:
+            on_batch(stats["batches_upserted"], stats["batches_queued"])
+        logger.info(
+            f"Sincronización de '{self.chroma_collection_name}' completada: {stats['added']} nuevas, "
+            f"{stats['updated']} actualizadas, {stats['metadata_updated']} solo metadatos, "
+            f"{stats['unchanged']} sin cambios, {len(removed_ids)} eliminadas."
+        )
+        return {
+            "status": "success",
+            "synced_count": stats["upserted"] + stats["metadata_updated"],
+            "added": stats["added"],
+            "updated": stats["updated"],
+            "metadata_updated": stats["metadata_updated"],
+            "unchanged": stats["unchanged"],
+            "removed": len(removed_ids),
+        }
 
-        for prop in incoming_properties:
+    def _index_incoming(self, properties: list) -> dict:
+        """Agrupa las propiedades entrantes por id (la última ocurrencia de un id prevalece)."""
+        incoming = {}
+        for prop in properties:
             prop_id = prop.get("id")
+            if prop_id:
+                incoming[prop_id] = prop
+        return incoming
+
+    async def _fetch_existing_prices(self, ids: list) -> dict:
+        """Obtiene en una sola consulta `$in` el precio actual de las propiedades existentes."""
+        if not ids:
+            return {}
+        cursor = self.collection.find({"id": {"$in": ids}}, {"_id": 0, "id": 1, "precio": 1})
+        return {doc["id"]: doc.get("precio") or {} async for doc in cursor}
+
+    def _plan_price_updates(self, incoming: dict, existing: dict) -> dict:
+        """Calcula en memoria las propiedades existentes cuyo precio cambió ({id: nuevo precio})."""
+        updates = {}
+        for prop_id, prop in incoming.items():
             incoming_price = prop.get("precio")
-
-            if not prop_id or not incoming_price:
+            if not incoming_price or prop_id not in existing:
                 continue
+            existing_price = existing[prop_id]
+            if existing_price.get('precio_desde') != incoming_price.get('precio_desde') or \
+               existing_price.get('precio_hasta') != incoming_price.get('precio_hasta'):
+                updates[prop_id] = incoming_price
+        return updates
+
+    def _update_operations(self, incoming: dict, ids: list) -> list:
+        """
+        Actualiza todos los campos recibidos de las propiedades existentes (título,
+        servicios, tipologías, unidades, precio...), no solo el precio.
+        """
+        return [
+            UpdateOne({"id": prop_id}, {"$set": {key: value for key, value in incoming[prop_id].items() if key != "_id"}})
+            for prop_id in ids
+        ]
 
-            existing_prop = self.collection.find_one({"id": prop_id})
-
-            if existing_prop:
-                existing_price = existing_prop.get("precio", {})
-                
-                # Comprobar si los precios son diferentes
-                if existing_price.get('precio_desde') != incoming_price.get('precio_desde') or \
-                   existing_price.get('precio_hasta') != incoming_price.get('precio_hasta'):
-                    
-                    # Actualizar solo el campo de precio
-                    update_result = self.collection.update_one(
-                        {"id": prop_id},
-                        {"$set": {"precio": incoming_price}}
-                    )
-
-                    if update_result.modified_count > 0:
-                        updated_count += 1
-                        updated_ids.append(prop_id)
-        
+    def _skipped_price_summary(self) -> dict:
+        return {
+            "status": "skipped",
+            "message": "La colección está vacía, no se realizó ninguna comparación de precios."
+        }
+
+    def _price_summary(self, updates: dict) -> dict:
+        updated_ids = list(updates)
         return {
             "status": "success",
-            "updated_price_count": updated_count,
+            "updated_price_count": len(updated_ids),
             "updated_ids": updated_ids
         }
 
-    async def load_deptos(self, deptos_data: dict) -> dict:
+    async def write_deptos(self, deptos_data: dict) -> dict:
         """
-        Carga los datos de las propiedades en MongoDB. Primero, actualiza los precios de
-        las propiedades existentes y luego inserta solo las propiedades nuevas.
+        Escribe las propiedades en MongoDB con una sola consulta `$in` y un único
+        `bulk_write` ordenado: actualiza todos los campos de las propiedades existentes
+        (nuevas y modificadas del delta del scraper), inserta las propiedades nuevas y
+        elimina las indicadas en la clave opcional 'eliminadas'. No sincroniza ChromaDB.
         :param deptos_data: Diccionario que contiene la lista de propiedades.
         :return: Resumen de la operación.
         """
         if "propiedades" not in deptos_data or not isinstance(deptos_data["propiedades"], list):
             return {"status": "error", "message": "El formato de datos es incorrecto. Se esperaba una clave 'propiedades' con una lista."}
 
-        # 1. Comparar y actualizar precios para propiedades existentes
-        price_update_summary = await self.compare_and_update_prices(deptos_data)
-
-        # 2. Insertar solo las propiedades nuevas
-        properties = deptos_data["propiedades"]
-        inserted_count = 0
-        inserted_ids = []
-
-        for prop in properties:
-            prop_id = prop.get("id")
-            if not prop_id:
-                continue
+        collection_was_empty = await self.collection.estimated_document_count() == 0
+        incoming = self._index_incoming(deptos_data["propiedades"])
+        existing = await self._fetch_existing_prices(list(incoming))
+
+        # 1. Propiedades existentes: se actualizan completas; los cambios de precio se informan aparte
+        updated_ids = [prop_id for prop_id in incoming if prop_id in existing]
+        price_updates = {} if collection_was_empty else self._plan_price_updates(incoming, existing)
+
+        # 2. Propiedades nuevas
+        inserted_ids = [prop_id for prop_id in incoming if prop_id not in existing]
+        inserts = [InsertOne(incoming[prop_id]) for prop_id in inserted_ids]
+
+        # 3. Propiedades que el scraper reporta como retiradas (payload delta)
+        removed_ids = list(dict.fromkeys(deptos_data.get("eliminadas") or []))
+        deletes = [DeleteMany({"id": {"$in": removed_ids}})] if removed_ids else []
+
+        operations = self._update_operations(incoming, updated_ids) + inserts + deletes
+        updated_count = deleted_count = 0
+        if operations:
+            result = await self.collection.bulk_write(operations, ordered=True)
+            updated_count = result.modified_count
+            deleted_count = result.deleted_count
+            logger.info(
+                f"Carga masiva: {result.inserted_count} insertadas, {updated_count} actualizadas, "
+                f"{deleted_count} eliminadas ({len(operations)} operaciones)."
+            )
 
-            exists = self.collection.count_documents({"id": prop_id}) > 0
-            if not exists:
-                self.collection.insert_one(prop)
-                inserted_count += 1
-                inserted_ids.append(prop_id)
-        
-        # 3. Sincronizar todos los datos con ChromaDB
-        chroma_sync_summary = await self.sync_mongo_to_chroma()
+        price_update_summary = self._skipped_price_summary() if collection_was_empty else self._price_summary(price_updates)
 
         return {
             "status": "success",
-            "inserted_count": inserted_count,
+            "inserted_count": len(inserted_ids),
             "inserted_ids": inserted_ids,
+            "updated_count": updated_count,
+            "deleted_count": deleted_count,
             "price_update_summary": price_update_summary,
-            "chroma_sync_summary": chroma_sync_summary
         }
     
 load_data_service = LoadDataService()
\ No newline at end of file
@@ -0,0 +1,86 @@
+import json
+import zlib
+from typing import Any, AsyncIterator, Dict, List
+
+MAX_LINE_BYTES = 1024 * 1024
+# Maximum decompressed bytes produced per step, so a small, highly compressed
+# chunk cannot expand into an unbounded buffer before the line limit is checked
+DECOMPRESS_STEP_BYTES = 64 * 1024
+
+
+class NDJSONFormatError(ValueError):
+    """Raised when a streamed upload is not valid (gzip) NDJSON."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], compressed: bool) -> AsyncIterator[bytes]:
+    """
+    Yields the lines of a streamed body, decompressing gzip incrementally with zlib
+    in steps of at most `DECOMPRESS_STEP_BYTES`, so that only the current step and a
+    partial line are held in memory.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+    pending = b""
+    async for chunk in chunks:
+        while chunk:
+            if decompressor is None:
+                data, chunk = chunk, b""
+            else:
+                try:
+                    data = decompressor.decompress(chunk, DECOMPRESS_STEP_BYTES)
+                except zlib.error as e:
+                    raise NDJSONFormatError(f"Body is not valid gzip: {e}") from e
+                chunk = decompressor.unconsumed_tail
+            pending += data
+            *lines, pending = pending.split(b"\n")
+            for line in lines:
+                yield line
+            if len(pending) > MAX_LINE_BYTES:
+                raise NDJSONFormatError(f"Line exceeds {MAX_LINE_BYTES} bytes.")
+
+    if decompressor is not None:
+        try:
+            pending += decompressor.flush()
+        except zlib.error as e:
+            raise NDJSONFormatError(f"Body is not valid gzip: {e}") from e
+        if not decompressor.eof:
+            raise NDJSONFormatError("Truncated gzip body.")
+    if pending:
+        yield pending
+
+
+async def iter_batches(chunks: AsyncIterator[bytes], compressed: bool, batch_size: int) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Groups the streamed NDJSON records into `/load-deptos` payloads of at most
+    `batch_size` properties.
+
+    Each line is a property object. A line with an `eliminadas` key (and no `id`)
+    lists removed property ids, as in the scraper's delta payload; those ids travel
+    with the next yielded batch.
+    """
+    propiedades: List[Dict[str, Any]] = []
+    eliminadas: List[Any] = []
+    line_number = 0
+    async for line in iter_lines(chunks, compressed):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise NDJSONFormatError(f"Invalid JSON on line {line_number}: {e}") from e
+        if not isinstance(record, dict):
+            raise NDJSONFormatError(f"Line {line_number} is not a JSON object.")
+
+        if "id" not in record and "eliminadas" in record:
+            if not isinstance(record["eliminadas"], list):
+                raise NDJSONFormatError(f"'eliminadas' on line {line_number} must be a list.")
+            eliminadas.extend(record["eliminadas"])
+            continue
+
+        propiedades.append(record)
+        if len(propiedades) >= batch_size:
+            yield {"propiedades": propiedades, "eliminadas": eliminadas}
+            propiedades, eliminadas = [], []
+
+    if propiedades or eliminadas:
+        yield {"propiedades": propiedades, "eliminadas": eliminadas}
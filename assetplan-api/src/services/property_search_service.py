@@ -0,0 +1,147 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional
+
+from src.schemas.properties import PropertyFilters, PropertyPage, PropertySort
+
+PRICE_FIELD = "precio.precio_desde_uf"
+
+# Campos de primer nivel que se pueden pedir en `fields`
+PROJECTABLE_FIELDS = {
+    "id", "informacion_basica", "precio", "servicios_disponibles", "caracteristicas", "tipologias",
+    "dormitorios", "unidades_disponibles", "imagenes", "unidades", "servicios_especiales",
+}
+# Sin `fields` se omiten los campos pesados
+DEFAULT_PROJECTION = {"_id": 0, "imagenes": 0, "unidades": 0}
+SERVICE_FLAGS = ("tiene_descuento", "garantia_cuotas", "sin_aval", "servicio_pro")
+
+
+class PropertyQueryError(ValueError):
+    """Raised for invalid search parameters (unknown fields, malformed cursor)."""
+
+
+class PropertySearchService:
+    """
+    Búsqueda estructurada de propiedades directamente en MongoDB, sin embeddings.
+
+    Los resultados se ordenan por precio desde (UF) con el `id` como desempate, y se
+    paginan por keyset: el cursor guarda el (precio, id) de la última fila, de modo que
+    cada página es una consulta por rango sobre los índices compuestos
+    `(precio, id)` y `(comuna, precio, id)` en lugar de un `skip` creciente.
+    """
+
+    def build_filter(self, filters: PropertyFilters) -> Dict[str, Any]:
+        """Traduce los filtros de la consulta a un filtro de MongoDB."""
+        query: Dict[str, Any] = {}
+        if filters.comuna:
+            query["informacion_basica.comuna"] = {"$in": filters.comuna}
+
+        price: Dict[str, Any] = {}
+        if filters.precio_min_uf is not None:
+            price["$gte"] = filters.precio_min_uf
+        if filters.precio_max_uf is not None:
+            price["$lte"] = filters.precio_max_uf
+        if price:
+            query[PRICE_FIELD] = price
+
+        if filters.dormitorios is not None:
+            # Una tipología con esa cantidad exacta, o una "N+ dormitorios" con N <= pedido
+            query["tipologias"] = {"$elemMatch": {"$or": [
+                {"dormitorios": filters.dormitorios},
+                {"dormitorios_es_minimo": True, "dormitorios": {"$lte": filters.dormitorios}},
+            ]}}
+
+        for flag in SERVICE_FLAGS:
+            value = getattr(filters, flag)
+            if value is not None:
+                query[f"servicios_especiales.{flag}"] = value
+        return query
+
+    def build_projection(self, fields: Optional[List[str]]) -> Dict[str, int]:
+        """Proyección pedida en `fields`; `id` y el precio siempre se incluyen para el cursor."""
+        if not fields:
+            return dict(DEFAULT_PROJECTION)
+        unknown = [field for field in fields if field.split(".")[0] not in PROJECTABLE_FIELDS]
+        if unknown:
+            raise PropertyQueryError(f"Unknown fields: {', '.join(unknown)}.")
+        projection = {"_id": 0, "id": 1, PRICE_FIELD: 1}
+        for field in fields:
+            # Un campo padre ya incluye a sus subcampos (y MongoDB rechaza pedir ambos)
+            if not any(field.startswith(f"{other}.") for other in fields if other != field):
+                projection[field] = 1
+        if "precio" in fields:
+            projection.pop(PRICE_FIELD, None)
+        return projection
+
+    def encode_cursor(self, sort: PropertySort, price: Any, prop_id: Any) -> str:
+        raw = json.dumps([sort.value, price, prop_id], separators=(",", ":")).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    def decode_cursor(self, cursor: str, sort: PropertySort) -> tuple:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            cursor_sort, price, prop_id = json.loads(base64.urlsafe_b64decode(padded))
+        except (ValueError, TypeError) as e:
+            raise PropertyQueryError("Malformed cursor.") from e
+        if cursor_sort != sort.value:
+            raise PropertyQueryError("Cursor was issued for a different sort order.")
+        return price, prop_id
+
+    def keyset_filter(self, sort: PropertySort, price: Any, prop_id: Any) -> Dict[str, Any]:
+        """
+        Filas posteriores a (precio, id) en el orden pedido. MongoDB ordena los precios
+        nulos antes de los números, así que van primero en ascendente y al final en descendente.
+        """
+        if sort == PropertySort.PRECIO_ASC:
+            if price is None:
+                return {"$or": [{PRICE_FIELD: None, "id": {"$gt": prop_id}}, {PRICE_FIELD: {"$ne": None}}]}
+            return {"$or": [{PRICE_FIELD: {"$gt": price}}, {PRICE_FIELD: price, "id": {"$gt": prop_id}}]}
+
+        if price is None:
+            return {PRICE_FIELD: None, "id": {"$lt": prop_id}}
+        return {"$or": [
+            {PRICE_FIELD: {"$lt": price}},
+            {PRICE_FIELD: price, "id": {"$lt": prop_id}},
+            {PRICE_FIELD: None},
+        ]}
+
+    async def search(
+        self,
+        collection,
+        filters: PropertyFilters,
+        sort: PropertySort = PropertySort.PRECIO_ASC,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> PropertyPage:
+        """
+        Busca propiedades con filtros estructurados.
+
+        :param collection: Colección de propiedades (cliente asíncrono de MongoDB).
+        :param filters: Filtros de la consulta.
+        :param sort: Orden por precio desde (UF).
+        :param limit: Tamaño de la página.
+        :param cursor: Cursor `next_cursor` de la página anterior.
+        :param fields: Campos a devolver (rutas con punto permitidas).
+        :return: Página de resultados con el cursor de la siguiente.
+        """
+        query = self.build_filter(filters)
+        if cursor:
+            keyset = self.keyset_filter(sort, *self.decode_cursor(cursor, sort))
+            query = {"$and": [query, keyset]} if query else keyset
+
+        direction = 1 if sort == PropertySort.PRECIO_ASC else -1
+        documents = await collection.find(query, self.build_projection(fields)) \
+            .sort([(PRICE_FIELD, direction), ("id", direction)]) \
+            .limit(limit + 1) \
+            .to_list(None)
+
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            last = documents[-1]
+            next_cursor = self.encode_cursor(sort, (last.get("precio") or {}).get("precio_desde_uf"), last["id"])
+        return PropertyPage(items=documents, count=len(documents), sort=sort, next_cursor=next_cursor)
+
+
+property_search_service = PropertySearchService()
@@ -1,16 +1,11 @@
 import uuid
 from typing import Dict, Any, List, Optional
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine, func
-from src.core.config import settings
+from sqlalchemy import func
+from src.database.postgres_config import open_session
 from src.models.chat_session import ChatSession
 from src.models.user import User
 from src.core.logging import logger
 
-# Usa la misma configuración de base de datos que crud.py
-engine = create_engine(settings.POSTGRES_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 class SessionService:
     """Servicio para manejar operaciones de sesiones de chat usando SQLAlchemy"""
     
@@ -19,7 +14,7 @@ class SessionService:
 
     def create_chat_session(self, user_id: str) -> Dict[str, Any]:
         """Crea una nueva sesión de chat para un usuario"""
-        db = SessionLocal()
+        db = open_session()
         try:
             thread_id = str(uuid.uuid4())
             
@@ -49,7 +44,7 @@ class SessionService:
 
     def get_user_sessions(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Obtiene las sesiones de un usuario"""
-        db = SessionLocal()
+        db = open_session()
         try:
             sessions = (
                 db.query(ChatSession)
@@ -83,7 +78,7 @@ class SessionService:
 
     def get_session_by_thread_id(self, thread_id: str) -> Dict[str, Any]:
         """Obtiene una sesión por su thread_id"""
-        db = SessionLocal()
+        db = open_session()
         try:
             session = (
                 db.query(ChatSession)
@@ -114,7 +109,7 @@ class SessionService:
 
     def update_session_activity(self, thread_id: str):
         """Actualiza la actividad de una sesión"""
-        db = SessionLocal()
+        db = open_session()
         try:
             session = db.query(ChatSession).filter(ChatSession.thread_id == thread_id).first()
             if session:
@@ -133,7 +128,7 @@ class SessionService:
 
     def set_session_title(self, thread_id: str, title: str):
         """Establece el título de una sesión"""
-        db = SessionLocal()
+        db = open_session()
         try:
             session = db.query(ChatSession).filter(ChatSession.thread_id == thread_id).first()
             if session:
@@ -151,7 +146,7 @@ class SessionService:
 
     def delete_session(self, user_id: str, thread_id: str) -> bool:
         """Elimina una sesión específica de un usuario"""
-        db = SessionLocal()
+        db = open_session()
         try:
             session = (
                 db.query(ChatSession)
@@ -178,7 +173,7 @@ class SessionService:
 
     def auto_generate_title(self, thread_id: str, messages: list):
         """Genera automáticamente un título basado en el primer mensaje"""
-        db = SessionLocal()
+        db = open_session()
         try:
             session = db.query(ChatSession).filter(ChatSession.thread_id == thread_id).first()
             
@@ -200,7 +195,7 @@ class SessionService:
 
     def get_all_active_sessions(self, limit: int = 100) -> List[str]:
         """Obtiene todos los thread_id de las sesiones activas"""
-        db = SessionLocal()
+        db = open_session()
         try:
             sessions = (
                 db.query(ChatSession.thread_id)
@@ -218,7 +213,7 @@ class SessionService:
 
     def get_session_stats(self, user_id: str) -> Dict[str, Any]:
         """Obtiene estadísticas de las sesiones de un usuario"""
-        db = SessionLocal()
+        db = open_session()
         try:
             total_sessions = db.query(ChatSession).filter(ChatSession.user_id == user_id).count()
             active_sessions = db.query(ChatSession).filter(
@@ -0,0 +1,82 @@
+import json
+import zlib
+from typing import Any, Dict, List
+
+FORMAT_NAME = "assetplan-columnar"
+FORMAT_VERSION = 1
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when an uploaded snapshot is not a valid columnar snapshot."""
+
+
+class SnapshotTooLargeError(SnapshotFormatError):
+    """Raised when a gzip snapshot decompresses beyond the allowed size."""
+
+
+def _unflatten(flat: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuilds nested dicts from dotted column paths ("precio.precio_desde_uf")."""
+    obj: Dict[str, Any] = {}
+    for path, value in flat.items():
+        target = obj
+        *parents, leaf = path.split(".")
+        for key in parents:
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        if value is None and isinstance(target.get(leaf), dict):
+            continue
+        target[leaf] = value
+    return obj
+
+
+def decode_snapshot(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Decodes the columnar snapshot written by the scraper (`snapshot.py`) into the
+    same list of properties accepted by `/load-deptos`.
+    """
+    if document.get("formato") != FORMAT_NAME or document.get("version") != FORMAT_VERSION:
+        raise SnapshotFormatError("Unsupported snapshot format or version.")
+
+    try:
+        dictionary = document["diccionario"]
+        rows: List[Dict[str, Any]] = [{} for _ in range(document["filas"])]
+        for path, column in document["columnas"].items():
+            kind = column["tipo"]
+            for row, value in zip(rows, column["valores"]):
+                if kind == "dict":
+                    value = None if value is None else dictionary[value]
+                elif kind == "lista_dict":
+                    value = [dictionary[item] for item in value]
+                row[path] = value
+    except (KeyError, IndexError, TypeError) as e:
+        raise SnapshotFormatError(f"Malformed snapshot: {e}") from e
+
+    return [_unflatten(row) for row in rows]
+
+
+def _gunzip(data: bytes, max_bytes: int) -> bytes:
+    """Decompresses a gzip snapshot producing at most `max_bytes`."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        document = decompressor.decompress(data, max_bytes + 1)
+    except zlib.error as e:
+        raise SnapshotFormatError(f"Snapshot is not valid gzip/JSON: {e}") from e
+    if len(document) > max_bytes:
+        raise SnapshotTooLargeError(f"Decompressed snapshot exceeds {max_bytes} bytes.")
+    if not decompressor.eof:
+        raise SnapshotFormatError("Snapshot is not valid gzip/JSON: truncated gzip data.")
+    return document
+
+
+def load_snapshot_bytes(data: bytes, max_bytes: int) -> List[Dict[str, Any]]:
+    """Decompresses (gzip, up to `max_bytes`) and decodes a columnar snapshot upload."""
+    if data[:2] == b"\x1f\x8b":
+        data = _gunzip(data, max_bytes)
+    try:
+        document = json.loads(data)
+    except ValueError as e:
+        raise SnapshotFormatError(f"Snapshot is not valid gzip/JSON: {e}") from e
+    if not isinstance(document, dict):
+        raise SnapshotFormatError("Snapshot must be a JSON object.")
+    return decode_snapshot(document)
@@ -1,7 +1,7 @@
 from typing import Dict, Any
 from src.models.user import User
 from src.core.logging import logger
-from src.database.postgres_config import SessionLocal
+from src.database.postgres_config import open_session
 
 class UserService:
     """Servicio para manejar operaciones de usuarios usando SQLAlchemy"""
@@ -14,7 +14,7 @@ class UserService:
         username: str = None,
     ) -> Dict[str, Any]:
         """Crea un usuario o lo obtiene si ya existe"""
-        db = SessionLocal()
+        db = open_session()
         try:
             # Buscar usuario existente
             new_user = User(
@@ -35,7 +35,7 @@ class UserService:
             
     def get_all_users(self, limit: int = 100) -> list:
         """Obtiene todos los usuarios"""
-        db = SessionLocal()
+        db = open_session()
         try:
             users = db.query(User).order_by(User.created_at.desc()).limit(limit).all()
             return [
@@ -0,0 +1,189 @@
+"""Dobles en memoria de la colección asíncrona de MongoDB para las pruebas de servicios."""
+import copy
+
+from pymongo.errors import OperationFailure
+
+
+def _get(doc, path):
+    for key in path.split("."):
+        doc = doc.get(key) if isinstance(doc, dict) else None
+    return doc
+
+
+def _order(value):
+    """Orden de MongoDB entre nulos y números: los nulos (o ausentes) van primero."""
+    return (0, 0) if value is None else (1, value)
+
+
+def _compare(value, condition):
+    if not isinstance(condition, dict) or not any(key.startswith("$") for key in condition):
+        return value == condition
+    for operator, operand in condition.items():
+        if operator == "$in":
+            matched = value in operand
+        elif operator == "$ne":
+            matched = value != operand
+        elif operator == "$elemMatch":
+            matched = isinstance(value, list) and any(_matches(item, operand) for item in value)
+        elif value is None:
+            matched = False
+        else:
+            matched = {"$gt": value > operand, "$gte": value >= operand,
+                       "$lt": value < operand, "$lte": value <= operand}[operator]
+        if not matched:
+            return False
+    return True
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$and":
+            matched = all(_matches(doc, clause) for clause in condition)
+        elif key == "$or":
+            matched = any(_matches(doc, clause) for clause in condition)
+        else:
+            matched = _compare(_get(doc, key), condition)
+        if not matched:
+            return False
+    return True
+
+
+def _project(doc, projection):
+    if not projection:
+        return copy.deepcopy(doc)
+    included = [key for key, flag in projection.items() if flag and key != "_id"]
+    if included:
+        projected = {}
+        for path in included:
+            value = _get(doc, path)
+            if value is None:
+                continue
+            *parents, leaf = path.split(".")
+            target = projected
+            for parent in parents:
+                target = target.setdefault(parent, {})
+            target[leaf] = copy.deepcopy(value)
+        return projected
+    return {key: copy.deepcopy(value) for key, value in doc.items() if projection.get(key, 1)}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.docs.sort(key=lambda doc: _order(_get(doc, field)), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self.docs = self.docs[:count]
+        return self
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+    async def to_list(self, length=None):
+        return list(self.docs)
+
+
+class BulkResult:
+    def __init__(self, inserted_count=0, modified_count=0, deleted_count=0):
+        self.inserted_count = inserted_count
+        self.modified_count = modified_count
+        self.deleted_count = deleted_count
+
+
+class FakeAsyncCollection:
+    """
+    Soporta las operaciones que usa `LoadDataService` (find, conteo y bulk_write) y las de
+    índices que usa `reconcile_indexes`, registrando el orden de creación y eliminación.
+    """
+
+    def __init__(self, docs=(), indexes=None, failing_indexes=()):
+        self.docs = [copy.deepcopy(doc) for doc in docs]
+        self.bulk_writes = []
+        self.indexes = {"_id_": {"key": [("_id", 1)]}, **copy.deepcopy(indexes or {})}
+        self.failing_indexes = set(failing_indexes)
+        self.index_operations = []
+
+    def find(self, query=None, projection=None, **kwargs):
+        return FakeCursor([_project(doc, projection) for doc in self.docs if _matches(doc, query or {})])
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def bulk_write(self, operations, ordered=True):
+        self.bulk_writes.append(operations)
+        result = BulkResult()
+        for operation in operations:
+            kind = type(operation).__name__
+            if kind == "InsertOne":
+                self.docs.append(copy.deepcopy(operation._doc))
+                result.inserted_count += 1
+            elif kind == "UpdateOne":
+                for doc in self.docs:
+                    if _matches(doc, operation._filter):
+                        changes = operation._doc["$set"]
+                        if any(doc.get(key) != value for key, value in changes.items()):
+                            doc.update(copy.deepcopy(changes))
+                            result.modified_count += 1
+                        break
+            elif kind == "DeleteMany":
+                kept = [doc for doc in self.docs if not _matches(doc, operation._filter)]
+                result.deleted_count += len(self.docs) - len(kept)
+                self.docs = kept
+        return result
+
+    async def index_information(self):
+        return copy.deepcopy(self.indexes)
+
+    async def create_indexes(self, models):
+        for model in models:
+            spec = dict(model.document)
+            name, key = spec.pop("name"), list(spec.pop("key").items())
+            if name in self.failing_indexes:
+                raise OperationFailure(f"E11000 duplicate key error building index {name}")
+            current = self.indexes.get(name)
+            if current is not None:
+                if current != {"key": key, **spec}:
+                    raise OperationFailure(f"An existing index has the same name as the requested index: {name}")
+                continue
+            if any(info["key"] == key for info in self.indexes.values()):
+                raise OperationFailure(f"Index already exists with a different name: {name}")
+            self.indexes[name] = {"key": key, **spec}
+            self.index_operations.append(("create", name))
+
+    async def drop_index(self, name):
+        del self.indexes[name]
+        self.index_operations.append(("drop", name))
+
+
+class FakeChromaCollection:
+    """Colección de Chroma en memoria: get por ids o por páginas, update, upsert y delete."""
+
+    def __init__(self):
+        self.records = {}
+        self.embedded_ids = []
+
+    def get(self, ids=None, include=(), limit=None, offset=0):
+        selected = [doc_id for doc_id in (ids if ids is not None else list(self.records)) if doc_id in self.records]
+        if limit is not None:
+            selected = selected[offset:offset + limit]
+        return {"ids": selected, "metadatas": [dict(self.records[doc_id]["metadata"]) for doc_id in selected]}
+
+    def update(self, ids, metadatas):
+        for doc_id, metadata in zip(ids, metadatas):
+            self.records[doc_id]["metadata"] = dict(metadata)
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.embedded_ids.extend(ids)
+        for doc_id, document, metadata, embedding in zip(ids, documents, metadatas, embeddings):
+            self.records[doc_id] = {"document": document, "metadata": dict(metadata), "embedding": embedding}
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.records.pop(doc_id, None)
@@ -0,0 +1,52 @@
+from src.database import embedding_cache
+from src.database.embedding_cache import CachedEmbeddingFunction, EmbeddingCache
+
+
+class CountingEmbedding:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [[float(len(text)), 1.0] for text in input]
+
+
+def cached_function(tmp_path):
+    inner = CountingEmbedding()
+    return CachedEmbeddingFunction(inner, EmbeddingCache(str(tmp_path / "cache.sqlite3")), "test"), inner
+
+
+def test_repeated_texts_in_a_batch_are_not_cache_hits(tmp_path, monkeypatch):
+    messages = []
+    monkeypatch.setattr(embedding_cache.logger, "info", messages.append)
+    function, inner = cached_function(tmp_path)
+
+    vectors = function(["a", "bb", "a"])
+
+    assert inner.calls == [["a", "bb"]]
+    assert [list(vector) for vector in vectors] == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert (function.hits, function.misses) == (0, 2)
+    assert messages == ["Embeddings: 0 desde caché, 2 calculados."]
+
+
+def test_cached_texts_are_not_embedded_again(tmp_path):
+    function, inner = cached_function(tmp_path)
+    function(["a", "bb"])
+
+    function(["bb", "ccc", "bb"])
+
+    assert inner.calls == [["a", "bb"], ["ccc"]]
+    assert (function.hits, function.misses) == (1, 3)
+
+
+def test_build_from_config_rebuilds_the_openai_function_with_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CHROMA_OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(embedding_cache.settings, "EMBEDDING_CACHE_PATH", str(tmp_path / "cache.sqlite3"))
+    config = {"api_key_env_var": "CHROMA_OPENAI_API_KEY", "model_name": "text-embedding-3-small"}
+
+    function = CachedEmbeddingFunction.build_from_config(config)
+
+    assert isinstance(function, CachedEmbeddingFunction)
+    assert function.model_name == "openai:text-embedding-3-small"
+    assert function.get_config()["model_name"] == "text-embedding-3-small"
+    function.cache.close()
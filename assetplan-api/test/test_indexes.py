@@ -0,0 +1,57 @@
+import asyncio
+
+from fakes import FakeAsyncCollection
+from src.database.indexes import PROPERTY_INDEXES, reconcile_indexes
+
+PRICE_KEY = [("precio.precio_desde_uf", 1), ("id", 1)]
+
+
+def reconcile(collection):
+    return asyncio.run(reconcile_indexes(collection))
+
+
+def test_missing_indexes_are_created_and_matching_ones_left_alone():
+    collection = FakeAsyncCollection(indexes={"precio_desde_uf": {"key": PRICE_KEY}})
+
+    summary = reconcile(collection)
+
+    assert summary["created"] == ["id_unique", "comuna"]
+    assert summary["unchanged"] == ["precio_desde_uf"]
+    assert ("drop", "precio_desde_uf") not in collection.index_operations
+
+
+def test_redefined_index_is_built_before_the_old_one_is_dropped():
+    collection = FakeAsyncCollection(indexes={
+        "id_unique": {"key": [("id", 1)], "unique": True},
+        "comuna": {"key": [("informacion_basica.comuna", 1)]},
+        "precio_viejo": {"key": PRICE_KEY},
+    })
+
+    summary = reconcile(collection)
+
+    assert summary["recreated"] == ["comuna", "precio_desde_uf"]
+    assert collection.index_operations == [
+        ("create", "comuna_reconcile"), ("drop", "comuna"), ("create", "comuna"), ("drop", "comuna_reconcile"),
+        ("create", "precio_desde_uf_reconcile"), ("drop", "precio_viejo"),
+        ("create", "precio_desde_uf"), ("drop", "precio_desde_uf_reconcile"),
+    ]
+    assert set(collection.indexes) == {"_id_"} | {model.document["name"] for model in PROPERTY_INDEXES}
+
+
+def test_failed_build_keeps_the_temporary_index_serving_queries():
+    collection = FakeAsyncCollection(
+        indexes={"id_unique": {"key": [("id", 1)]}},
+        failing_indexes={"id_unique"},
+    )
+
+    summary = reconcile(collection)
+
+    assert "id_unique" in summary["failed"]
+    assert collection.indexes["id_unique_reconcile"]["key"] == [("id", 1), ("_id", 1)]
+
+    # En la siguiente ejecución se crea el declarado y se elimina el temporal
+    collection.failing_indexes.clear()
+    summary = reconcile(collection)
+
+    assert summary["created"] == ["id_unique"]
+    assert "id_unique_reconcile" not in collection.indexes
@@ -0,0 +1,149 @@
+import asyncio
+
+from src.services import ingestion_jobs
+from src.services.ingestion_jobs import COMPLETED, FAILED, IngestionJobManager
+
+
+class RecordingService:
+    """Sustituye a `load_data_service`: registra escrituras y sincronizaciones."""
+
+    def __init__(self, failing_payloads=(), sync_error=None):
+        self.written = []
+        self.syncs = 0
+        self.sync_calls = []
+        self.failing_payloads = failing_payloads
+        self.sync_error = sync_error
+
+    async def write_deptos(self, payload):
+        if payload in self.failing_payloads:
+            return {"status": "error", "message": "formato incorrecto"}
+        self.written.append(payload)
+        return {"status": "success", "inserted_count": len(payload["propiedades"])}
+
+    async def sync_mongo_to_chroma(self, on_batch=None, ids=None, remove_stale=True):
+        self.syncs += 1
+        self.sync_calls.append({"ids": ids, "remove_stale": remove_stale})
+        if self.sync_error:
+            raise self.sync_error
+        on_batch(1, 1)
+        return {"status": "success"}
+
+
+def run_batch(monkeypatch, service, submit, full_sync_pending=True):
+    """Encola trabajos con el worker detenido y procesa la cola acumulada como un solo lote."""
+    monkeypatch.setattr(ingestion_jobs, "load_data_service", service)
+
+    async def scenario():
+        manager = IngestionJobManager()
+        manager._queue = asyncio.Queue()
+        manager._full_sync_pending = full_sync_pending
+        task_ids = submit(manager)
+        await manager._process(manager._drain(manager._queue.get_nowait()))
+        return manager, task_ids
+
+    return asyncio.run(scenario())
+
+
+def test_queued_jobs_share_a_single_chroma_sync(monkeypatch):
+    service = RecordingService()
+
+    manager, task_ids = run_batch(monkeypatch, service, lambda manager: [
+        manager.submit({"propiedades": [{"id": 1}]}),
+        manager.submit({"propiedades": [{"id": 2}, {"id": 3}]}),
+        manager.submit_written({"inserted_count": 4}, 4, source="stream"),
+    ])
+
+    assert service.syncs == 1
+    assert len(service.written) == 2
+    for task_id in task_ids:
+        job = manager.get(task_id)
+        assert job["status"] == COMPLETED
+        assert job["result"]["coalesced_jobs"] == 3
+        assert job["progress"]["batches_embedded"] == 1
+
+
+def test_failed_write_does_not_block_the_rest_of_the_batch(monkeypatch):
+    bad = {"propiedades": [{"id": 9}]}
+    service = RecordingService(failing_payloads=[bad])
+
+    manager, (failed, ok) = run_batch(monkeypatch, service, lambda manager: [
+        manager.submit(bad),
+        manager.submit({"propiedades": [{"id": 1}]}),
+    ])
+
+    assert manager.get(failed)["status"] == FAILED
+    assert manager.get(failed)["error_message"] == "formato incorrecto"
+    assert manager.get(ok)["result"]["coalesced_jobs"] == 1
+    assert service.syncs == 1
+
+
+def test_sync_requests_without_jobs_run_one_sync(monkeypatch):
+    service = RecordingService()
+
+    def submit(manager):
+        manager.request_sync()
+        manager.request_sync()
+        return []
+
+    run_batch(monkeypatch, service, submit)
+
+    assert service.syncs == 1
+
+
+def test_failed_sync_fails_every_written_job(monkeypatch):
+    service = RecordingService(sync_error=RuntimeError("chroma caído"))
+
+    manager, task_ids = run_batch(monkeypatch, service, lambda manager: [
+        manager.submit({"propiedades": [{"id": 1}]}),
+        manager.submit({"propiedades": [{"id": 2}]}),
+    ])
+
+    for task_id in task_ids:
+        assert manager.get(task_id)["status"] == FAILED
+        assert "chroma caído" in manager.get(task_id)["error_message"]
+
+
+def test_batch_sync_requests_only_sync_their_ids(monkeypatch):
+    service = RecordingService()
+
+    def submit(manager):
+        manager.request_sync([1, 2])
+        manager.request_sync([3])
+        return []
+
+    run_batch(monkeypatch, service, submit, full_sync_pending=False)
+
+    assert service.sync_calls == [{"ids": [1, 2, 3], "remove_stale": False}]
+
+
+def test_final_sync_runs_the_removal_pass_once(monkeypatch):
+    service = RecordingService()
+
+    def submit(manager):
+        manager.request_sync([1])
+        return [
+            manager.submit({"propiedades": [{"id": 2}]}),
+            manager.submit_written({"inserted_count": 1}, 1, source="stream"),
+        ]
+
+    run_batch(monkeypatch, service, submit, full_sync_pending=False)
+
+    assert service.sync_calls == [{"ids": [1, 2], "remove_stale": True}]
+
+
+def test_first_sync_and_sync_after_a_failure_read_the_whole_catalog(monkeypatch):
+    service = RecordingService(sync_error=RuntimeError("chroma caído"))
+    monkeypatch.setattr(ingestion_jobs, "load_data_service", service)
+
+    async def scenario():
+        manager = IngestionJobManager()
+        manager._full_sync_pending = False
+        await manager._process([["1"]])
+        service.sync_error = None
+        await manager._process([["2"]])
+        await manager._process([["3"]])
+
+    asyncio.run(scenario())
+
+    assert [call["ids"] for call in service.sync_calls] == [["1"], None, ["3"]]
+    assert IngestionJobManager()._full_sync_pending
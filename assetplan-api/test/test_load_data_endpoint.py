@@ -0,0 +1,107 @@
+import gzip
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.endpoints import load_data
+from src.api.endpoints.load_data import load_data_router
+
+
+def make_client():
+    app = FastAPI()
+    app.include_router(load_data_router())
+    return TestClient(app)
+
+
+def test_snapshot_with_invalid_gzip_body_is_rejected():
+    client = make_client()
+    headers = {"Content-Encoding": "gzip"}
+
+    not_gzip = client.post("/load-deptos/snapshot", content=b"not gzip", headers=headers)
+    truncated = client.post("/load-deptos/snapshot", content=gzip.compress(b"{}" * 1000)[:20], headers=headers)
+
+    assert not_gzip.status_code == 400
+    assert truncated.status_code == 400
+    assert "gzip" in not_gzip.json()["detail"]
+
+
+def test_gzip_body_over_the_decompressed_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr(load_data.settings, "INGEST_MAX_DECOMPRESSED_BYTES", 64 * 1024)
+    client = make_client()
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+    # Cuerpo de unos pocos bytes comprimidos que se expande muy por encima del límite
+    bomb = gzip.compress(b'{"propiedades": [' + b" " * 1024 * 1024 + b"]}")
+
+    assert len(bomb) < 64 * 1024
+    assert client.post("/load-deptos/", content=bomb, headers=headers).status_code == 413
+    assert client.post("/load-deptos/snapshot", content=bomb, headers=headers).status_code == 413
+    # Instantánea .json.gz enviada sin Content-Encoding: la descomprime el códec
+    assert client.post("/load-deptos/snapshot", content=bomb).status_code == 413
+
+
+def test_load_deptos_with_invalid_gzip_body_is_rejected():
+    client = make_client()
+    headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+    response = client.post("/load-deptos/", content=b"not gzip", headers=headers)
+
+    assert response.status_code == 400
+    assert "gzip" in response.json()["detail"]
+
+
+class RecordingJobManager:
+    """Sustituye a `ingestion_job_manager`: registra las sincronizaciones pedidas."""
+
+    def __init__(self):
+        self.sync_requests = []
+        self.submitted = []
+
+    def request_sync(self, ids=None):
+        self.sync_requests.append(ids)
+
+    def submit_written(self, result, properties_total, source=None):
+        self.submitted.append(result)
+        return "task-1"
+
+
+def stream_test_client(monkeypatch, write_results):
+    """Cliente con el servicio y el gestor de trabajos sustituidos; escribe lotes de 2 propiedades."""
+    manager = RecordingJobManager()
+    results = iter(write_results)
+
+    async def write_deptos(batch):
+        return next(results)
+
+    monkeypatch.setattr(load_data, "ingestion_job_manager", manager)
+    monkeypatch.setattr(load_data.load_data_service, "write_deptos", write_deptos)
+    monkeypatch.setattr(load_data.settings, "INGEST_STREAM_BATCH_SIZE", 2)
+    return make_client(), manager
+
+
+def ndjson(*ids):
+    return "".join(json.dumps({"id": i}) + "\n" for i in ids).encode()
+
+
+OK = {"status": "success", "inserted_count": 2, "updated_count": 0,
+      "price_update_summary": {}, "deleted_count": 0}
+
+
+def test_stream_syncs_each_batch_by_id_and_leaves_the_final_sync_to_the_job(monkeypatch):
+    client, manager = stream_test_client(monkeypatch, [OK, OK])
+
+    response = client.post("/load-deptos/stream", content=ndjson("a", "b", "c", "d"))
+
+    assert response.status_code == 202
+    assert manager.sync_requests == [["a", "b"], ["c", "d"]]
+    assert len(manager.submitted) == 1
+
+
+def test_stream_failing_midway_still_requests_the_final_sync(monkeypatch):
+    client, manager = stream_test_client(monkeypatch, [OK, {"status": "error", "message": "Mongo caído"}])
+
+    response = client.post("/load-deptos/stream", content=ndjson("a", "b", "c", "d"))
+
+    assert response.status_code == 500
+    assert manager.sync_requests == [["a", "b"], None]
+    assert manager.submitted == []
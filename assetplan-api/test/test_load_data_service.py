@@ -0,0 +1,177 @@
+import asyncio
+
+from fakes import FakeAsyncCollection, FakeChromaCollection
+from src.services.load_data_service import LoadDataService
+
+
+def make_property(prop_id, titulo="Edificio", precio_desde="500000", **extra):
+    return {
+        "id": prop_id,
+        "informacion_basica": {"titulo": titulo, "comuna": "Santiago"},
+        "precio": {"precio_desde": precio_desde, "precio_hasta": "700000", "precio_desde_uf": 13},
+        "servicios_disponibles": [],
+        "caracteristicas": ["1 Dormitorio | 2 Disponibles"],
+        **extra,
+    }
+
+
+def service_with(monkeypatch, docs=()):
+    collection = FakeAsyncCollection(docs)
+    monkeypatch.setattr(LoadDataService, "collection", collection)
+    return LoadDataService(), collection
+
+
+def stored(collection, prop_id):
+    return next(doc for doc in collection.docs if doc["id"] == prop_id)
+
+
+def test_write_deptos_updates_every_field_of_modified_properties(monkeypatch):
+    service, collection = service_with(monkeypatch, [make_property(1), make_property(2)])
+
+    modified = make_property(
+        1,
+        titulo="Edificio Renovado",
+        servicios_disponibles=["Gimnasio"],
+        tipologias=[{"dormitorios": 1, "dormitorios_es_minimo": False}],
+        unidades=[{"numero": "101", "disponible": True}],
+    )
+    summary = asyncio.run(service.write_deptos({"propiedades": [modified]}))
+
+    assert summary["status"] == "success"
+    assert summary["inserted_count"] == 0
+    assert summary["updated_count"] == 1
+    assert summary["price_update_summary"]["updated_price_count"] == 0
+    doc = stored(collection, 1)
+    assert doc["informacion_basica"]["titulo"] == "Edificio Renovado"
+    assert doc["servicios_disponibles"] == ["Gimnasio"]
+    assert doc["tipologias"][0]["dormitorios"] == 1
+    assert doc["unidades"] == [{"numero": "101", "disponible": True}]
+    assert stored(collection, 2)["informacion_basica"]["titulo"] == "Edificio"
+
+
+def test_write_deptos_inserts_updates_and_deletes_in_one_ordered_bulk_write(monkeypatch):
+    service, collection = service_with(monkeypatch, [make_property(1), make_property(2)])
+
+    summary = asyncio.run(service.write_deptos({
+        "propiedades": [make_property(1, precio_desde="550000"), make_property(3)],
+        "eliminadas": [2],
+    }))
+
+    assert len(collection.bulk_writes) == 1
+    assert [type(op).__name__ for op in collection.bulk_writes[0]] == ["UpdateOne", "InsertOne", "DeleteMany"]
+    assert summary["inserted_ids"] == [3]
+    assert summary["deleted_count"] == 1
+    assert summary["price_update_summary"]["updated_ids"] == [1]
+    assert sorted(doc["id"] for doc in collection.docs) == [1, 3]
+    assert stored(collection, 1)["precio"]["precio_desde"] == "550000"
+
+
+def test_write_deptos_on_empty_collection_skips_price_comparison(monkeypatch):
+    service, collection = service_with(monkeypatch)
+
+    summary = asyncio.run(service.write_deptos({"propiedades": [make_property(1), make_property(1, titulo="Duplicado")]}))
+
+    assert summary["inserted_ids"] == [1]
+    assert summary["price_update_summary"]["status"] == "skipped"
+    assert [doc["informacion_basica"]["titulo"] for doc in collection.docs] == ["Duplicado"]
+
+
+def test_write_deptos_rejects_payload_without_property_list(monkeypatch):
+    service, _ = service_with(monkeypatch)
+
+    assert asyncio.run(service.write_deptos({"propiedades": {}}))["status"] == "error"
+
+
+def test_chroma_entry_keeps_images_in_metadata_but_not_in_description():
+    prop = make_property(1, imagenes=["https://cdn.test/1.jpg"])
+
+    description, metadata = LoadDataService()._prepare_chroma_entry(prop)
+
+    assert "cdn.test" not in description
+    assert metadata["imagenes"] == '["https://cdn.test/1.jpg"]'
+
+
+def test_bulk_plan_keeps_last_occurrence_and_reports_only_price_changes():
+    service = LoadDataService()
+    incoming = service._index_incoming([
+        make_property(1, precio_desde="500000"),
+        make_property(2, precio_desde="500000"),
+        make_property(1, precio_desde="450000"),
+        {"id": None},
+    ])
+    existing = {1: {"precio_desde": "500000", "precio_hasta": "700000"}, 2: {"precio_desde": "500000", "precio_hasta": "700000"}}
+
+    assert list(incoming) == [1, 2]
+    assert service._plan_price_updates(incoming, existing) == {1: incoming[1]["precio"]}
+    assert service._plan_price_updates({3: make_property(3)}, existing) == {}
+
+
+def sync_service(monkeypatch, docs, chroma):
+    collection = FakeAsyncCollection(docs)
+    embedded = []
+
+    def embed(documents):
+        embedded.append(list(documents))
+        return [[float(len(document))] for document in documents]
+
+    monkeypatch.setattr(LoadDataService, "collection", collection)
+    monkeypatch.setattr(LoadDataService, "chroma_collection", chroma)
+    monkeypatch.setattr(LoadDataService, "embedding_function", staticmethod(embed))
+    return LoadDataService(), collection, embedded
+
+
+def test_sync_embeds_only_changed_descriptions_and_removes_stale_ids(monkeypatch):
+    chroma = FakeChromaCollection()
+    service, collection, embedded = sync_service(monkeypatch, [make_property(1), make_property(2), make_property(3)], chroma)
+    first = asyncio.run(service.sync_mongo_to_chroma())
+    assert (first["added"], first["removed"]) == (3, 0)
+
+    stored(collection, 1)["informacion_basica"]["titulo"] = "Edificio Renovado"  # cambia la descripción
+    stored(collection, 2)["imagenes"] = ["https://cdn.test/2.jpg"]  # solo metadatos
+    collection.docs = [doc for doc in collection.docs if doc["id"] != 3]
+    embedded.clear()
+    chroma.embedded_ids.clear()
+
+    progress = []
+    second = asyncio.run(service.sync_mongo_to_chroma(on_batch=lambda done, total: progress.append((done, total))))
+
+    assert {key: second[key] for key in ("added", "updated", "metadata_updated", "unchanged", "removed")} == {
+        "added": 0, "updated": 1, "metadata_updated": 1, "unchanged": 0, "removed": 1,
+    }
+    assert chroma.embedded_ids == ["1"] and len(embedded) == 1
+    assert sorted(chroma.records) == ["1", "2"]
+    assert chroma.records["2"]["metadata"]["imagenes"] == '["https://cdn.test/2.jpg"]'
+    assert progress[0] == (0, None) and progress[-1] == (1, 1)
+
+
+def test_sync_of_written_ids_skips_the_rest_of_the_catalog(monkeypatch):
+    chroma = FakeChromaCollection()
+    service, collection, embedded = sync_service(monkeypatch, [make_property(1), make_property(2)], chroma)
+    asyncio.run(service.sync_mongo_to_chroma())
+
+    stored(collection, 1)["informacion_basica"]["titulo"] = "Edificio Renovado"
+    stored(collection, 2)["informacion_basica"]["titulo"] = "Edificio Renovado"
+    collection.docs.append(make_property(3))
+    chroma.embedded_ids.clear()
+
+    partial = asyncio.run(service.sync_mongo_to_chroma(ids=[1, 3], remove_stale=False))
+
+    assert (partial["added"], partial["updated"], partial["removed"]) == (1, 1, 0)
+    assert sorted(chroma.embedded_ids) == ["1", "3"]
+
+    collection.docs = [doc for doc in collection.docs if doc["id"] != 3]
+    final = asyncio.run(service.sync_mongo_to_chroma(ids=[], remove_stale=True))
+
+    assert final["removed"] == 1
+    assert sorted(chroma.records) == ["1", "2"]
+
+
+def test_upload_without_units_keeps_the_stored_units(monkeypatch):
+    units = [{"numero": "101", "disponible": True}]
+    service, collection = service_with(monkeypatch, [make_property(1, unidades=units)])
+
+    # Subida del modo streaming o del daemon: sin crawl de detalle no viaja la clave `unidades`
+    asyncio.run(service.write_deptos({"propiedades": [make_property(1, titulo="Edificio Renovado")]}))
+
+    assert stored(collection, 1)["informacion_basica"]["titulo"] == "Edificio Renovado"
+    assert stored(collection, 1)["unidades"] == units
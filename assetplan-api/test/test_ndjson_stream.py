@@ -0,0 +1,90 @@
+import asyncio
+import gzip
+import json
+import zlib
+
+import pytest
+
+from src.services import ndjson_stream
+from src.services.ndjson_stream import NDJSONFormatError, iter_batches
+
+
+def ndjson(*records):
+    return b"".join(json.dumps(record).encode("utf-8") + b"\n" for record in records)
+
+
+async def chunked(body, size):
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def batches(body, compressed=False, batch_size=2, chunk_size=7):
+    async def collect():
+        return [batch async for batch in iter_batches(chunked(body, chunk_size), compressed, batch_size)]
+    return asyncio.run(collect())
+
+
+def test_records_are_grouped_in_batches_across_chunk_boundaries():
+    body = ndjson(*({"id": i} for i in range(1, 6)))
+
+    for compressed, payload in ((False, body), (True, gzip.compress(body))):
+        result = batches(payload, compressed=compressed)
+        assert [[p["id"] for p in batch["propiedades"]] for batch in result] == [[1, 2], [3, 4], [5]]
+
+
+def test_eliminadas_lines_travel_with_the_next_batch():
+    body = ndjson({"id": 1}, {"eliminadas": [7, 8]}, {"id": 2}, {"id": 3}, {"eliminadas": [9]})
+
+    result = batches(body)
+
+    assert result == [
+        {"propiedades": [{"id": 1}, {"id": 2}], "eliminadas": [7, 8]},
+        {"propiedades": [{"id": 3}], "eliminadas": [9]},
+    ]
+
+
+def test_invalid_lines_are_rejected():
+    with pytest.raises(NDJSONFormatError, match="line 2"):
+        batches(b'{"id": 1}\n{"id": \n')
+    with pytest.raises(NDJSONFormatError, match="must be a list"):
+        batches(b'{"eliminadas": 3}\n')
+
+
+def test_truncated_gzip_is_rejected():
+    body = gzip.compress(ndjson(*({"id": i} for i in range(100))))
+
+    with pytest.raises(NDJSONFormatError, match="Truncated"):
+        batches(body[:len(body) // 2], compressed=True)
+
+
+def test_oversize_line_is_rejected(monkeypatch):
+    monkeypatch.setattr(ndjson_stream, "MAX_LINE_BYTES", 64)
+
+    with pytest.raises(NDJSONFormatError, match="exceeds"):
+        batches(ndjson({"id": 1, "titulo": "x" * 100}))
+
+
+def test_decompression_is_bounded_per_step(monkeypatch):
+    monkeypatch.setattr(ndjson_stream, "DECOMPRESS_STEP_BYTES", 16)
+    produced = []
+    decompressobj = zlib.decompressobj
+
+    class RecordingDecompressor:
+        def __init__(self, wbits):
+            self._inner = decompressobj(wbits)
+
+        def decompress(self, data, max_length=0):
+            out = self._inner.decompress(data, max_length)
+            produced.append(len(out))
+            return out
+
+        def __getattr__(self, name):
+            return getattr(self._inner, name)
+
+    monkeypatch.setattr(ndjson_stream.zlib, "decompressobj", RecordingDecompressor)
+    body = ndjson(*({"id": i, "titulo": "Edificio"} for i in range(20)))
+
+    result = batches(gzip.compress(body), compressed=True, batch_size=50, chunk_size=len(body))
+
+    assert [p["id"] for p in result[0]["propiedades"]] == list(range(20))
+    assert max(produced) <= 16
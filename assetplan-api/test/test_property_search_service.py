@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from fakes import FakeAsyncCollection
+from src.schemas.properties import PropertyFilters, PropertySort
+from src.services.property_search_service import PropertyQueryError, property_search_service
+
+PRICES = {1: 12.5, 2: None, 3: 9.0, 4: 12.5, 5: None, 6: 20.0, 7: 9.0}
+
+
+def make_collection():
+    return FakeAsyncCollection([
+        {"id": prop_id, "precio": {"precio_desde_uf": price}, "informacion_basica": {"comuna": "Santiago"}}
+        for prop_id, price in PRICES.items()
+    ])
+
+
+def all_pages(collection, sort, limit=2, **kwargs):
+    """Recorre todas las páginas siguiendo `next_cursor` y devuelve los ids en orden."""
+    ids, cursor = [], None
+    while True:
+        page = asyncio.run(property_search_service.search(
+            collection, PropertyFilters(**kwargs), sort=sort, limit=limit, cursor=cursor
+        ))
+        ids.extend(item["id"] for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids
+
+
+def test_keyset_pagination_visits_every_row_once_with_null_prices():
+    collection = make_collection()
+
+    ascending = all_pages(collection, PropertySort.PRECIO_ASC)
+    descending = all_pages(collection, PropertySort.PRECIO_DESC)
+
+    # MongoDB ordena los precios nulos antes que los números
+    assert ascending == [2, 5, 3, 7, 1, 4, 6]
+    assert descending == [6, 4, 1, 7, 3, 5, 2]
+
+
+@pytest.mark.parametrize("limit", [1, 3, 7])
+def test_keyset_pagination_is_independent_of_page_size(limit):
+    collection = make_collection()
+
+    assert all_pages(collection, PropertySort.PRECIO_ASC, limit=limit) == [2, 5, 3, 7, 1, 4, 6]
+    assert all_pages(collection, PropertySort.PRECIO_DESC, limit=limit) == [6, 4, 1, 7, 3, 5, 2]
+
+
+def test_cursor_round_trip_and_rejection():
+    cursor = property_search_service.encode_cursor(PropertySort.PRECIO_DESC, None, 17)
+
+    assert property_search_service.decode_cursor(cursor, PropertySort.PRECIO_DESC) == (None, 17)
+    with pytest.raises(PropertyQueryError, match="different sort"):
+        property_search_service.decode_cursor(cursor, PropertySort.PRECIO_ASC)
+    with pytest.raises(PropertyQueryError, match="Malformed"):
+        property_search_service.decode_cursor("no-es-un-cursor", PropertySort.PRECIO_ASC)
+
+
+def test_projection_collapses_children_of_requested_parents():
+    projection = property_search_service.build_projection(
+        ["precio", "precio.precio_desde_uf", "informacion_basica.titulo"]
+    )
+
+    assert projection == {"_id": 0, "id": 1, "precio": 1, "informacion_basica.titulo": 1}
+    assert property_search_service.build_projection(["informacion_basica"]) == {
+        "_id": 0, "id": 1, "precio.precio_desde_uf": 1, "informacion_basica": 1,
+    }
+    assert property_search_service.build_projection(None) == {"_id": 0, "imagenes": 0, "unidades": 0}
+    with pytest.raises(PropertyQueryError, match="secreto"):
+        property_search_service.build_projection(["id", "secreto"])
+
+
+def test_dormitorios_matches_exact_and_minimum_typologies():
+    collection = FakeAsyncCollection([
+        {"id": 1, "tipologias": [{"dormitorios": 2, "dormitorios_es_minimo": False}]},
+        {"id": 2, "tipologias": [{"dormitorios": 1, "dormitorios_es_minimo": True}]},
+        {"id": 3, "tipologias": [{"dormitorios": 3, "dormitorios_es_minimo": True}]},
+        {"id": 4, "tipologias": [{"dormitorios": 1, "dormitorios_es_minimo": False}]},
+        {"id": 5, "tipologias": []},
+    ])
+    query = property_search_service.build_filter(PropertyFilters(dormitorios=2))
+
+    assert list(query) == ["tipologias"]
+    assert [doc["id"] for doc in collection.find(query).docs] == [1, 2]
@@ -0,0 +1,78 @@
+"""
+Benchmark del parser offline contra el camino con Selenium.
+
+Usa como fixtures páginas de listado guardadas en disco (por ejemplo con
+`Scraper(record_dir=...)`) y mide el tiempo por página de:
+
+- el parser offline en un solo proceso,
+- el parser offline con un pool de procesos,
+- opcionalmente (`--selenium`), Chrome headless cargando el mismo HTML con los
+  modos de extracción "batch" y "element".
+
+Uso:
+    python benchmark.py [directorio_fixtures] [--repeat N] [--workers N] [--selenium]
+"""
+import argparse
+import glob
+import os
+import time
+
+from listing_parser import parse_listing_files
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test", "fixtures")
+BASE_URL = "https://www.assetplan.cl/arriendo/departamento"
+
+
+def time_offline(paths, workers):
+    started = time.perf_counter()
+    results = parse_listing_files(paths, workers=workers, base_url=BASE_URL)
+    elapsed = time.perf_counter() - started
+    return elapsed, sum(len(r) for r in results)
+
+
+def time_selenium(paths, extraction_mode):
+    # Import diferido: el benchmark offline no necesita Selenium ni Chrome
+    from main import Scraper
+
+    scraper = Scraper(extraction_mode=extraction_mode)
+    try:
+        started = time.perf_counter()
+        total = 0
+        for path in paths:
+            total += len(scraper.scrape_page(f"file://{os.path.abspath(path)}"))
+        return time.perf_counter() - started, total
+    finally:
+        scraper.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser de listados de AssetPlan")
+    parser.add_argument("fixtures_dir", nargs="?", default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=50, help="Veces que se repite cada fixture")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Procesos del pool")
+    parser.add_argument("--selenium", action="store_true", help="Incluir el camino con Chrome headless")
+    args = parser.parse_args()
+
+    fixtures = sorted(glob.glob(os.path.join(args.fixtures_dir, "*.html")))
+    if not fixtures:
+        print(f"No se encontraron fixtures HTML en {args.fixtures_dir}")
+        return
+
+    paths = fixtures * args.repeat
+    rows = [
+        ("offline (1 proceso)", *time_offline(paths, 1)),
+        (f"offline ({args.workers} procesos)", *time_offline(paths, args.workers)),
+    ]
+    if args.selenium:
+        # Chrome es mucho más lento: basta con una pasada por fixture
+        rows.append(("selenium (batch)", *time_selenium(fixtures, "batch")))
+        rows.append(("selenium (element)", *time_selenium(fixtures, "element")))
+
+    print(f"\n{'Modo':<24} {'Páginas':>8} {'Propiedades':>12} {'Total (s)':>10} {'ms/página':>10}")
+    for name, elapsed, total in rows:
+        pages = len(paths) if name.startswith("offline") else len(fixtures)
+        print(f"{name:<24} {pages:>8} {total:>12} {elapsed:>10.3f} {elapsed / pages * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
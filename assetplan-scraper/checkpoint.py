@@ -0,0 +1,101 @@
+"""
+Journal de checkpoints para reanudar ejecuciones de scraping.
+
+Cada página completada se agrega como una línea JSON a un archivo append-only.
+Si el proceso muere (por ejemplo, Chrome se cae en la página 7), la siguiente
+ejecución con la misma configuración reutiliza las páginas ya registradas y
+continúa desde la primera página pendiente.
+"""
+import json
+import os
+import threading
+import time
+
+from listing_parser import ListingPage
+
+
+class RunJournal:
+    """
+    Journal append-only en formato JSON Lines. La primera línea identifica la
+    ejecución (URL base y objetivo); las siguientes registran una página cada una,
+    con sus propiedades y la cantidad de tarjetas del HTML (incluidas las inválidas),
+    que se usa para detectar el final del listado.
+    """
+
+    def __init__(self, path, base_url, target_properties):
+        self.path = path
+        self.run_key = {"base_url": base_url, "target_properties": target_properties}
+        self.pages = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Lee las páginas registradas por una ejecución anterior interrumpida."""
+        if not os.path.exists(self.path):
+            self._start()
+            return
+
+        with open(self.path, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+        try:
+            header = json.loads(lines[0]) if lines else {}
+        except ValueError:
+            header = {}
+        if header.get("ejecucion") != self.run_key:
+            print("El checkpoint existente corresponde a otra ejecución, se descarta.")
+            self._start()
+            return
+
+        for line in lines[1:]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Última línea truncada por una caída a mitad de escritura
+                break
+            self.pages[entry["pagina"]] = self._page(entry)
+
+        if self.pages:
+            print(f"Reanudando desde checkpoint: páginas ya completadas {sorted(self.pages)}")
+        # Reescribir sin la posible línea truncada para seguir agregando sobre un archivo válido
+        self._start(self.pages)
+
+    def _start(self, pages=None):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"ejecucion": self.run_key, "inicio": time.time()}, ensure_ascii=False) + "\n")
+            for page, properties in sorted((pages or {}).items()):
+                f.write(json.dumps(self._entry(page, properties), ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _entry(page, properties):
+        return {"pagina": page, "propiedades": list(properties),
+                "tarjetas": getattr(properties, "cards", len(properties))}
+
+    @staticmethod
+    def _page(entry):
+        """Reconstruye la `ListingPage` de una línea (las líneas antiguas no traen `tarjetas`)."""
+        properties = entry["propiedades"]
+        return ListingPage(properties, cards=entry.get("tarjetas", len(properties)))
+
+    def get(self, page):
+        """`ListingPage` de una página ya completada, o None si hay que scrapearla."""
+        return self.pages.get(page)
+
+    def record_page(self, page, properties):
+        """Agrega una página completada al journal y la fuerza a disco."""
+        entry = self._entry(page, properties)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.pages[page] = self._page(entry)
+
+    def finish(self):
+        """Elimina el journal al terminar la ejecución correctamente."""
+        with self._lock:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self.pages = {}
@@ -0,0 +1,265 @@
+"""
+Modo daemon del scraper: ejecuciones programadas con un navegador reutilizado.
+
+En lugar de iniciar Chrome en cada `make scrape`, el daemon mantiene un único
+`Scraper` con el driver "caliente" entre ejecuciones. El driver se recicla al
+superar un número de páginas o un límite de memoria (RSS de Chrome). Cada
+ejecución envía a la API solo las propiedades nuevas o modificadas por bloques
+(ver `uploader.py`) y el estado se consulta en un endpoint HTTP local:
+
+    curl http://127.0.0.1:8030/status
+
+Uso:
+    python daemon.py [--interval SEGUNDOS] [--port PUERTO] [--once]
+"""
+import argparse
+import json
+import signal
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fingerprints import FingerprintStore
+from main import Scraper, driver_pid, process_tree_rss_mb
+from uploader import ChunkedUploader, StreamingOutput
+
+BASE_URL = "https://www.assetplan.cl/arriendo/departamento"
+API_URL = "http://localhost:8010/load-deptos"
+
+
+class WarmScraper(Scraper):
+    """
+    Scraper que conserva su driver entre ejecuciones y lo recicla antes de una
+    página si ya navegó `recycle_after_pages` páginas o si Chrome supera `max_rss_mb`.
+    """
+
+    def __init__(self, recycle_after_pages=200, max_rss_mb=1500, **kwargs):
+        super().__init__(**kwargs)
+        self.recycle_after_pages = recycle_after_pages
+        self.max_rss_mb = max_rss_mb
+        self.pages_on_driver = 0
+        self.recycles = 0
+
+    def driver_rss_mb(self):
+        """RSS de chromedriver + Chrome del driver principal, o None si no hay driver."""
+        if self.driver is None:
+            return None
+        return process_tree_rss_mb(driver_pid(self.driver))
+
+    def maybe_recycle(self):
+        """Cierra el driver principal si alcanzó el límite de páginas o de memoria."""
+        if self.driver is None:
+            return False
+
+        reason = None
+        if self.pages_on_driver >= self.recycle_after_pages:
+            reason = f"{self.pages_on_driver} páginas"
+        else:
+            rss = self.driver_rss_mb()
+            if rss is not None and rss > self.max_rss_mb:
+                reason = f"{rss} MB de RSS"
+        if reason is None:
+            return False
+
+        print(f"Reciclando el navegador ({reason})")
+        self.close()
+        self.pages_on_driver = 0
+        self.recycles += 1
+        return True
+
+    def scrape_page(self, url, driver=None):
+        if driver is None:
+            # En modo paralelo el driver principal está en el pool: solo se recicla entre ejecuciones
+            self.maybe_recycle()
+        if driver is None or driver is self.driver:
+            self.pages_on_driver += 1
+        return super().scrape_page(url, driver)
+
+    def reset_run(self, fingerprints=None):
+        """Limpia el estado de la ejecución anterior conservando el driver."""
+        self.properties = []
+        self.page_metrics = []
+        self.listing_exhausted = False
+        self.fingerprints = fingerprints
+        self.metrics.reset()
+
+
+class ScraperDaemon:
+    """Ejecuta scrapes cada `interval` segundos y publica su estado por HTTP."""
+
+    def __init__(self, base_url=BASE_URL, api_url=API_URL, interval=3600, target_properties=50,
+                 max_pages=10, uf_value=39, http_first=True, workers=1, host_delay=1.0,
+                 fingerprints_path=".fingerprints.json", chunk_size=100, scraper=None):
+        self.base_url = base_url
+        self.api_url = api_url
+        self.interval = interval
+        self.target_properties = target_properties
+        self.max_pages = max_pages
+        self.uf_value = uf_value
+        self.http_first = http_first
+        self.workers = workers
+        self.host_delay = host_delay
+        self.fingerprints_path = fingerprints_path
+        self.chunk_size = chunk_size
+        self.scraper = scraper or WarmScraper(lean_browser=True)
+
+        self.state = "iniciando"
+        self.runs = 0
+        self.last_run = None
+        self.next_run = None
+        self._stop = threading.Event()
+        self._server = None
+
+    def scrape(self, on_page):
+        if self.http_first:
+            return self.scraper.scrape_http_first(
+                self.base_url, self.target_properties, max_pages=self.max_pages, workers=self.workers,
+                host_delay=self.host_delay, on_page=on_page,
+            )
+        if self.workers > 1:
+            return self.scraper.scrape_multiple_pages_parallel(
+                self.base_url, self.target_properties, workers=self.workers, max_pages=self.max_pages,
+                host_delay=self.host_delay, on_page=on_page,
+            )
+        return self.scraper.scrape_multiple_pages(
+            self.base_url, self.target_properties, max_pages=self.max_pages, on_page=on_page
+        )
+
+    def run_once(self):
+        """
+        Ejecuta un scrape completo y envía el delta a la API.
+
+        Returns:
+            dict: Resumen de la ejecución (también disponible en `/status`)
+        """
+        self.state = "scrapeando"
+        started = time.time()
+        fingerprints = FingerprintStore(self.fingerprints_path) if self.fingerprints_path else None
+        self.scraper.reset_run(fingerprints)
+        self.scraper.maybe_recycle()
+        uploader = ChunkedUploader(self.api_url, chunk_size=self.chunk_size, metrics=self.scraper.metrics)
+        output = StreamingOutput(self.uf_value, uploader=uploader, fingerprints=fingerprints)
+        summary = {"inicio": started, "error": None}
+
+        try:
+            self.scrape(on_page=output)
+            eliminadas = []
+            if fingerprints is not None:
+                eliminadas = fingerprints.build_delta([], complete=self.scraper.listing_exhausted)["eliminadas"]
+            output.close(eliminadas=eliminadas)
+
+            # Solo se confirman las huellas si todos los bloques quedaron ingeridos por la API
+            if fingerprints is not None and uploader.failed_chunks == 0:
+                fingerprints.save(output.uploaded_ids, removed_ids=eliminadas)
+            summary.update({
+                "propiedades": output.count,
+                "enviadas": uploader.properties_sent,
+                "eliminadas": len(eliminadas),
+                "bloques_fallidos": uploader.failed_chunks,
+            })
+        except Exception as e:
+            print(f"Error durante la ejecución programada: {e}")
+            traceback.print_exc()
+            summary["error"] = str(e)
+            uploader.close()
+            # El driver puede haber quedado en mal estado: se descarta
+            self.scraper.close()
+        finally:
+            summary["duracion_s"] = round(time.time() - started, 3)
+            summary["metricas"] = self.scraper.metrics.report()
+            self.runs += 1
+            self.last_run = summary
+            self.state = "esperando"
+
+        print(f"Ejecución {self.runs} completada en {summary['duracion_s']}s: "
+              f"{summary.get('propiedades', 0)} propiedades, {summary.get('enviadas', 0)} enviadas")
+        return summary
+
+    def status(self):
+        """Estado del daemon para el endpoint `/status`."""
+        return {
+            "estado": self.state,
+            "ejecuciones": self.runs,
+            "intervalo_s": self.interval,
+            "proxima_ejecucion": self.next_run,
+            "ultima_ejecucion": self.last_run,
+            "navegador": {
+                "activo": self.scraper.driver is not None,
+                "paginas": getattr(self.scraper, "pages_on_driver", None),
+                "reciclajes": getattr(self.scraper, "recycles", None),
+                "rss_mb": self.scraper.driver_rss_mb() if hasattr(self.scraper, "driver_rss_mb") else None,
+            },
+        }
+
+    def start_status_server(self, host="127.0.0.1", port=8030):
+        """Inicia el endpoint de estado en un hilo de fondo y devuelve el puerto usado."""
+        daemon = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/status"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.status(), ensure_ascii=False, default=str).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), StatusHandler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def serve_forever(self, port=8030):
+        """Ejecuta scrapes en bucle hasta recibir SIGINT/SIGTERM."""
+        port = self.start_status_server(port=port)
+        print(f"Daemon iniciado: estado en http://127.0.0.1:{port}/status, una ejecución cada {self.interval}s")
+        try:
+            while not self._stop.is_set():
+                self.run_once()
+                self.next_run = time.time() + self.interval
+                self._stop.wait(self.interval)
+        finally:
+            self.shutdown()
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def shutdown(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        self.scraper.close()
+        print("Daemon detenido.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daemon del scraper de AssetPlan")
+    parser.add_argument("--interval", type=int, default=3600, help="Segundos entre ejecuciones")
+    parser.add_argument("--port", type=int, default=8030, help="Puerto del endpoint de estado")
+    parser.add_argument("--recycle-pages", type=int, default=200, help="Páginas antes de reciclar Chrome")
+    parser.add_argument("--max-rss-mb", type=int, default=1500, help="RSS máximo de Chrome antes de reciclarlo")
+    parser.add_argument("--once", action="store_true", help="Ejecutar una sola vez y salir")
+    args = parser.parse_args()
+
+    scraper = WarmScraper(recycle_after_pages=args.recycle_pages, max_rss_mb=args.max_rss_mb, lean_browser=True)
+    daemon = ScraperDaemon(interval=args.interval, scraper=scraper)
+    if args.once:
+        try:
+            daemon.run_once()
+        finally:
+            daemon.shutdown()
+        return
+
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    daemon.serve_forever(port=args.port)
+
+
+if __name__ == "__main__":
+    main()
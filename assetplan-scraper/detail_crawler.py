@@ -0,0 +1,239 @@
+"""
+Crawler concurrente de las páginas de detalle de cada propiedad.
+
+El listado solo muestra un resumen por edificio; los precios, superficies y
+disponibilidad por unidad están en la página de `link_propiedad`. Este módulo
+visita esos enlaces con un pool de workers asíncronos (concurrencia acotada y
+un intervalo mínimo entre peticiones), guarda las respuestas en un caché en
+disco por URL + ETag y agrega a cada propiedad la lista `unidades`.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+from html.parser import HTMLParser
+
+import httpx
+
+from fetcher import USER_AGENT, AsyncRateLimiter
+from listing_parser import BLOCK_TAGS, SKIP_TAGS
+
+CELL_TAGS = {"td", "th"}
+
+UNIT_NUMBER_PATTERN = re.compile(r'(?:depto\.?|departamento|unidad|dpto\.?|n°)\s*([a-z]?\d+[a-z]?)', re.IGNORECASE)
+BEDROOMS_PATTERN = re.compile(r'(\d+)\s*(?:d\b|dorm)', re.IGNORECASE)
+BATHROOMS_PATTERN = re.compile(r'(\d+)\s*(?:b\b|bañ|ban)', re.IGNORECASE)
+SURFACE_PATTERN = re.compile(r'(\d+(?:[.,]\d+)?)\s*m(?:²|2)', re.IGNORECASE)
+PRICE_PATTERN = re.compile(r'\$\s*([0-9][0-9.]*)')
+FLOOR_PATTERN = re.compile(r'piso\s*(\d+)', re.IGNORECASE)
+UNAVAILABLE_KEYWORDS = ['no disponible', 'arrendad', 'reservad']
+
+
+class _TextLineCollector(HTMLParser):
+    """Convierte el HTML en líneas de texto; las celdas de una fila se separan con ' | '."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._chunks = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        if tag in BLOCK_TAGS:
+            self._chunks.append("\n")
+        elif tag in CELL_TAGS:
+            self._chunks.append(" | ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag in BLOCK_TAGS:
+            self._chunks.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._chunks.append(data)
+
+    def lines(self):
+        text = "".join(self._chunks)
+        lines = []
+        for line in text.split("\n"):
+            line = re.sub(r'\s+', ' ', line).strip(" |")
+            if line:
+                lines.append(line)
+        return lines
+
+
+def html_to_lines(html):
+    """Extrae las líneas de texto visibles de una página de detalle."""
+    collector = _TextLineCollector()
+    collector.feed(html)
+    collector.close()
+    return collector.lines()
+
+
+def parse_unit_line(line):
+    """
+    Interpreta una línea como unidad si trae un precio y una superficie o tipología.
+
+    Args:
+        line (str): Línea de texto (p. ej. "Depto 1204 | 2D 2B | 55 m² | $450.000")
+
+    Returns:
+        dict: Unidad con numero, piso, dormitorios, banos, superficie_m2, precio y
+            disponible, o None si la línea no describe una unidad
+    """
+    price = PRICE_PATTERN.search(line)
+    surface = SURFACE_PATTERN.search(line)
+    bedrooms = BEDROOMS_PATTERN.search(line)
+    is_studio = 'estudio' in line.lower()
+    if not price or not (surface or bedrooms or is_studio):
+        return None
+
+    number = UNIT_NUMBER_PATTERN.search(line)
+    floor = FLOOR_PATTERN.search(line)
+    bathrooms = BATHROOMS_PATTERN.search(line)
+
+    return {
+        "numero": number.group(1) if number else None,
+        "piso": int(floor.group(1)) if floor else None,
+        "dormitorios": 0 if is_studio and not bedrooms else (int(bedrooms.group(1)) if bedrooms else None),
+        "banos": int(bathrooms.group(1)) if bathrooms else None,
+        "superficie_m2": float(surface.group(1).replace(',', '.')) if surface else None,
+        "precio": price.group(1).replace('.', ''),
+        "disponible": not any(keyword in line.lower() for keyword in UNAVAILABLE_KEYWORDS),
+    }
+
+
+def parse_detail_html(html):
+    """Obtiene las unidades (sin duplicados) de una página de detalle."""
+    units = []
+    seen = set()
+    for line in html_to_lines(html):
+        unit = parse_unit_line(line)
+        if unit is None:
+            continue
+        key = json.dumps(unit, sort_keys=True)
+        if key not in seen:
+            seen.add(key)
+            units.append(unit)
+    return units
+
+
+class ResponseCache:
+    """Caché en disco de páginas de detalle: un archivo JSON por URL con su ETag."""
+
+    def __init__(self, cache_dir=".detail_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url):
+        """Entrada cacheada `{"url", "etag", "body"}` o None."""
+        try:
+            with open(self._path(url), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url, etag, body):
+        path = self._path(url)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"url": url, "etag": etag, "body": body}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+
+class DetailCrawler:
+    """
+    Visita las páginas de detalle con hasta `concurrency` peticiones simultáneas
+    y al menos `min_interval` segundos entre peticiones.
+    """
+
+    def __init__(self, concurrency=5, min_interval=0.5, cache_dir=".detail_cache", timeout=15):
+        self.concurrency = concurrency
+        self.min_interval = min_interval
+        self.cache = ResponseCache(cache_dir) if cache_dir else None
+        self.timeout = timeout
+        self.stats = {"descargadas": 0, "no_modificadas": 0, "errores": 0}
+
+    async def fetch(self, client, limiter, url):
+        """
+        Descarga una página de detalle usando el caché condicional (If-None-Match).
+
+        Returns:
+            str: HTML de la página, o None si la descarga falló
+        """
+        cached = self.cache.get(url) if self.cache else None
+        headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+
+        await limiter.wait()
+        try:
+            response = await client.get(url, headers=headers)
+            if response.status_code == 304 and cached:
+                self.stats["no_modificadas"] += 1
+                return cached["body"]
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            print(f"Error descargando detalle {url}: {e}")
+            self.stats["errores"] += 1
+            return None
+
+        self.stats["descargadas"] += 1
+        if self.cache:
+            self.cache.put(url, response.headers.get("ETag"), response.text)
+        return response.text
+
+    async def crawl(self, properties):
+        """
+        Agrega la clave `unidades` a cada propiedad (dicts de `parse_property_snapshot`).
+
+        Las propiedades cuya página no se pudo descargar conservan las unidades que
+        tuvieran (p. ej. recuperadas del almacén de huellas).
+
+        Args:
+            properties (list): Propiedades con la clave 'link'
+
+        Returns:
+            list: Propiedades cuyas unidades cambiaron respecto de las que traían
+        """
+        queue = asyncio.Queue()
+        for prop in properties:
+            if prop.get('link', "No disponible") != "No disponible":
+                queue.put_nowait(prop)
+
+        changed = []
+        limiter = AsyncRateLimiter(self.min_interval)
+        headers = {"User-Agent": USER_AGENT}
+
+        async with httpx.AsyncClient(follow_redirects=True, timeout=self.timeout, headers=headers) as client:
+
+            async def worker():
+                while True:
+                    try:
+                        prop = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    html = await self.fetch(client, limiter, prop['link'])
+                    if html is None:
+                        continue
+                    units = parse_detail_html(html)
+                    if units != prop.get('unidades'):
+                        changed.append(prop)
+                    prop['unidades'] = units
+
+            await asyncio.gather(*(worker() for _ in range(max(1, self.concurrency))))
+
+        print(f"Detalle: {self.stats['descargadas']} descargadas, "
+              f"{self.stats['no_modificadas']} sin cambios (304), {self.stats['errores']} errores")
+        return changed
+
+
+def crawl_details(properties, concurrency=5, min_interval=0.5, cache_dir=".detail_cache"):
+    """Versión síncrona de `DetailCrawler.crawl` para usar desde el scraper."""
+    crawler = DetailCrawler(concurrency=concurrency, min_interval=min_interval, cache_dir=cache_dir)
+    return asyncio.run(crawler.crawl(properties))
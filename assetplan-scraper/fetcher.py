@@ -0,0 +1,130 @@
+"""
+Motor de descarga HTTP para las páginas de listado de AssetPlan.
+
+Intenta obtener las tarjetas de propiedades directamente desde el HTML servido por
+el sitio (sin navegador). Si el HTML no trae tarjetas `building-card` (contenido
+renderizado en el cliente), devuelve una lista vacía para que el llamador use
+Selenium como respaldo.
+"""
+import asyncio
+import time
+
+import httpx
+
+from listing_parser import confirms_end_of_listing, parse_listing_html
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class AsyncRateLimiter:
+    """Garantiza un intervalo mínimo entre peticiones de todos los workers."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._last = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            delay = self._last + self.min_interval - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._last = time.monotonic()
+
+
+async def fetch_listing_page(client, url, snapshot_parser=None, limiter=None):
+    """
+    Descarga una página de listado y la parsea con el parser offline.
+
+    Args:
+        client (httpx.AsyncClient): Cliente HTTP compartido
+        url (str): URL de la página
+        snapshot_parser (callable): Parser de tarjetas (ver `parse_listing_html`)
+        limiter (AsyncRateLimiter): Intervalo mínimo entre peticiones al host del listado
+
+    Returns:
+        list: Propiedades encontradas (vacía si la página no trae tarjetas),
+            o None si la descarga falló
+    """
+    if limiter is not None:
+        await limiter.wait()
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"Error descargando {url}: {e}")
+        return None
+
+    return parse_listing_html(response.text, str(response.url), snapshot_parser)
+
+
+async def fetch_listing_http(base_url, target_properties=50, max_pages=10, concurrency=3, timeout=15,
+                             snapshot_parser=None, on_page=None, host_delay=0, metrics=None):
+    """
+    Descarga páginas de listado en paralelo por HTTP hasta alcanzar el objetivo.
+
+    Las páginas se piden en ventanas de `concurrency` y se combinan en orden; el
+    proceso se detiene al llegar a `target_properties`, a la última página del listado
+    o a una página sin tarjetas o con error. Solo la última página (menos tarjetas que
+    las páginas llenas anteriores) confirma el final del listado.
+
+    Args:
+        base_url (str): URL base sin el parámetro de página
+        target_properties (int): Número objetivo de propiedades a obtener
+        max_pages (int): Límite máximo de páginas a visitar
+        concurrency (int): Páginas descargadas simultáneamente
+        timeout (float): Timeout por petición en segundos
+        snapshot_parser (callable): Parser de tarjetas (ver `parse_listing_html`)
+        on_page (callable): Si se indica, recibe las propiedades de cada página en lugar
+            de acumularlas (modo streaming)
+        host_delay (float): Segundos mínimos entre peticiones al host del listado, también
+            entre las páginas de una misma ventana
+        metrics (RunMetrics): Si se indica, cuenta páginas descargadas/fallidas, tarjetas
+            y propiedades parseadas
+
+    Returns:
+        tuple: (propiedades obtenidas, True si se confirmó el final del listado).
+            Las propiedades están vacías si el HTML no trae tarjetas o en modo streaming.
+    """
+    all_properties = []
+    collected = 0
+    page_size = 0
+    headers = {"User-Agent": USER_AGENT}
+    # Todas las páginas son del mismo host: un único limitador aplica el intervalo por host
+    limiter = AsyncRateLimiter(host_delay) if host_delay else None
+
+    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout, headers=headers) as client:
+        page = 1
+        while page <= max_pages and collected < target_properties:
+            pages = range(page, min(page + concurrency, max_pages + 1))
+            results = await asyncio.gather(
+                *(fetch_listing_page(client, f"{base_url}?page={p}", snapshot_parser, limiter) for p in pages)
+            )
+
+            for p, page_properties in zip(pages, results):
+                if page_properties is None:
+                    if metrics is not None:
+                        metrics.increment("paginas_fallidas")
+                    # Un error de red no significa que el listado haya terminado
+                    return all_properties, False
+                if metrics is not None:
+                    metrics.count_page(page_properties)
+                properties_to_add = page_properties[:target_properties - collected]
+                collected += len(properties_to_add)
+                if on_page and properties_to_add:
+                    on_page(properties_to_add)
+                else:
+                    all_properties.extend(properties_to_add)
+                print(f"[HTTP] Página {p}: {len(page_properties)} propiedades encontradas")
+                if confirms_end_of_listing(page_properties, page_size):
+                    return all_properties, True
+                if not page_properties:
+                    # Sin tarjetas no se distingue el final del listado de un bloqueo o un error
+                    return all_properties, False
+                if collected >= target_properties:
+                    return all_properties, False
+                page_size = max(page_size, page_properties.cards)
+
+            page += concurrency
+
+    return all_properties, False
@@ -0,0 +1,190 @@
+"""
+Almacén local de huellas (fingerprints) por propiedad para scraping incremental.
+
+Cada propiedad se identifica por el ID que aparece al final de su `link_propiedad`
+y se guarda junto al hash de la instantánea cruda de su tarjeta. En la siguiente
+ejecución, las tarjetas con el mismo hash no se vuelven a parsear y solo las
+propiedades nuevas, modificadas o eliminadas se envían como delta.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from listing_parser import STRUCTURE_VERSION, extract_property_id, find_property_link
+
+NEW = "nueva"
+CHANGED = "modificada"
+UNCHANGED = "sin_cambios"
+
+
+def fingerprint_snapshot(snapshot):
+    """Calcula un hash estable de la instantánea cruda de una tarjeta."""
+    payload = json.dumps(
+        {
+            "text": snapshot.get("text") or "",
+            "hrefs": snapshot.get("hrefs") or [],
+            "images": snapshot.get("images") or [],
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def snapshot_property_id(snapshot):
+    """Obtiene el ID de la propiedad a partir de los enlaces de la tarjeta."""
+    return extract_property_id(find_property_link(snapshot.get("hrefs")))
+
+
+class FingerprintStore:
+    """
+    Huellas persistidas en un archivo JSON con la forma
+    `{"<id>": {"hash": "...", "version": 2, "propiedad": {...}}}`.
+
+    `version` es la `STRUCTURE_VERSION` con la que la propiedad se envió por última
+    vez; las entradas anteriores (o sin versión) se reenvían aunque su tarjeta no cambie.
+
+    Las huellas nuevas o modificadas de una ejecución quedan en espera y `save` solo
+    confirma las de las propiedades entregadas a la API: una tarjeta parseada pero
+    recortada por el objetivo de propiedades se vuelve a enviar en la siguiente ejecución.
+    """
+
+    def __init__(self, path=".fingerprints.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._pending = {}
+        self._status = {}
+        self.load()
+
+    def load(self):
+        """Carga las huellas desde disco (si el archivo existe)."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"No se pudo leer el almacén de huellas {self.path}, se parte de cero: {e}")
+            self._entries = {}
+
+    def lookup(self, prop_id, digest):
+        """
+        Busca una propiedad sin cambios.
+
+        Returns:
+            dict: La propiedad parseada en la ejecución anterior si el hash coincide,
+                o None si hay que parsear la tarjeta. Si la entrada es de una versión
+                anterior de la estructura, la propiedad se marca como modificada.
+        """
+        if prop_id is None:
+            return None
+        key = str(prop_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry.get("hash") == digest:
+                if entry.get("version") == STRUCTURE_VERSION:
+                    self._status[key] = UNCHANGED
+                else:
+                    self._status[key] = CHANGED
+                    self._pending[key] = {**entry, "version": STRUCTURE_VERSION}
+                return dict(entry["propiedad"])
+        return None
+
+    def record(self, prop_id, digest, property_info):
+        """Deja en espera una propiedad nueva o modificada junto a su hash."""
+        if prop_id is None:
+            return
+        key = str(prop_id)
+        with self._lock:
+            self._status[key] = CHANGED if key in self._entries else NEW
+            self._pending[key] = {"hash": digest, "version": STRUCTURE_VERSION, "propiedad": property_info}
+
+    def mark_seen(self, prop_id):
+        """
+        Marca como vista una propiedad recuperada sin su tarjeta (p. ej. desde un
+        checkpoint). Como no se puede comparar el hash, se envía igualmente en el delta.
+        """
+        if prop_id is None:
+            return
+        key = str(prop_id)
+        with self._lock:
+            self._status.setdefault(key, CHANGED if key in self._entries else NEW)
+
+    def mark_changed(self, prop_id, property_info):
+        """
+        Registra una propiedad cuya tarjeta no cambió pero sí sus datos complementarios
+        (p. ej. las unidades de la página de detalle), para que se envíe en el delta.
+        """
+        if prop_id is None:
+            return
+        key = str(prop_id)
+        with self._lock:
+            entry = self._pending.get(key) or self._entries.get(key)
+            if entry is not None:
+                self._pending[key] = {**entry, "propiedad": property_info}
+            if self._status.get(key) == UNCHANGED:
+                self._status[key] = CHANGED
+
+    def status(self, prop_id):
+        """Estado de la propiedad en esta ejecución (nueva, modificada o sin cambios)."""
+        return self._status.get(str(prop_id), NEW)
+
+    def removed_ids(self):
+        """IDs presentes en el almacén que no se vieron en esta ejecución."""
+        return sorted(int(key) for key in self._entries if key not in self._status)
+
+    def build_delta(self, propiedades, complete=False, max_removed_ratio=0.5):
+        """
+        Construye el payload delta a partir de las propiedades estructuradas.
+
+        Args:
+            propiedades (list): Propiedades en el formato de `save_to_json`
+            complete (bool): True si el scraping recorrió el listado completo. Solo
+                entonces las propiedades no vistas se reportan como eliminadas.
+            max_removed_ratio (float): Si las eliminadas superan esta fracción del
+                almacén se asume un scraping fallido y no se reportan.
+
+        Returns:
+            dict: {"propiedades": [...nuevas y modificadas...], "eliminadas": [...], "resumen": {...}}
+        """
+        changed = [p for p in propiedades if self.status(p["id"]) != UNCHANGED]
+        removed = self.removed_ids() if complete else []
+        if removed and self._entries and len(removed) / len(self._entries) > max_removed_ratio:
+            print(f"⚠ {len(removed)} propiedades desaparecieron del listado; "
+                  "se omiten las eliminaciones por seguridad.")
+            removed = []
+
+        return {
+            "propiedades": changed,
+            "eliminadas": removed,
+            "resumen": {
+                "nuevas": sum(1 for p in changed if self.status(p["id"]) == NEW),
+                "modificadas": sum(1 for p in changed if self.status(p["id"]) == CHANGED),
+                "sin_cambios": len(propiedades) - len(changed),
+                "eliminadas": len(removed),
+            },
+        }
+
+    def save(self, delivered_ids, removed_ids=()):
+        """
+        Persiste las huellas, confirmando solo las de las propiedades entregadas.
+
+        Args:
+            delivered_ids (iterable): IDs de las propiedades que la API recibió en esta
+                ejecución; las huellas en espera del resto se descartan
+            removed_ids (iterable): IDs de las propiedades eliminadas
+        """
+        with self._lock:
+            for prop_id in delivered_ids:
+                entry = self._pending.pop(str(prop_id), None)
+                if entry is not None:
+                    self._entries[str(prop_id)] = entry
+            self._pending = {}
+            for prop_id in removed_ids:
+                self._entries.pop(str(prop_id), None)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
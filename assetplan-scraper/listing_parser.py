@@ -0,0 +1,419 @@
+"""
+Parser offline de las páginas de listado de AssetPlan.
+
+Convierte el HTML guardado de una página de listado en los mismos diccionarios de
+propiedad que produce el scraper con Selenium, sin necesidad de un navegador.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+import re
+
+CARD_TAG = "article"
+CARD_CLASS = "building-card"
+
+# Elementos que en el navegador generan un salto de línea en `innerText`
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6",
+    "header", "hr", "li", "main", "nav", "ol", "p", "section", "table", "tr", "ul",
+}
+SKIP_TAGS = {"script", "style", "noscript", "template"}
+
+# Versión de la estructura que genera `structure_property`. Al subirla, el almacén de
+# huellas reenvía una vez todas las propiedades para que los documentos ya cargados en
+# la API reciban los campos nuevos.
+#   1: unidades de la página de detalle
+#   2: tipologias, dormitorios y unidades_disponibles
+STRUCTURE_VERSION = 2
+
+SERVICE_KEYWORDS = ['descuento', 'garantía', 'aval', 'cuotas', 'sin aval', 'servicio']
+FEATURE_KEYWORDS = ['dormitorio', 'baño', 'm²', 'estacionamiento', 'estudio', 'disponible']
+
+
+class _CardCollector(HTMLParser):
+    """Recorre el HTML y arma una instantánea (texto, enlaces, imágenes) por cada tarjeta."""
+
+    def __init__(self, base_url=""):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.cards = []
+        self._card = None
+        self._chunks = []
+        self._article_depth = 0
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._card is None:
+            if tag == CARD_TAG and CARD_CLASS in (dict(attrs).get("class") or "").split():
+                self._card = {"text": "", "hrefs": [], "images": []}
+                self._chunks = []
+                self._article_depth = 1
+            return
+
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == CARD_TAG:
+            self._article_depth += 1
+
+        if tag in BLOCK_TAGS:
+            self._chunks.append("\n")
+        if tag == "a":
+            href = dict(attrs).get("href")
+            self._card["hrefs"].append(urljoin(self.base_url, href) if href else "")
+        elif tag == "img":
+            src = dict(attrs).get("src")
+            self._card["images"].append(urljoin(self.base_url, src) if src else "")
+
+    def handle_endtag(self, tag):
+        if self._card is None:
+            return
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag in BLOCK_TAGS:
+            self._chunks.append("\n")
+        if tag == CARD_TAG:
+            self._article_depth -= 1
+            if self._article_depth == 0:
+                self._card["text"] = _normalize_text("".join(self._chunks))
+                self.cards.append(self._card)
+                self._card = None
+
+    def handle_data(self, data):
+        if self._card is not None and not self._skip_depth:
+            self._chunks.append(data)
+
+
+def _normalize_text(raw):
+    """Colapsa espacios como lo hace `innerText` y elimina líneas vacías."""
+    lines = (re.sub(r"\s+", " ", line).strip() for line in raw.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def extract_card_snapshots(html, base_url=""):
+    """
+    Extrae las instantáneas de todas las tarjetas `article.building-card` del HTML.
+
+    Args:
+        html (str): HTML de la página de listado
+        base_url (str): URL de la página, para resolver enlaces e imágenes relativos
+
+    Returns:
+        list: Instantáneas con las claves 'text', 'hrefs' e 'images'
+    """
+    collector = _CardCollector(base_url)
+    collector.feed(html)
+    collector.close()
+    return collector.cards
+
+
+def find_property_link(hrefs):
+    """Devuelve el primer enlace a la ficha de la propiedad (excluyendo el mapa)."""
+    for href in hrefs or []:
+        if href and '/arriendo/departamento/' in href and 'mapa' not in href:
+            return href
+    return None
+
+
+def extract_property_id(link):
+    """
+    Extrae el ID numérico de la propiedad desde la última parte de su link.
+
+    Returns:
+        int: ID de la propiedad, o None si el link no termina en un número
+    """
+    if not link or link == "No disponible":
+        return None
+    id_str = link.strip('/').split('/')[-1]
+    return int(id_str) if id_str.isdigit() else None
+
+
+def parse_property_snapshot(snapshot):
+    """
+    Extrae la información de una propiedad a partir de una instantánea de su tarjeta.
+
+    Args:
+        snapshot (dict): Tarjeta con las claves 'text', 'hrefs' e 'images'
+
+    Returns:
+        dict: Información de la propiedad
+    """
+    full_text = snapshot.get('text') or ""
+
+    # Dividir el texto en líneas para procesamiento
+    lines = [line.strip() for line in full_text.split('\n') if line.strip()]
+
+    property_info = {
+        'titulo': "No disponible",
+        'link': "No disponible",
+        'direccion': "No disponible",
+        'precio': "No disponible",
+    }
+
+    # Buscar el enlace primero
+    property_info['link'] = find_property_link(snapshot.get('hrefs')) or "No disponible"
+
+    # Buscar el título del edificio
+    for line in lines:
+        if 'Edificio' in line and line != 'Edificio' and line != 'Servicio Pro':
+            # Extraer solo el nombre después de "Edificio"
+            if line.startswith('Edificio '):
+                property_info['titulo'] = line[9:]  # Remover "Edificio "
+            else:
+                property_info['titulo'] = line
+            break
+
+    # Dirección - buscar patrones de dirección (número + texto + comuna)
+    for line in lines:
+        if re.search(r'\d+.*,.*', line) and 'Edificio' not in line and '$' not in line:
+            property_info['direccion'] = line
+            break
+
+    # Precio - buscar líneas que contengan $
+    for line in lines:
+        if '$' in line and ('desde' in line.lower() or 'hasta' in line.lower() or '-' in line):
+            property_info['precio'] = line
+            break
+
+    # Servicios - buscar líneas específicas
+    property_info['servicios'] = [
+        line for line in lines if any(keyword in line.lower() for keyword in SERVICE_KEYWORDS)
+    ]
+
+    # Características adicionales
+    property_info['caracteristicas'] = [
+        line for line in lines if any(word in line.lower() for word in FEATURE_KEYWORDS)
+    ]
+
+    # URLs de las imágenes
+    property_info['imagenes'] = [src for src in snapshot.get('images') or [] if src]
+
+    return property_info
+
+
+def parse_typology(line):
+    """
+    Convierte una característica como "1 Dormitorio | +10 Disponibles" en un registro tipado.
+
+    Args:
+        line (str): Característica tal como aparece en la tarjeta
+
+    Returns:
+        dict: {"tipologia", "dormitorios", "dormitorios_es_minimo", "banos",
+            "disponibles", "disponibles_es_minimo"}, o None si la línea no describe
+            una tipología
+    """
+    parts = [part.strip() for part in line.split('|')]
+    typology = parts[0]
+    lowered = line.lower()
+
+    bedrooms = re.search(r'(\+)?\s*(\d+)\s*dormitorio', lowered)
+    if bedrooms:
+        dormitorios = int(bedrooms.group(2))
+        dormitorios_es_minimo = bool(bedrooms.group(1))
+    elif 'estudio' in lowered:
+        dormitorios, dormitorios_es_minimo = 0, False
+    else:
+        return None
+
+    bathrooms = re.search(r'(\d+)\s*baño', lowered)
+    available = re.search(r'(\+)?\s*(\d+)\s*disponible', lowered)
+    if available:
+        disponibles = int(available.group(2))
+        disponibles_es_minimo = bool(available.group(1))
+    else:
+        # "Notificar disponibilidad": sin unidades disponibles por ahora
+        disponibles, disponibles_es_minimo = 0, False
+
+    return {
+        "tipologia": typology,
+        "dormitorios": dormitorios,
+        "dormitorios_es_minimo": dormitorios_es_minimo,
+        "banos": int(bathrooms.group(1)) if bathrooms else None,
+        "disponibles": disponibles,
+        "disponibles_es_minimo": disponibles_es_minimo,
+    }
+
+
+def parse_typologies(caracteristicas):
+    """
+    Convierte las características de una propiedad en tipologías y rangos numéricos.
+
+    Returns:
+        tuple: (lista de tipologías, {"min", "max"} de dormitorios, total de unidades
+            disponibles contando "+10" como 10)
+    """
+    tipologias = [t for t in (parse_typology(line) for line in caracteristicas) if t]
+    bedrooms = [t["dormitorios"] for t in tipologias]
+    rango = {"min": min(bedrooms), "max": max(bedrooms)} if bedrooms else {"min": None, "max": None}
+    return tipologias, rango, sum(t["disponibles"] for t in tipologias)
+
+
+def structure_property(prop, uf_value, index=0):
+    """
+    Convierte una propiedad extraída en la estructura que se guarda y se envía a la API,
+    incluyendo los precios en UF.
+
+    Args:
+        prop (dict): Propiedad tal como la devuelve `parse_property_snapshot`
+        uf_value (float): Valor de la UF en pesos
+        index (int): Posición de la propiedad, usada como ID si el link no trae uno
+
+    Returns:
+        dict: Propiedad estructurada
+    """
+    # Extraer información adicional del precio
+    precio_desde = None
+    precio_hasta = None
+    if prop['precio'] != "No disponible" and "$" in prop['precio']:
+        # Extraer números del precio
+        precios = re.findall(r'\$([0-9,.]+)', prop['precio'])
+
+        def clean_price(p_str):
+            # Eliminar puntos (separador de miles) y reemplazar coma por punto (decimal)
+            return p_str.replace('.', '').replace(',', '.')
+
+        if len(precios) >= 2:
+            precio_desde = clean_price(precios[0])
+            precio_hasta = clean_price(precios[1])
+        elif len(precios) == 1:
+            precio_desde = clean_price(precios[0])
+
+    # Calcular precios en UF
+    precio_desde_uf = None
+    precio_hasta_uf = None
+    if uf_value > 0:
+        if precio_desde:
+            precio_desde_uf = int(round(float(precio_desde) / uf_value))
+        if precio_hasta:
+            precio_hasta_uf = int(round(float(precio_hasta) / uf_value))
+
+    # Extraer comuna de la dirección
+    comuna = "No disponible"
+    if prop['direccion'] != "No disponible" and "," in prop['direccion']:
+        parts = prop['direccion'].split(',')
+        if len(parts) >= 2:
+            comuna = parts[-1].strip()
+
+    # Extraer el ID desde el link de la propiedad
+    prop_id = extract_property_id(prop.get('link'))
+    if prop_id is None:
+        prop_id = index + 1  # ID por defecto en caso de que el link falle
+        print(f"No se pudo extraer el ID del link: {prop.get('link')}. Usando ID por defecto.")
+
+    # Tipologías con campos numéricos para filtrar sin búsqueda semántica
+    tipologias, dormitorios, disponibles = parse_typologies(prop['caracteristicas'])
+
+    # Estructura de cada propiedad
+    propiedad_estructurada = {
+        "id": prop_id,
+        "informacion_basica": {
+            "titulo": prop['titulo'],
+            "direccion_completa": prop['direccion'],
+            "comuna": comuna,
+            "link_propiedad": prop['link']
+        },
+        "precio": {
+            "precio_desde": precio_desde,
+            "precio_hasta": precio_hasta,
+            "moneda": "CLP",
+            "precio_desde_uf": precio_desde_uf,
+            "precio_hasta_uf": precio_hasta_uf
+        },
+        "servicios_disponibles": prop['servicios'],
+        "caracteristicas": prop['caracteristicas'],
+        "tipologias": tipologias,
+        "dormitorios": dormitorios,
+        "unidades_disponibles": disponibles,
+        "imagenes": prop.get('imagenes', []),
+        "servicios_especiales": {
+            "tiene_descuento": any('descuento' in s.lower() for s in prop['servicios']),
+            "garantia_cuotas": any('garantía' in s.lower() or 'cuotas' in s.lower() for s in prop['servicios']),
+            "sin_aval": any('sin aval' in s.lower() for s in prop['servicios']),
+            "servicio_pro": any('servicio pro' in s.lower() for s in prop['servicios'])
+        }
+    }
+    # Las unidades solo existen si se visitó la página de detalle. Sin ellas la clave se
+    # omite: la API actualiza los campos recibidos y conserva las unidades ya guardadas.
+    if 'unidades' in prop:
+        propiedad_estructurada["unidades"] = prop['unidades']
+
+    return propiedad_estructurada
+
+
+class ListingPage(list):
+    """
+    Propiedades válidas de una página de listado. `cards` guarda cuántas tarjetas traía
+    la página antes de descartar las que no tienen información, que es lo que indica si
+    la página estaba llena.
+    """
+
+    def __init__(self, properties=(), cards=None):
+        super().__init__(properties)
+        self.cards = len(self) if cards is None else cards
+
+
+def confirms_end_of_listing(page_properties, page_size):
+    """
+    Indica si una página confirma el final del listado: trae tarjetas, pero menos que
+    las páginas llenas anteriores. Una página vacía no lo confirma, porque es también
+    lo que queda tras un timeout de carga, un error o una respuesta 200 sin tarjetas.
+
+    Args:
+        page_properties (list): Propiedades de la página (`ListingPage` o lista simple)
+        page_size (int): Mayor cantidad de tarjetas vista en las páginas anteriores
+
+    Returns:
+        bool: True si la página es la última del listado
+    """
+    cards = getattr(page_properties, "cards", len(page_properties))
+    return bool(page_size) and 0 < cards < page_size
+
+
+def parse_listing_html(html, base_url="", snapshot_parser=None):
+    """
+    Convierte el HTML de una página de listado en la lista de propiedades válidas.
+
+    Args:
+        html (str): HTML de la página de listado
+        base_url (str): URL de la página, para resolver enlaces relativos
+        snapshot_parser (callable): Función que convierte una instantánea en propiedad
+            (por defecto `parse_property_snapshot`)
+
+    Returns:
+        ListingPage: Propiedades encontradas (mismo formato que `Scraper.scrape_page`)
+    """
+    snapshot_parser = snapshot_parser or parse_property_snapshot
+    snapshots = extract_card_snapshots(html, base_url)
+    properties = []
+    for snapshot in snapshots:
+        property_info = snapshot_parser(snapshot)
+        if property_info['titulo'] != "No disponible":
+            properties.append(property_info)
+    return ListingPage(properties, cards=len(snapshots))
+
+
+def parse_listing_file(path, base_url=""):
+    """Lee y parsea una página de listado guardada en disco."""
+    with open(path, encoding="utf-8") as f:
+        return parse_listing_html(f.read(), base_url)
+
+
+def parse_listing_files(paths, workers=None, base_url=""):
+    """
+    Parsea muchas páginas guardadas en paralelo usando un pool de procesos.
+
+    Args:
+        paths (list): Rutas de los archivos HTML
+        workers (int): Número de procesos (por defecto, uno por CPU)
+        base_url (str): URL base para resolver enlaces relativos
+
+    Returns:
+        list: Una lista de propiedades por archivo, en el mismo orden que `paths`
+    """
+    paths = list(paths)
+    if workers == 1 or len(paths) <= 1:
+        return [parse_listing_file(path, base_url) for path in paths]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_listing_file, paths, [base_url] * len(paths)))
@@ -1,32 +1,336 @@
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.chrome.options import Options
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from urllib.parse import urlparse
+import asyncio
+import logging
+import os
+import queue
+import threading
 import time
 import json
 import re
 import traceback
 import httpx
+from fetcher import fetch_listing_http
+from checkpoint import RunJournal
+from detail_crawler import crawl_details
+from fingerprints import FingerprintStore, fingerprint_snapshot, snapshot_property_id
+from listing_parser import (
+    ListingPage, confirms_end_of_listing, extract_property_id, parse_property_snapshot, structure_property,
+)
+from metrics import RunMetrics
+from snapshot import save_snapshot
+from uploader import ChunkedUploader, NDJSONWriter, StreamingOutput, wait_for_job
+
+CARD_SELECTOR = "article.building-card"
+COUNT_CARDS_SCRIPT = "return document.querySelectorAll(arguments[0]).length;"
+SCROLL_TO_BOTTOM_SCRIPT = "window.scrollTo(0, document.body.scrollHeight);"
+
+# Extrae todas las tarjetas de la página en un solo round-trip al WebDriver
+EXTRACT_CARDS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (card) {
+    return {
+        text: card.innerText,
+        hrefs: Array.from(card.querySelectorAll('a')).map(function (a) { return a.href; }),
+        images: Array.from(card.querySelectorAll('img')).map(function (img) { return img.src; })
+    };
+});
+"""
+
+logger = logging.getLogger("assetplan_scraper")
+
+# Recursos bloqueados a nivel de red en el perfil liviano: solo se necesitan el
+# texto, los enlaces y los atributos `src` de las imágenes, no su contenido.
+LEAN_BLOCKED_URLS = [
+    # Imágenes
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    # Fuentes
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # Audio y video
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8",
+    # Scripts de terceros (analítica, publicidad, chat)
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*", "*clarity.ms*", "*intercom.io*", "*hubspot.com*",
+]
+
+
+def log_property(snapshot, property_info):
+    """Muestra (en nivel DEBUG) el texto de la tarjeta y los campos principales extraídos."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug(f"Texto completo del elemento: {snapshot.get('text')}")
+    logger.debug(f"Título extraído: {property_info['titulo']}")
+    logger.debug(f"Dirección extraída: {property_info['direccion']}")
+    logger.debug(f"Precio extraído: {property_info['precio']}")
+
+
+def process_tree_rss_mb(root_pid):
+    """
+    Suma la memoria residente (RSS) de un proceso y todos sus descendientes.
+    Se usa para medir chromedriver + Chrome. Solo funciona en Linux (/proc).
+    
+    Returns:
+        float: RSS total en MB, o None si no se puede medir
+    """
+    if not root_pid or not os.path.isdir("/proc"):
+        return None
+
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # El nombre del proceso va entre paréntesis y puede contener espacios
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total_kb = 0
+    pending = [root_pid]
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except OSError:
+            continue
+    return round(total_kb / 1024, 1)
+
+
+def driver_pid(driver):
+    """Devuelve el PID del proceso chromedriver asociado al driver, si existe."""
+    process = getattr(getattr(driver, "service", None), "process", None)
+    return getattr(process, "pid", None)
+
+
+def read_network_stats(driver):
+    """
+    Lee y vacía el log de rendimiento de Chrome para contar los bytes descargados
+    y las solicitudes bloqueadas desde la última lectura.
+    
+    Returns:
+        dict: 'bytes_transferidos' y 'solicitudes_bloqueadas'
+    """
+    stats = {"bytes_transferidos": 0, "solicitudes_bloqueadas": 0}
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        print(f"No se pudo leer el log de rendimiento: {e}")
+        return stats
+
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method") == "Network.loadingFinished":
+            stats["bytes_transferidos"] += int(message["params"].get("encodedDataLength", 0))
+        elif message.get("method") == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            stats["solicitudes_bloqueadas"] += 1
+    return stats
+
+
+class HostRateLimiter:
+    """
+    Presupuesto de cortesía por host: garantiza un intervalo mínimo entre
+    navegaciones consecutivas al mismo dominio, aunque se hagan desde varios drivers.
+    """
+
+    def __init__(self, min_interval=1.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = {}
+
+    def wait(self, url):
+        """Bloquea hasta que el host de la URL tenga un turno disponible."""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class DriverPool:
+    """
+    Pool de drivers de Chrome reutilizables. Los drivers se crean bajo demanda
+    hasta el tamaño máximo y se devuelven al pool después de cada página.
+    """
+
+    def __init__(self, driver_factory, size=3, initial_drivers=None):
+        self.driver_factory = driver_factory
+        self.size = size
+        self._idle = queue.Queue()
+        self._created = []
+        self._lock = threading.Lock()
+        for driver in initial_drivers or []:
+            self._created.append(driver)
+            self._idle.put(driver)
+
+    @contextmanager
+    def acquire(self):
+        """Entrega un driver libre, creando uno nuevo si el pool aún no está lleno."""
+        driver = None
+        try:
+            driver = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = len(self._created) < self.size
+                if can_create:
+                    # Reservar el cupo antes de crear el driver (la creación es lenta)
+                    self._created.append(None)
+            if can_create:
+                try:
+                    driver = self.driver_factory()
+                except Exception:
+                    with self._lock:
+                        self._created.remove(None)
+                    raise
+                with self._lock:
+                    self._created[self._created.index(None)] = driver
+            else:
+                driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
+
+    def close(self, keep=None):
+        """Cierra todos los drivers del pool excepto los indicados en `keep`."""
+        keep = keep or []
+        for driver in self._created:
+            if driver is None or any(driver is k for k in keep):
+                continue
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"Error cerrando driver del pool: {e}")
+        self._created = []
 
 class Scraper:
-    def __init__(self):
+    def __init__(self, extraction_mode="batch", record_dir=None, lean_browser=False, fingerprints=None):
         """
         Inicializa el scraper de AssetPlan en modo headless.
+        
+        Args:
+            extraction_mode (str): "batch" extrae todas las tarjetas de la página con un
+                solo execute_script; "element" lee cada tarjeta con llamadas al WebDriver.
+            record_dir (str): Directorio donde guardar el HTML renderizado de cada página
+                (fixtures para el parser offline). Por defecto no se guarda.
+            lean_browser (bool): Usa un perfil de Chrome liviano que bloquea imágenes,
+                fuentes, media y scripts de terceros, con estrategia de carga "eager".
+            fingerprints (FingerprintStore): Almacén de huellas para scraping incremental;
+                las tarjetas sin cambios no se vuelven a parsear.
         """
-        self.setup_driver()
+        self.extraction_mode = extraction_mode
+        self.record_dir = record_dir
+        self.lean_browser = lean_browser
+        self.fingerprints = fingerprints
+        self.listing_exhausted = False
+        # Chrome se inicia solo cuando se necesita (ver ensure_driver)
+        self.driver = None
+        self.wait = None
         self.properties = []
+        self.page_metrics = []
+        self.metrics = RunMetrics()
         
     def setup_driver(self):
         """Configura el driver de Chrome para ejecución headless."""
+        self.driver = self.create_driver()
+        self.wait = WebDriverWait(self.driver, 15)
+
+    def ensure_driver(self):
+        """Inicia el driver principal si aún no existe y lo devuelve."""
+        if self.driver is None:
+            self.setup_driver()
+        return self.driver
+
+    def create_driver(self):
+        """Crea un nuevo driver de Chrome headless con la configuración del scraper."""
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+        # Log de red para medir los bytes transferidos por página
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        chrome_options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+
+        if self.lean_browser:
+            # Perfil liviano: viewport pequeño, sin imágenes y sin esperar subrecursos
+            chrome_options.add_argument("--window-size=800,600")
+            chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+            chrome_options.add_argument("--mute-audio")
+            chrome_options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+            })
+            chrome_options.page_load_strategy = "eager"
+
+        driver = self.metrics.instrument_driver(webdriver.Chrome(options=chrome_options))
+
+        if self.lean_browser:
+            # Bloquear fuentes, media y trackers a nivel de red vía CDP
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+
+        return driver
+
+    def wait_for_cards(self, driver, timeout=15, settle_timeout=0.75, max_scrolls=20):
+        """
+        Espera a que la página esté lista: primero a que aparezca al menos una tarjeta
+        y luego hace scroll hasta que la cantidad de tarjetas deja de crecer
+        (carga diferida / scroll infinito).
         
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+        Args:
+            driver: Driver sobre el que se espera
+            timeout (int): Segundos máximos para que aparezca la primera tarjeta
+            settle_timeout (float): Segundos a esperar por nuevas tarjetas tras cada scroll
+            max_scrolls (int): Límite de scrolls para evitar bucles infinitos
+            
+        Returns:
+            tuple: (cantidad de tarjetas, cantidad de scrolls realizados)
+        """
+        wait = self.wait if driver is self.driver else WebDriverWait(driver, timeout)
+        try:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, CARD_SELECTOR)))
+        except TimeoutException:
+            print(f"No aparecieron elementos '{CARD_SELECTOR}' después de {timeout}s")
+            return 0, 0
+
+        count = driver.execute_script(COUNT_CARDS_SCRIPT, CARD_SELECTOR)
+        scrolls = 0
+        while scrolls < max_scrolls:
+            driver.execute_script(SCROLL_TO_BOTTOM_SCRIPT)
+            scrolls += 1
+            previous = count
+
+            def cards_grew(d):
+                current = d.execute_script(COUNT_CARDS_SCRIPT, CARD_SELECTOR)
+                return current if current > previous else False
+
+            try:
+                count = WebDriverWait(driver, settle_timeout, poll_frequency=0.1).until(cards_grew)
+            except TimeoutException:
+                # La cantidad de tarjetas se estabilizó
+                break
+
+        return count, scrolls
         
     def extract_property_info(self, property_element):
         """
@@ -38,147 +342,105 @@ class Scraper:
         Returns:
             dict: Información de la propiedad
         """
-        property_info = {}
-        
-        try:
-            # Extraer todo el texto del elemento
-            full_text = property_element.text
-            print(f"Texto completo del elemento: {full_text}")
-            
-            # Dividir el texto en líneas para procesamiento
-            lines = [line.strip() for line in full_text.split('\n') if line.strip()]
-            
-            # Inicializar con valores por defecto
-            property_info['titulo'] = "No disponible"
-            property_info['link'] = "No disponible"
-            
-            # Buscar el enlace primero
-            try:
-                link_elements = property_element.find_elements(By.TAG_NAME, "a")
-                for link in link_elements:
-                    href = link.get_attribute('href')
-                    if href and '/arriendo/departamento/' in href and 'mapa' not in href:
-                        property_info['link'] = href
-                        break
-            except:
-                pass
-            
-            # Buscar el título del edificio
-            for line in lines:
-                if 'Edificio' in line and line.strip() != 'Edificio' and line.strip() != 'Servicio Pro':
-                    # Extraer solo el nombre después de "Edificio"
-                    if line.strip().startswith('Edificio '):
-                        property_info['titulo'] = line.strip()[9:]  # Remover "Edificio "
-                    else:
-                        property_info['titulo'] = line.strip()
-                    break
-        
-        except Exception as e:
-            print(f"Error extrayendo título: {e}")
-            property_info['titulo'] = "No disponible"
-            property_info['link'] = "No disponible"
-                
-        try:
-            # Dirección - buscar líneas que contengan direcciones
-            lines = [line.strip() for line in property_element.text.split('\n') if line.strip()]
-            for line in lines:
-                # Buscar patrones de dirección (número + texto + comuna)
-                if re.search(r'\d+.*,.*', line) and 'Edificio' not in line and '$' not in line:
-                    property_info['direccion'] = line.strip()
-                    break
-            else:
-                property_info['direccion'] = "No disponible"
-                
-        except Exception as e:
-            print(f"Error extrayendo dirección: {e}")
-            property_info['direccion'] = "No disponible"
-            
+        # Leer el texto, los enlaces y las imágenes una sola vez
+        snapshot = {"text": "", "hrefs": [], "images": []}
         try:
-            # Precio - buscar líneas que contengan $
-            lines = [line.strip() for line in property_element.text.split('\n') if line.strip()]
-            for line in lines:
-                if '$' in line and ('desde' in line.lower() or 'hasta' in line.lower() or '-' in line):
-                    property_info['precio'] = line.strip()
-                    break
-            else:
-                property_info['precio'] = "No disponible"
-                
-        except Exception as e:
-            print(f"Error extrayendo precio: {e}")
-            property_info['precio'] = "No disponible"
-            
-        try:
-            # Servicios - buscar líneas específicas
-            lines = [line.strip() for line in property_element.text.split('\n') if line.strip()]
-            servicios = []
-            service_keywords = ['descuento', 'garantía', 'aval', 'cuotas', 'sin aval', 'servicio']
-            
-            for line in lines:
-                line_lower = line.lower()
-                if any(keyword in line_lower for keyword in service_keywords):
-                    servicios.append(line.strip())
-                    
-            property_info['servicios'] = servicios
-            
+            snapshot["text"] = property_element.text
         except Exception as e:
-            print(f"Error extrayendo servicios: {e}")
-            property_info['servicios'] = []
-            
-        # Características adicionales
+            print(f"Error leyendo el texto del elemento: {e}")
         try:
-            lines = [line.strip() for line in property_element.text.split('\n') if line.strip()]
-            caracteristicas = []
-            for line in lines:
-                if any(word in line.lower() for word in ['dormitorio', 'baño', 'm²', 'estacionamiento', 'estudio', 'disponible']):
-                    caracteristicas.append(line.strip())
-            property_info['caracteristicas'] = caracteristicas
+            snapshot["hrefs"] = [link.get_attribute('href') for link in property_element.find_elements(By.TAG_NAME, "a")]
         except Exception as e:
-            print(f"Error extrayendo características: {e}")
-            property_info['caracteristicas'] = []
-            
-        # Extraer URLs de las imágenes
+            print(f"Error extrayendo enlaces: {e}")
         try:
-            image_elements = property_element.find_elements(By.TAG_NAME, "img")
-            image_urls = [img.get_attribute('src') for img in image_elements if img.get_attribute('src')]
-            property_info['imagenes'] = image_urls
+            snapshot["images"] = [img.get_attribute('src') for img in property_element.find_elements(By.TAG_NAME, "img")]
         except Exception as e:
             print(f"Error extrayendo imágenes: {e}")
-            property_info['imagenes'] = []
-            
-        # Debug: mostrar lo que se extrajo
-        print(f"Título extraído: {property_info['titulo']}")
-        print(f"Dirección extraída: {property_info['direccion']}")
-        print(f"Precio extraído: {property_info['precio']}")
-        
+
+        return self.parse_snapshot(snapshot)
+
+    def parse_snapshot(self, snapshot):
+        """
+        Parsea la instantánea de una tarjeta. Si hay almacén de huellas y la tarjeta
+        no cambió desde la ejecución anterior, reutiliza la propiedad ya parseada.
+        """
+        if self.fingerprints is None:
+            property_info = parse_property_snapshot(snapshot)
+            log_property(snapshot, property_info)
+            return property_info
+
+        prop_id = snapshot_property_id(snapshot)
+        digest = fingerprint_snapshot(snapshot)
+        cached = self.fingerprints.lookup(prop_id, digest)
+        if cached is not None:
+            logger.debug(f"= Propiedad {prop_id} sin cambios, se omite el parseo")
+            return cached
+
+        property_info = parse_property_snapshot(snapshot)
+        log_property(snapshot, property_info)
+        self.fingerprints.record(prop_id, digest, property_info)
         return property_info
         
-    def scrape_page(self, url):
+    def record_page_source(self, driver, url):
+        """Guarda el HTML renderizado de la página para usarlo como fixture offline."""
+        os.makedirs(self.record_dir, exist_ok=True)
+        filename = re.sub(r'[^A-Za-z0-9]+', '_', url.split('://')[-1]).strip('_') + ".html"
+        filepath = os.path.join(self.record_dir, filename)
+        try:
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(driver.page_source)
+            print(f"HTML guardado en: {filepath}")
+        except Exception as e:
+            print(f"Error guardando HTML de {url}: {e}")
+
+    def scrape_page(self, url, driver=None):
         """
         Extrae información de una página específica
         
         Args:
             url (str): URL de la página a scrapear
+            driver: Driver a utilizar (por defecto el driver principal del scraper)
             
         Returns:
-            list: Lista de propiedades encontradas
+            ListingPage: Lista de propiedades encontradas (vacía si la página no cargó)
         """
+        driver = driver or self.ensure_driver()
         print(f"Scrapeando: {url}")
-        self.driver.get(url)
+        metrics = {"url": url}
+        started = time.perf_counter()
+        driver.get(url)
+        elapsed = time.perf_counter() - started
+        metrics["navegacion_s"] = round(elapsed, 3)
+        self.metrics.add_phase("navegacion", elapsed)
         
         try:
-            # Esperar a que se cargue la página
-            time.sleep(5)
-            
-            # Scroll para cargar contenido dinámico
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
+            # Esperar a que aparezcan las tarjetas y a que termine la carga diferida
+            ready_started = time.perf_counter()
+            metrics["tarjetas"], metrics["scrolls"] = self.wait_for_cards(driver)
+            elapsed = time.perf_counter() - ready_started
+            metrics["espera_s"] = round(elapsed, 3)
+            self.metrics.add_phase("espera", elapsed)
+            metrics.update(read_network_stats(driver))
+            metrics["chrome_rss_mb"] = process_tree_rss_mb(driver_pid(driver))
+            self.page_metrics.append(metrics)
+            print(f"Página lista en {metrics['espera_s']}s ({metrics['tarjetas']} tarjetas, {metrics['scrolls']} scrolls)")
+            print(f"Transferidos {metrics['bytes_transferidos'] / 1024:.0f} KB "
+                  f"({metrics['solicitudes_bloqueadas']} solicitudes bloqueadas), Chrome RSS: {metrics['chrome_rss_mb']} MB")
+
+            if self.record_dir:
+                self.record_page_source(driver, url)
             
-            exact_selector = "article.building-card" 
+            exact_selector = CARD_SELECTOR
             
             property_elements = []
             try:
                 print(f"Buscando elementos con el selector exacto: '{exact_selector}'")
-                elements = self.driver.find_elements(By.CSS_SELECTOR, exact_selector)
+                with self.metrics.phase("extraccion"):
+                    if self.extraction_mode == "batch":
+                        # Una sola llamada devuelve el texto, enlaces e imágenes de todas las tarjetas
+                        elements = driver.execute_script(EXTRACT_CARDS_SCRIPT, exact_selector) or []
+                    else:
+                        elements = driver.find_elements(By.CSS_SELECTOR, exact_selector)
                 if elements:
                     print(f"Encontrados {len(elements)} elementos con el selector: '{exact_selector}'")
                     property_elements = elements
@@ -189,56 +451,217 @@ class Scraper:
 
             for i, element in enumerate(property_elements):
                 try:
-                    print(f"\nProcesando elemento {i+1}:")
-                    property_info = self.extract_property_info(element)
+                    logger.debug(f"Procesando elemento {i+1}:")
+                    card_started = time.perf_counter()
+                    if self.extraction_mode == "batch":
+                        property_info = self.parse_snapshot(element)
+                    else:
+                        # En modo "element" la tarjeta se lee con llamadas al WebDriver
+                        property_info = self.extract_property_info(element)
+                    elapsed = time.perf_counter() - card_started
+                    self.metrics.record_card(elapsed)
+                    self.metrics.add_phase("parseo", elapsed)
                     if property_info['titulo'] != "No disponible":
                         page_properties.append(property_info)
-                        print(f"✓ Propiedad agregada: {property_info['titulo']}")
+                        logger.debug(f"✓ Propiedad agregada: {property_info['titulo']}")
                     else:
-                        print("✗ Elemento sin información válida")
+                        logger.debug("✗ Elemento sin información válida")
                 except Exception as e:
                     print(f"✗ Error procesando elemento {i+1}: {e}")
                     continue
                     
+            page_properties = ListingPage(page_properties, cards=len(property_elements))
+            self.metrics.count_page(page_properties)
             return page_properties
             
         except Exception as e:
             print(f"Error general en scrape_page: {e}")
+            self.metrics.increment("paginas_fallidas")
             return []
             
-    def scrape_multiple_pages(self, base_url, target_properties=50):
+    def scrape_multiple_pages(self, base_url, target_properties=50, max_pages=10, journal=None, page_delay=3,
+                              on_page=None):
         """
         Scrapea múltiples páginas hasta obtener el número objetivo de propiedades
         
         Args:
             base_url (str): URL base sin el parámetro de página
             target_properties (int): Número objetivo de propiedades a obtener
+            max_pages (int): Límite máximo de páginas para evitar bucles infinitos
+            journal (RunJournal): Checkpoint donde se registra cada página completada;
+                las páginas ya registradas no se vuelven a scrapear
+            page_delay (float): Pausa en segundos entre páginas scrapeadas
+            on_page (callable): Si se indica, recibe las propiedades de cada página en lugar
+                de acumularlas en memoria (modo streaming)
         """
         all_properties = []
+        collected = 0
+        page_size = 0
         page = 1
-        max_pages = 10  # Límite máximo de páginas para evitar bucles infinitos
+        self.listing_exhausted = False
         
-        while len(all_properties) < target_properties and page <= max_pages:
+        while collected < target_properties and page <= max_pages:
             url = f"{base_url}?page={page}"
-            page_properties = self.scrape_page(url)
+            page_properties = self.load_checkpointed_page(journal, page)
+            from_checkpoint = page_properties is not None
+            if not from_checkpoint:
+                page_properties = self.scrape_page(url)
+                if journal and page_properties:
+                    journal.record_page(page, page_properties)
             
-            remaining_needed = target_properties - len(all_properties)
+            remaining_needed = target_properties - collected
             properties_to_add = page_properties[:remaining_needed]
-            all_properties.extend(properties_to_add)
+            collected += len(properties_to_add)
+            if on_page:
+                on_page(properties_to_add)
+            else:
+                all_properties.extend(properties_to_add)
             
             print(f"Página {page}: {len(page_properties)} propiedades encontradas")
-            print(f"Total acumulado: {len(all_properties)}/{target_properties}")
+            print(f"Total acumulado: {collected}/{target_properties}")
+
+            if confirms_end_of_listing(page_properties, page_size):
+                # Una página con menos tarjetas que las anteriores es la última del listado
+                self.listing_exhausted = True
+                break
+
+            if not page_properties:
+                # Una página vacía puede ser un timeout o un error: la ejecución queda incompleta
+                break
+            page_size = max(page_size, getattr(page_properties, "cards", len(page_properties)))
             
-            if len(all_properties) >= target_properties:
-                print(f"✓ Objetivo alcanzado: {len(all_properties)} propiedades obtenidas")
+            if collected >= target_properties:
+                print(f"✓ Objetivo alcanzado: {collected} propiedades obtenidas")
                 break
             
             page += 1
             # Pausa entre páginas
-            time.sleep(3)
+            if not from_checkpoint:
+                time.sleep(page_delay)
             
         self.properties = all_properties
         return all_properties
+
+    def load_checkpointed_page(self, journal, page):
+        """
+        Devuelve las propiedades de una página ya registrada en el checkpoint, o None.
+        Las propiedades reanudadas se marcan como vistas en el almacén de huellas.
+        """
+        if journal is None:
+            return None
+        page_properties = journal.get(page)
+        if page_properties is not None:
+            print(f"Página {page} recuperada desde el checkpoint")
+            if self.fingerprints is not None:
+                for prop in page_properties:
+                    self.fingerprints.mark_seen(extract_property_id(prop.get('link')))
+        return page_properties
+
+    def scrape_multiple_pages_parallel(self, base_url, target_properties=50, workers=3,
+                                       max_pages=10, max_in_flight=None, host_delay=1.0, journal=None,
+                                       on_page=None):
+        """
+        Scrapea múltiples páginas en paralelo repartiéndolas en un pool de drivers.
+        Los resultados se combinan en orden de página y se deja de encolar páginas
+        en cuanto se alcanza el objetivo.
+        
+        Args:
+            base_url (str): URL base sin el parámetro de página
+            target_properties (int): Número objetivo de propiedades a obtener
+            workers (int): Número de drivers de Chrome en el pool
+            max_pages (int): Límite máximo de páginas a visitar
+            max_in_flight (int): Máximo de páginas en vuelo simultáneamente (por defecto `workers`)
+            host_delay (float): Segundos mínimos entre navegaciones al mismo host
+            journal (RunJournal): Checkpoint donde se registra cada página completada
+            on_page (callable): Si se indica, recibe las propiedades de cada página (en orden)
+                en lugar de acumularlas en memoria (modo streaming)
+        """
+        max_in_flight = max_in_flight or workers
+        limiter = HostRateLimiter(host_delay)
+        pool = DriverPool(self.create_driver, size=workers, initial_drivers=[self.ensure_driver()])
+
+        def scrape_with_pool(url):
+            with pool.acquire() as driver:
+                limiter.wait(url)
+                return self.scrape_page(url, driver=driver)
+
+        all_properties = []
+        collected = 0
+        pending = {}
+        finished = {}
+        next_page = 1
+        next_to_merge = 1
+        page_size = 0
+        exhausted = False
+        stopped = False
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+                while True:
+                    # Encolar páginas mientras haya cupo y el objetivo no esté cubierto
+                    while (not stopped and len(pending) < max_in_flight
+                           and next_page <= max_pages
+                           and collected < target_properties):
+                        checkpointed = self.load_checkpointed_page(journal, next_page)
+                        if checkpointed is not None:
+                            finished[next_page] = checkpointed
+                        else:
+                            url = f"{base_url}?page={next_page}"
+                            pending[executor.submit(scrape_with_pool, url)] = next_page
+                        next_page += 1
+
+                    if pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            page = pending.pop(future)
+                            try:
+                                finished[page] = future.result()
+                            except Exception as e:
+                                # Un fallo de navegación (p. ej. Chrome caído) detiene la ejecución;
+                                # las páginas ya registradas en el checkpoint se reutilizan al reintentar
+                                print(f"✗ Error scrapeando página {page}: {e}")
+                                for other in pending:
+                                    other.cancel()
+                                raise
+                            if journal and finished[page]:
+                                journal.record_page(page, finished[page])
+
+                    # Combinar en orden de página
+                    while not stopped and next_to_merge in finished:
+                        page_properties = finished.pop(next_to_merge)
+                        if collected < target_properties:
+                            properties_to_add = page_properties[:target_properties - collected]
+                            collected += len(properties_to_add)
+                            if on_page:
+                                on_page(properties_to_add)
+                            else:
+                                all_properties.extend(properties_to_add)
+                            print(f"Página {next_to_merge}: {len(page_properties)} propiedades encontradas")
+                            print(f"Total acumulado: {collected}/{target_properties}")
+                        if confirms_end_of_listing(page_properties, page_size):
+                            # Una página con menos tarjetas que las anteriores es la última del listado
+                            exhausted = stopped = True
+                        elif not page_properties:
+                            # Una página vacía puede ser un timeout o un error: la ejecución queda incompleta
+                            stopped = True
+                        page_size = max(page_size, getattr(page_properties, "cards", len(page_properties)))
+                        next_to_merge += 1
+
+                    if collected >= target_properties or stopped:
+                        for future in pending:
+                            future.cancel()
+                        if collected >= target_properties:
+                            print(f"✓ Objetivo alcanzado: {collected} propiedades obtenidas")
+                        break
+
+                    if not pending:
+                        break
+        finally:
+            pool.close(keep=[self.driver])
+
+        self.listing_exhausted = exhausted
+        self.properties = all_properties
+        return all_properties
         
     def save_to_json(self, uf_value, filename="propiedades_assetplan.json"):
         """Guarda los datos en formato JSON bien estructurado, incluyendo precios en UF"""
@@ -251,134 +674,207 @@ class Scraper:
             "propiedades": []
         }
         
-        # Procesar cada propiedad
-        for i, prop in enumerate(self.properties):
-            # Extraer información adicional del precio
-            precio_desde = None
-            precio_hasta = None
-            if prop['precio'] != "No disponible" and "$" in prop['precio']:
-                # Extraer números del precio
-                precios = re.findall(r'\$([0-9,.]+)', prop['precio'])
-                
-                def clean_price(p_str):
-                    # Eliminar puntos (separador de miles) y reemplazar coma por punto (decimal)
-                    return p_str.replace('.', '').replace(',', '.')
-
-                if len(precios) >= 2:
-                    precio_desde = clean_price(precios[0])
-                    precio_hasta = clean_price(precios[1])
-                elif len(precios) == 1:
-                    precio_desde = clean_price(precios[0])
+        with self.metrics.phase("serializacion"):
+            # Procesar cada propiedad
+            for i, prop in enumerate(self.properties):
+                json_data["propiedades"].append(structure_property(prop, uf_value, i))
             
-            # Calcular precios en UF
-            precio_desde_uf = None
-            precio_hasta_uf = None
-            if uf_value > 0:
-                if precio_desde:
-                    precio_desde_uf = int(round(float(precio_desde) / uf_value))
-                if precio_hasta:
-                    precio_hasta_uf = int(round(float(precio_hasta) / uf_value))
-
-            # Extraer comuna de la dirección
-            comuna = "No disponible"
-            if prop['direccion'] != "No disponible" and "," in prop['direccion']:
-                parts = prop['direccion'].split(',')
-                if len(parts) >= 2:
-                    comuna = parts[-1].strip()
-            
-            # Extraer el ID desde el link de la propiedad
-            prop_id = i + 1  # ID por defecto en caso de que el link falle
-            if prop.get('link') and prop['link'] != "No disponible":
-                try:
-                    # Tomar la última parte de la URL que debería ser el ID
-                    id_str = prop['link'].strip('/').split('/')[-1]
-                    if id_str.isdigit():
-                        prop_id = int(id_str)
-                except (ValueError, IndexError):
-                    print(f"No se pudo extraer el ID del link: {prop['link']}. Usando ID por defecto.")
-
-            # Estructura de cada propiedad
-            propiedad_estructurada = {
-                "id": prop_id,
-                "informacion_basica": {
-                    "titulo": prop['titulo'],
-                    "direccion_completa": prop['direccion'],
-                    "comuna": comuna,
-                    "link_propiedad": prop['link']
-                },
-                "precio": {
-                    "precio_desde": precio_desde,
-                    "precio_hasta": precio_hasta,
-                    "moneda": "CLP",
-                    "precio_desde_uf": precio_desde_uf,
-                    "precio_hasta_uf": precio_hasta_uf
-                },
-                "servicios_disponibles": prop['servicios'],
-                "caracteristicas": prop['caracteristicas'],
-                "imagenes": prop.get('imagenes', []),
-                "servicios_especiales": {
-                    "tiene_descuento": any('descuento' in s.lower() for s in prop['servicios']),
-                    "garantia_cuotas": any('garantía' in s.lower() or 'cuotas' in s.lower() for s in prop['servicios']),
-                    "sin_aval": any('sin aval' in s.lower() for s in prop['servicios']),
-                    "servicio_pro": any('servicio pro' in s.lower() for s in prop['servicios'])
-                }
-            }
+            # Guardar en directorio actual
+            current_dir = os.getcwd()
+            filepath = os.path.join(current_dir, filename)
             
-            json_data["propiedades"].append(propiedad_estructurada)
-        
-        # Guardar en directorio actual
-        import os
-        current_dir = os.getcwd()
-        filepath = os.path.join(current_dir, filename)
-        
-        try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
-            print(f"Datos guardados exitosamente en: {filepath}")
-        except Exception as e:
-            print(f"Error al guardar JSON: {e}")
+            try:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(json_data, f, ensure_ascii=False, indent=2)
+                print(f"Datos guardados exitosamente en: {filepath}")
+            except Exception as e:
+                print(f"Error al guardar JSON: {e}")
             
         return filepath, json_data
         
+    def scrape_http_first(self, base_url, target_properties=50, max_pages=10, workers=1, host_delay=1.0,
+                          journal=None, on_page=None):
+        """
+        Obtiene las propiedades primero por HTTP (sin navegador) y solo recurre a
+        Chrome si el HTML descargado no trae tarjetas `building-card`.
+        
+        Args:
+            base_url (str): URL base sin el parámetro de página
+            target_properties (int): Número objetivo de propiedades a obtener
+            max_pages (int): Límite máximo de páginas a visitar
+            workers (int): Drivers de Chrome a usar en el respaldo (1 = secuencial)
+            host_delay (float): Segundos mínimos entre peticiones al mismo host, por HTTP y
+                en el respaldo paralelo
+            journal (RunJournal): Checkpoint para el respaldo con Selenium
+            on_page (callable): Receptor de las propiedades de cada página (modo streaming)
+        """
+        streamed = 0
+
+        def count_streamed(page_properties):
+            nonlocal streamed
+            streamed += len(page_properties)
+            on_page(page_properties)
+
+        def timed_parse(snapshot):
+            card_started = time.perf_counter()
+            property_info = self.parse_snapshot(snapshot)
+            self.metrics.record_card(time.perf_counter() - card_started)
+            return property_info
+
+        with self.metrics.phase("descarga_http"):
+            properties, self.listing_exhausted = asyncio.run(
+                fetch_listing_http(
+                    base_url, target_properties, max_pages=max_pages, concurrency=max(workers, 1),
+                    snapshot_parser=timed_parse, on_page=count_streamed if on_page else None,
+                    host_delay=host_delay, metrics=self.metrics,
+                )
+            )
+        if properties or streamed:
+            print(f"✓ {len(properties) or streamed} propiedades obtenidas por HTTP, sin iniciar Chrome")
+            self.properties = properties
+            return properties
+
+        print("El HTML no contiene tarjetas, usando Selenium como respaldo...")
+        if workers > 1:
+            return self.scrape_multiple_pages_parallel(
+                base_url, target_properties, workers=workers, max_pages=max_pages, host_delay=host_delay,
+                journal=journal, on_page=on_page,
+            )
+        return self.scrape_multiple_pages(
+            base_url, target_properties, max_pages=max_pages, journal=journal, on_page=on_page
+        )
+
     def close(self):
-        self.driver.quit()
+        if self.driver is not None:
+            self.driver.quit()
+            self.driver = None
 
 def main():
     """Función principal para testing"""
 
     # Configuración
     BASE_URL = "https://www.assetplan.cl/arriendo/departamento"
+    API_URL = "http://localhost:8010/load-deptos"
     TARGET_PROPERTIES = 50  # Objetivo: obtener 50 propiedades
     UF_VALUE = 39
+    PARALLEL_WORKERS = 3  # Drivers en paralelo (1 = modo secuencial)
+    HOST_DELAY = 1.0  # Segundos mínimos entre navegaciones al mismo host
+    HTTP_FIRST = True  # Intentar primero por HTTP y usar Chrome solo como respaldo
+    LEAN_BROWSER = True  # Perfil de Chrome liviano (sin imágenes, fuentes ni trackers)
+    INCREMENTAL = True  # Enviar solo propiedades nuevas, modificadas o eliminadas
+    FINGERPRINTS_PATH = ".fingerprints.json"
+    MAX_PAGES = 10  # Límite de páginas del listado
+    CHECKPOINT_PATH = ".scrape_checkpoint.jsonl"  # Journal para reanudar ejecuciones interrumpidas
+    DETAIL_CRAWL = True  # Visitar la página de cada propiedad para obtener sus unidades
+    DETAIL_CONCURRENCY = 5  # Páginas de detalle descargadas simultáneamente
+    DETAIL_INTERVAL = 0.5  # Segundos mínimos entre peticiones de detalle
+    STREAMING = False  # Escribir NDJSON y subir por bloques mientras se scrapea
+    STREAM_PATH = "propiedades_assetplan.ndjson"
+    UPLOAD_CHUNK_SIZE = 100  # Propiedades por bloque en modo streaming
+    COLUMNAR_SNAPSHOT = False  # Guardar además una instantánea columnar comprimida
+    SNAPSHOT_DIR = "snapshots"  # Directorio de instantáneas históricas
+    LOG_LEVEL = "INFO"  # "DEBUG" muestra el texto y los campos de cada tarjeta
+    REPORT_PATH = "reporte_ejecucion.json"  # Reporte de rendimiento de la ejecución
 
-    scraper = Scraper()
+    logging.basicConfig(level=LOG_LEVEL, format="%(message)s")
+    fingerprints = FingerprintStore(FINGERPRINTS_PATH) if INCREMENTAL else None
+    scraper = Scraper(lean_browser=LEAN_BROWSER, fingerprints=fingerprints)
+    output = None
+
+    def run_scrape(journal, on_page=None):
+        if HTTP_FIRST:
+            return scraper.scrape_http_first(
+                BASE_URL, TARGET_PROPERTIES, max_pages=MAX_PAGES, workers=PARALLEL_WORKERS,
+                host_delay=HOST_DELAY, journal=journal, on_page=on_page,
+            )
+        if PARALLEL_WORKERS > 1:
+            return scraper.scrape_multiple_pages_parallel(
+                BASE_URL, TARGET_PROPERTIES, workers=PARALLEL_WORKERS, max_pages=MAX_PAGES,
+                host_delay=HOST_DELAY, journal=journal, on_page=on_page,
+            )
+        return scraper.scrape_multiple_pages(
+            BASE_URL, TARGET_PROPERTIES, max_pages=MAX_PAGES, journal=journal, on_page=on_page
+        )
     
     try:
         print("Iniciando scraping de AssetPlan...")
         print(f"Objetivo: obtener {TARGET_PROPERTIES} propiedades")
         
-        # Scrapear propiedades
-        properties = scraper.scrape_multiple_pages(BASE_URL, TARGET_PROPERTIES)
+        # Scrapear propiedades (reanudando desde el checkpoint si la ejecución anterior se interrumpió)
+        journal = RunJournal(CHECKPOINT_PATH, BASE_URL, TARGET_PROPERTIES)
+
+        if STREAMING:
+            uploader = ChunkedUploader(API_URL, chunk_size=UPLOAD_CHUNK_SIZE, metrics=scraper.metrics)
+            output = StreamingOutput(UF_VALUE, NDJSONWriter(STREAM_PATH), uploader, fingerprints)
+            run_scrape(journal, on_page=output)
+
+            eliminadas = []
+            if fingerprints is not None:
+                eliminadas = fingerprints.build_delta([], complete=scraper.listing_exhausted)["eliminadas"]
+            output.close(eliminadas=eliminadas)
+            journal.finish()
+
+            print(f"\n=== RESUMEN FINAL ===")
+            print(f"- Propiedades obtenidas: {output.count} (guardadas en {STREAM_PATH})")
+            print(f"- Bloques enviados: {uploader.chunks_sent}, fallidos: {uploader.failed_chunks}")
+            # Solo se confirman las huellas si todos los bloques quedaron ingeridos por la API
+            if fingerprints is not None and uploader.failed_chunks == 0:
+                fingerprints.save(output.uploaded_ids, removed_ids=eliminadas)
+            return
+
+        properties = run_scrape(journal)
+
+        if properties and DETAIL_CRAWL:
+            print(f"\n=== DESCARGANDO DETALLE DE {len(properties)} PROPIEDADES ===")
+            with scraper.metrics.phase("detalle"):
+                changed = crawl_details(properties, concurrency=DETAIL_CONCURRENCY, min_interval=DETAIL_INTERVAL)
+            if fingerprints is not None:
+                for prop in changed:
+                    fingerprints.mark_changed(extract_property_id(prop['link']), prop)
         
         # Guardar datos si se encontraron
         if properties:
             print(f"\n=== GUARDANDO RESULTADOS ===")
             json_path, json_data = scraper.save_to_json(UF_VALUE)
+            if json_path:
+                # Los resultados ya están en disco: el checkpoint deja de ser necesario
+                journal.finish()
+            if json_data and COLUMNAR_SNAPSHOT:
+                with scraper.metrics.phase("serializacion"):
+                    save_snapshot(json_data["propiedades"], SNAPSHOT_DIR)
 
-            if json_data:
+            payload = json_data
+            if json_data and fingerprints is not None:
+                payload = fingerprints.build_delta(json_data["propiedades"], complete=scraper.listing_exhausted)
+                print(f"Delta: {payload['resumen']}")
+
+            if payload and (payload["propiedades"] or payload.get("eliminadas")):
                 try:
-                    url = "http://localhost:8010/load-deptos"
-                    
                     with httpx.Client(follow_redirects=True) as client:
-                        response = client.post(url, json=json_data)
-                    
-                    if response.status_code == 200:
-                        print(f"Datos enviados exitosamente a {url}")
-                    else:
-                        print(f"Error al enviar datos: {response.status_code}")
+                        with scraper.metrics.phase("subida"):
+                            response = client.post(API_URL, json=payload)
+
+                        # La API responde 202 con el id del trabajo de ingesta en segundo plano
+                        task_id = response.json().get("task_id") if response.status_code == 202 else None
+                        scraper.metrics.increment("bloques_enviados" if task_id else "bloques_fallidos")
+                        if task_id:
+                            print(f"Datos enviados a {API_URL} (trabajo de ingesta {task_id}), esperando que termine")
+                            # Solo se confirman las huellas cuando el trabajo quedó escrito y sincronizado
+                            if wait_for_job(client, API_URL, task_id):
+                                print(f"Trabajo de ingesta {task_id} completado")
+                                if fingerprints is not None:
+                                    fingerprints.save(
+                                        [p["id"] for p in payload["propiedades"]], removed_ids=payload["eliminadas"]
+                                    )
+                            else:
+                                scraper.metrics.increment("trabajos_ingesta_fallidos")
+                        else:
+                            print(f"Error al enviar datos: {response.status_code}")
                         
                 except httpx.RequestError as e:
                     print(f"Error de conexión al enviar datos: {e}")
+            elif payload:
+                print("No hay cambios desde la última ejecución, no se envían datos")
 
             if json_path:
                 print(f"\n=== RESUMEN FINAL ===")
@@ -393,6 +889,12 @@ def main():
         
     finally:
         scraper.close()
+        # En modo streaming las propiedades no se acumulan en `scraper.properties`
+        scraper.metrics.write_report(
+            REPORT_PATH, propiedades=output.count if output is not None else len(scraper.properties),
+            paginas=scraper.page_metrics,
+        )
+        print(f"Reporte de rendimiento guardado en: {REPORT_PATH}")
         print("\nProceso completado.")
 
 if __name__ == "__main__":
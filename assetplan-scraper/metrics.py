@@ -0,0 +1,143 @@
+"""
+Instrumentación de rendimiento del scraper.
+
+`RunMetrics` acumula el tiempo de cada fase (navegación, espera, extracción,
+parseo, serialización, subida...), la latencia por tarjeta, la cantidad de
+comandos enviados al WebDriver y contadores de descarga, parseo y subida, y genera
+un reporte JSON al final de la ejecución.
+"""
+import json
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+def summarize_latencies(samples):
+    """Resumen en milisegundos (cantidad, promedio, p50, p95 y máximo) de una lista de segundos."""
+    if not samples:
+        return {"cantidad": 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "cantidad": len(ordered),
+        "promedio_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(0.5) * 1000, 3),
+        "p95_ms": round(percentile(0.95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+class RunMetrics:
+    """Métricas de una ejecución; seguro para usar desde varios hilos (modo paralelo)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self._started_perf = time.perf_counter()
+        self.phases = defaultdict(float)
+        self.phase_counts = Counter()
+        self.card_latencies = []
+        self.webdriver_calls = Counter()
+        self.counters = Counter()
+
+    def reset(self):
+        """
+        Reinicia las métricas para una nueva ejecución. Los drivers ya instrumentados
+        siguen reportando a este mismo objeto.
+        """
+        with self._lock:
+            self.started = time.time()
+            self._started_perf = time.perf_counter()
+            self.phases.clear()
+            self.phase_counts.clear()
+            self.card_latencies.clear()
+            self.webdriver_calls.clear()
+            self.counters.clear()
+
+    @contextmanager
+    def phase(self, name):
+        """Suma al total de la fase `name` el tiempo del bloque."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+
+    def add_phase(self, name, seconds):
+        with self._lock:
+            self.phases[name] += seconds
+            self.phase_counts[name] += 1
+
+    def record_card(self, seconds):
+        """Registra la latencia de extracción y parseo de una tarjeta."""
+        with self._lock:
+            self.card_latencies.append(seconds)
+
+    def increment(self, name, amount=1):
+        """Suma `amount` al contador `name` (páginas descargadas, bloques enviados, ...)."""
+        with self._lock:
+            self.counters[name] += amount
+
+    def count_page(self, page_properties):
+        """
+        Cuenta una página de listado descargada: sus tarjetas, las propiedades
+        parseadas y las tarjetas descartadas por no tener información válida.
+        """
+        cards = getattr(page_properties, "cards", len(page_properties))
+        with self._lock:
+            self.counters["paginas_descargadas"] += 1
+            self.counters["tarjetas"] += cards
+            self.counters["propiedades_parseadas"] += len(page_properties)
+            self.counters["tarjetas_descartadas"] += max(0, cards - len(page_properties))
+
+    def instrument_driver(self, driver):
+        """
+        Cuenta los comandos que el driver envía a chromedriver envolviendo `driver.execute`,
+        por donde pasan todas las llamadas (get, find_elements, execute_script, ...).
+        """
+        original_execute = driver.execute
+
+        def execute(driver_command, params=None):
+            with self._lock:
+                self.webdriver_calls[driver_command] += 1
+            return original_execute(driver_command, params)
+
+        driver.execute = execute
+        return driver
+
+    def report(self, **extra):
+        """
+        Construye el reporte de la ejecución.
+
+        Returns:
+            dict: Fases, latencia por tarjeta, llamadas al WebDriver, contadores y
+                los campos adicionales recibidos
+        """
+        with self._lock:
+            report = {
+                "inicio": self.started,
+                "duracion_total_s": round(time.perf_counter() - self._started_perf, 3),
+                "fases": {
+                    name: {"total_s": round(total, 3), "veces": self.phase_counts[name]}
+                    for name, total in self.phases.items()
+                },
+                "tarjetas": summarize_latencies(self.card_latencies),
+                "llamadas_webdriver": {
+                    "total": sum(self.webdriver_calls.values()),
+                    "por_comando": dict(self.webdriver_calls.most_common()),
+                },
+                "contadores": dict(self.counters),
+            }
+        report.update(extra)
+        return report
+
+    def write_report(self, path, **extra):
+        """Escribe el reporte en formato JSON y lo devuelve."""
+        report = self.report(**extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
@@ -0,0 +1,164 @@
+"""
+Formato columnar compacto para instantáneas históricas del scraping.
+
+`propiedades_assetplan.json` repite en cada fila las mismas claves, comunas,
+servicios y URLs de imágenes, y se guarda con indentación. Este formato guarda
+el mismo contenido por columnas (una por ruta de campo, p. ej.
+`informacion_basica.comuna`), codifica los strings con un diccionario compartido
+y comprime el resultado con gzip:
+
+    {
+      "formato": "assetplan-columnar", "version": 1, "filas": 2,
+      "diccionario": ["Santiago", "Ñuñoa", ...],
+      "columnas": {
+        "id": {"tipo": "crudo", "valores": [3063, 3064]},
+        "informacion_basica.comuna": {"tipo": "dict", "valores": [0, 1]},
+        "servicios_disponibles": {"tipo": "lista_dict", "valores": [[2, 3], []]}
+      }
+    }
+
+Solo usa la biblioteca estándar (JSON + gzip), por lo que la API puede leerlo
+sin dependencias nuevas (ver `src/services/snapshot_codec.py` en la API).
+"""
+import gzip
+import json
+import os
+import time
+
+FORMAT_NAME = "assetplan-columnar"
+FORMAT_VERSION = 1
+
+
+def flatten(obj, prefix=""):
+    """Aplana diccionarios anidados en rutas con punto ("precio.precio_desde_uf")."""
+    items = {}
+    for key, value in obj.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict) and value:
+            items.update(flatten(value, f"{path}."))
+        else:
+            items[path] = value
+    return items
+
+
+def unflatten(flat):
+    """Reconstruye los diccionarios anidados a partir de las rutas con punto."""
+    obj = {}
+    for path, value in flat.items():
+        target = obj
+        *parents, leaf = path.split(".")
+        for key in parents:
+            # Una fila puede traer None donde otras traen un diccionario
+            if not isinstance(target.get(key), dict):
+                target[key] = {}
+            target = target[key]
+        if value is None and isinstance(target.get(leaf), dict):
+            continue
+        target[leaf] = value
+    return obj
+
+
+def _column_type(values):
+    if all(v is None or isinstance(v, str) for v in values):
+        return "dict"
+    if all(isinstance(v, list) and all(isinstance(i, str) for i in v) for v in values):
+        return "lista_dict"
+    return "crudo"
+
+
+def encode_properties(propiedades):
+    """
+    Convierte la lista de propiedades en el documento columnar.
+
+    Args:
+        propiedades (list): Propiedades en el formato de `save_to_json`
+
+    Returns:
+        dict: Documento columnar (sin comprimir)
+    """
+    rows = [flatten(prop) for prop in propiedades]
+    paths = []
+    seen = set()
+    for row in rows:
+        for path in row:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+
+    dictionary = []
+    index = {}
+
+    def code(string):
+        if string not in index:
+            index[string] = len(dictionary)
+            dictionary.append(string)
+        return index[string]
+
+    columns = {}
+    for path in paths:
+        values = [row.get(path) for row in rows]
+        kind = _column_type(values)
+        if kind == "dict":
+            values = [None if v is None else code(v) for v in values]
+        elif kind == "lista_dict":
+            values = [[code(item) for item in v] for v in values]
+        columns[path] = {"tipo": kind, "valores": values}
+
+    return {
+        "formato": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "filas": len(rows),
+        "diccionario": dictionary,
+        "columnas": columns,
+    }
+
+
+def decode_properties(document):
+    """Reconstruye la lista de propiedades a partir del documento columnar."""
+    if document.get("formato") != FORMAT_NAME or document.get("version") != FORMAT_VERSION:
+        raise ValueError("El documento no es una instantánea columnar compatible")
+
+    dictionary = document["diccionario"]
+    rows = [{} for _ in range(document["filas"])]
+    for path, column in document["columnas"].items():
+        kind = column["tipo"]
+        for row, value in zip(rows, column["valores"]):
+            if kind == "dict":
+                value = None if value is None else dictionary[value]
+            elif kind == "lista_dict":
+                value = [dictionary[item] for item in value]
+            row[path] = value
+    return [unflatten(row) for row in rows]
+
+
+def dump_snapshot(propiedades):
+    """Serializa las propiedades como documento columnar comprimido (bytes)."""
+    payload = json.dumps(encode_properties(propiedades), ensure_ascii=False, separators=(",", ":"))
+    return gzip.compress(payload.encode("utf-8"))
+
+
+def load_snapshot_bytes(data):
+    """Inverso de `dump_snapshot`."""
+    return decode_properties(json.loads(gzip.decompress(data)))
+
+
+def save_snapshot(propiedades, directory="snapshots"):
+    """
+    Guarda una instantánea histórica con marca de tiempo.
+
+    Returns:
+        str: Ruta del archivo creado
+    """
+    os.makedirs(directory, exist_ok=True)
+    filepath = os.path.join(directory, time.strftime("propiedades_%Y%m%d_%H%M%S.apcol.gz"))
+    data = dump_snapshot(propiedades)
+    with open(filepath, "wb") as f:
+        f.write(data)
+    print(f"Instantánea columnar guardada en: {filepath} ({len(data) / 1024:.1f} KB)")
+    return filepath
+
+
+def load_snapshot(path):
+    """Lee una instantánea columnar desde disco."""
+    with open(path, "rb") as f:
+        return load_snapshot_bytes(f.read())
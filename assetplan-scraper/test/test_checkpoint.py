@@ -0,0 +1,78 @@
+import pytest
+
+from checkpoint import RunJournal
+from listing_parser import ListingPage
+from test_parallel import FakeScraper
+
+BASE_URL = "https://example.test/arriendo"
+
+
+class CrashingScraper(FakeScraper):
+    """Simula una caída de Chrome al llegar a una página concreta."""
+
+    def __init__(self, crash_on_page=None, invalid_card_page=None, **kwargs):
+        self.crash_on_page = crash_on_page
+        self.invalid_card_page = invalid_card_page
+        super().__init__(**kwargs)
+
+    def scrape_page(self, url, driver=None):
+        page = int(url.split("page=")[-1])
+        if page == self.crash_on_page:
+            raise RuntimeError("chrome not reachable")
+        properties = super().scrape_page(url, driver)
+        if page == self.invalid_card_page:
+            # Una tarjeta sin información válida se descarta pero sigue contando como tarjeta
+            return ListingPage(properties[1:], cards=len(properties))
+        return properties
+
+
+def test_run_resumes_from_last_finished_page(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+
+    crashing = CrashingScraper(crash_on_page=3)
+    with pytest.raises(RuntimeError):
+        crashing.scrape_multiple_pages(BASE_URL, target_properties=40, journal=RunJournal(path, BASE_URL, 40), page_delay=0)
+
+    resumed = CrashingScraper()
+    properties = resumed.scrape_multiple_pages(BASE_URL, target_properties=40, journal=RunJournal(path, BASE_URL, 40), page_delay=0)
+
+    assert len(properties) == 40
+    assert resumed.visited == [3, 4]
+
+
+def test_resumed_page_with_an_invalid_card_does_not_end_the_listing(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+
+    crashing = CrashingScraper(crash_on_page=3, invalid_card_page=2)
+    with pytest.raises(RuntimeError):
+        crashing.scrape_multiple_pages(BASE_URL, target_properties=40, journal=RunJournal(path, BASE_URL, 40), page_delay=0)
+
+    journal = RunJournal(path, BASE_URL, 40)
+    assert len(journal.get(2)) == 9 and journal.get(2).cards == 10
+
+    resumed = CrashingScraper()
+    properties = resumed.scrape_multiple_pages(BASE_URL, target_properties=40, journal=journal, page_delay=0)
+
+    assert resumed.visited == [3, 4, 5]
+    assert len(properties) == 40
+    assert resumed.listing_exhausted is False
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    journal = RunJournal(path, BASE_URL, 40)
+    journal.record_page(1, [{"titulo": "a"}])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"pagina": 2, "propiedades": [{"tit')
+
+    reloaded = RunJournal(path, BASE_URL, 40)
+
+    assert reloaded.get(1) == [{"titulo": "a"}]
+    assert reloaded.get(2) is None
+
+
+def test_checkpoint_from_another_run_is_discarded(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    RunJournal(path, BASE_URL, 40).record_page(1, [{"titulo": "a"}])
+
+    assert RunJournal(path, BASE_URL, 100).get(1) is None
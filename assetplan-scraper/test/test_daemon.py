@@ -0,0 +1,107 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from daemon import ScraperDaemon, WarmScraper
+
+
+class FakeDriver:
+    def __init__(self):
+        self.quit_called = False
+        self.service = None
+
+    def quit(self):
+        self.quit_called = True
+
+
+class OfflineScraper(WarmScraper):
+    """Parsea tarjetas fijas y las entrega por `on_page` sin usar la red ni Chrome."""
+
+    def __init__(self, snapshots, **kwargs):
+        super().__init__(**kwargs)
+        self.snapshots = snapshots
+
+    def scrape_http_first(self, base_url, target_properties=50, max_pages=10, workers=1, host_delay=1.0,
+                          journal=None, on_page=None):
+        on_page([self.parse_snapshot(snapshot) for snapshot in self.snapshots])
+        self.listing_exhausted = True
+        return []
+
+
+def make_snapshot(prop_id):
+    return {
+        "text": f"Edificio Torre {prop_id}\nAv. Siempre Viva {prop_id} , Santiago\nDesde $100.000 - $200.000",
+        "hrefs": [f"https://www.assetplan.cl/arriendo/departamento/santiago/edificio/torre/{prop_id}"],
+        "images": [],
+    }
+
+
+@pytest.fixture
+def api_server():
+    received = []
+
+    class ApiHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append(json.loads(gzip.decompress(body)))
+            self.reply(202, {"task_id": f"job-{len(received)}"})
+
+        def do_GET(self):
+            self.reply(200, {"status": "completed"})
+
+        def reply(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/load-deptos", received
+    server.shutdown()
+
+
+def test_warm_scraper_recycles_after_page_limit():
+    scraper = WarmScraper(recycle_after_pages=2)
+    driver = FakeDriver()
+    scraper.driver = driver
+
+    scraper.pages_on_driver = 1
+    assert scraper.maybe_recycle() is False
+    scraper.pages_on_driver = 2
+    assert scraper.maybe_recycle() is True
+
+    assert driver.quit_called and scraper.driver is None
+    assert scraper.pages_on_driver == 0 and scraper.recycles == 1
+
+
+def test_daemon_uploads_only_changes_between_runs(api_server, tmp_path):
+    api_url, received = api_server
+    scraper = OfflineScraper([make_snapshot(1), make_snapshot(2)])
+    daemon = ScraperDaemon(api_url=api_url, fingerprints_path=str(tmp_path / "huellas.json"), scraper=scraper)
+    port = daemon.start_status_server(port=0)
+    try:
+        first = daemon.run_once()
+        second = daemon.run_once()
+        status = httpx.get(f"http://127.0.0.1:{port}/status").json()
+    finally:
+        daemon.shutdown()
+
+    assert first["enviadas"] == 2
+    assert [p["id"] for p in received[0]["propiedades"]] == [1, 2]
+    # Las tarjetas no cambiaron: la segunda ejecución no envía propiedades
+    assert second["error"] is None
+    assert second["propiedades"] == 2 and second["enviadas"] == 0
+    assert len(received) == 1
+    assert status["ejecuciones"] == 2
+    assert status["estado"] == "esperando"
+    assert status["navegador"]["activo"] is False
@@ -0,0 +1,77 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from detail_crawler import crawl_details, parse_detail_html, parse_unit_line
+
+DETAIL_PAGE = """
+<html><body>
+<h1>Edificio Torre Sur</h1>
+<p>Departamentos desde $390.000</p>
+<table>
+  <tr><th>Unidad</th><th>Tipología</th><th>Superficie</th><th>Precio</th><th>Estado</th></tr>
+  <tr><td>Depto 1204</td><td>2D 2B</td><td>55,5 m²</td><td>$450.000</td><td>Disponible</td></tr>
+  <tr><td>Depto 305</td><td>Estudio 1B</td><td>28 m²</td><td>$390.000</td><td>Arrendado</td></tr>
+</table>
+<script>var precio = "$1 2D 10 m2";</script>
+</body></html>
+"""
+
+
+@pytest.fixture
+def detail_server():
+    requests = []
+
+    class DetailHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = DETAIL_PAGE.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DetailHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", requests
+    server.shutdown()
+
+
+def test_parse_detail_html_extracts_units():
+    units = parse_detail_html(DETAIL_PAGE)
+
+    assert units == [
+        {"numero": "1204", "piso": None, "dormitorios": 2, "banos": 2,
+         "superficie_m2": 55.5, "precio": "450000", "disponible": True},
+        {"numero": "305", "piso": None, "dormitorios": 0, "banos": 1,
+         "superficie_m2": 28.0, "precio": "390000", "disponible": False},
+    ]
+
+
+def test_parse_unit_line_ignores_lines_without_unit_data():
+    assert parse_unit_line("Departamentos desde $390.000") is None
+
+
+def test_crawl_details_uses_etag_cache(detail_server, tmp_path):
+    base_url, requests = detail_server
+    properties = [{"link": f"{base_url}/edificio/{i}"} for i in range(3)]
+
+    changed = crawl_details(properties, concurrency=2, min_interval=0, cache_dir=str(tmp_path))
+    assert len(changed) == 3
+    assert all(len(prop["unidades"]) == 2 for prop in properties)
+
+    # Segunda pasada: el servidor responde 304 y se reutiliza el caché
+    changed = crawl_details(properties, concurrency=2, min_interval=0, cache_dir=str(tmp_path))
+    assert changed == []
+    assert requests[3:] == ['"v1"'] * 3
+    assert all(len(prop["unidades"]) == 2 for prop in properties)
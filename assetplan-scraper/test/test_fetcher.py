@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from fingerprints import FingerprintStore
+from listing_parser import structure_property
+from main import Scraper
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+EMPTY_PAGE = "<html><body><main class='listing'></main></body></html>"
+CLIENT_RENDERED_PAGE = "<html><body><div id='app'></div><script src='/app.js'></script></body></html>"
+
+
+def make_handler(pages):
+    class StubHandler(BaseHTTPRequestHandler):
+        """Sirve páginas grabadas según el parámetro `page`."""
+
+        def do_GET(self):
+            page = int(parse_qs(urlparse(self.path).query).get("page", ["1"])[0])
+            body = pages(page).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(pages):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(pages))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/arriendo/departamento"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+class NoChromeScraper(Scraper):
+    """Registra las llamadas al respaldo con Selenium en lugar de abrir Chrome."""
+
+    def __init__(self):
+        super().__init__()
+        self.selenium_calls = 0
+
+    def scrape_multiple_pages(self, base_url, target_properties=50, max_pages=10, journal=None, page_delay=3, on_page=None):
+        self.selenium_calls += 1
+        self.properties = [{"titulo": "selenium"}]
+        return self.properties
+
+
+def test_http_first_uses_server_rendered_html(stub_server):
+    with open(os.path.join(FIXTURES_DIR, "listing_page.html"), encoding="utf-8") as f:
+        listing = f.read()
+    base_url = stub_server(lambda page: listing if page <= 2 else EMPTY_PAGE)
+
+    scraper = NoChromeScraper()
+    properties = scraper.scrape_http_first(base_url, target_properties=50, host_delay=0)
+
+    assert len(properties) == 6
+    assert scraper.selenium_calls == 0
+    assert scraper.driver is None
+    assert properties[0]["link"].startswith("http://127.0.0.1")
+    counters = scraper.metrics.report()["contadores"]
+    assert counters["paginas_descargadas"] == 3
+    assert counters["propiedades_parseadas"] == 6
+
+
+def test_http_listing_is_exhausted_only_on_a_short_last_page(stub_server):
+    with open(os.path.join(FIXTURES_DIR, "listing_page.html"), encoding="utf-8") as f:
+        listing = f.read()
+    cards = listing.split("</article>")
+    short_page = cards[0] + "</article>" + cards[-1]
+
+    scraper = NoChromeScraper()
+    scraper.scrape_http_first(
+        stub_server(lambda page: listing if page <= 2 else EMPTY_PAGE), target_properties=50, host_delay=0
+    )
+    assert scraper.listing_exhausted is False
+
+    scraper = NoChromeScraper()
+    properties = scraper.scrape_http_first(
+        stub_server(lambda page: listing if page <= 2 else short_page), target_properties=50, host_delay=0
+    )
+    assert len(properties) == 7
+    assert scraper.listing_exhausted is True
+
+
+def test_http_listing_respects_host_delay(stub_server):
+    with open(os.path.join(FIXTURES_DIR, "listing_page.html"), encoding="utf-8") as f:
+        listing = f.read()
+    requested_at = []
+
+    def pages(page):
+        requested_at.append(time.monotonic())
+        return listing if page <= 3 else EMPTY_PAGE
+
+    scraper = NoChromeScraper()
+    scraper.scrape_http_first(stub_server(pages), target_properties=9, workers=3, host_delay=0.2)
+
+    assert len(requested_at) == 3
+    gaps = [later - earlier for earlier, later in zip(requested_at, requested_at[1:])]
+    assert min(gaps) >= 0.15
+
+
+def test_http_first_falls_back_to_selenium_without_cards(stub_server):
+    base_url = stub_server(lambda page: CLIENT_RENDERED_PAGE)
+
+    scraper = NoChromeScraper()
+    properties = scraper.scrape_http_first(base_url, target_properties=50, host_delay=0)
+
+    assert scraper.selenium_calls == 1
+    assert properties == [{"titulo": "selenium"}]
+
+
+def test_properties_cut_off_by_the_target_are_sent_in_the_next_run(stub_server, tmp_path):
+    with open(os.path.join(FIXTURES_DIR, "listing_page.html"), encoding="utf-8") as f:
+        listing = f.read()
+    base_url = stub_server(lambda page: listing if page == 1 else EMPTY_PAGE)
+    path = str(tmp_path / "huellas.json")
+
+    def run(target):
+        store = FingerprintStore(path)
+        scraper = NoChromeScraper()
+        scraper.fingerprints = store
+        properties = scraper.scrape_http_first(base_url, target_properties=target, host_delay=0)
+        delta = store.build_delta([structure_property(prop, 39, i) for i, prop in enumerate(properties)])
+        store.save([prop["id"] for prop in delta["propiedades"]])
+        return delta
+
+    first = run(2)
+    second = run(3)
+
+    assert len(first["propiedades"]) == 2
+    assert len(second["propiedades"]) == 1
+    assert second["propiedades"][0]["id"] not in [prop["id"] for prop in first["propiedades"]]
+    assert second["resumen"]["sin_cambios"] == 2
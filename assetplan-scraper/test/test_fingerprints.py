@@ -0,0 +1,127 @@
+import json
+
+from fingerprints import FingerprintStore, fingerprint_snapshot, snapshot_property_id
+from listing_parser import parse_property_snapshot, structure_property
+
+
+def make_snapshot(prop_id, price):
+    return {
+        "text": f"Edificio Torre {prop_id}\nAv. Siempre Viva {prop_id} , Santiago\nDesde ${price} - $400.000",
+        "hrefs": [f"https://www.assetplan.cl/arriendo/departamento/santiago/edificio/torre/{prop_id}"],
+        "images": [],
+    }
+
+
+def observe(store, snapshot):
+    prop_id = snapshot_property_id(snapshot)
+    digest = fingerprint_snapshot(snapshot)
+    cached = store.lookup(prop_id, digest)
+    if cached is None:
+        store.record(prop_id, digest, parse_property_snapshot(snapshot))
+    return {"id": prop_id}
+
+
+def test_delta_contains_only_new_changed_and_removed(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+
+    first = FingerprintStore(path)
+    for snapshot in (make_snapshot(1, "100.000"), make_snapshot(2, "200.000"), make_snapshot(3, "300.000")):
+        observe(first, snapshot)
+    first.save([1, 2, 3])
+
+    second = FingerprintStore(path)
+    propiedades = [
+        observe(second, make_snapshot(1, "100.000")),  # sin cambios
+        observe(second, make_snapshot(2, "250.000")),  # precio modificado
+        observe(second, make_snapshot(4, "400.000")),  # nueva
+    ]
+    delta = second.build_delta(propiedades, complete=True)
+
+    assert [p["id"] for p in delta["propiedades"]] == [2, 4]
+    assert delta["eliminadas"] == [3]
+    assert delta["resumen"] == {"nuevas": 1, "modificadas": 1, "sin_cambios": 1, "eliminadas": 1}
+
+
+def test_removed_are_not_reported_for_partial_runs(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    store = FingerprintStore(path)
+    for prop_id in (1, 2):
+        observe(store, make_snapshot(prop_id, "100.000"))
+    store.save([1, 2])
+
+    store = FingerprintStore(path)
+    propiedades = [observe(store, make_snapshot(1, "100.000"))]
+
+    assert store.build_delta(propiedades, complete=False)["eliminadas"] == []
+
+
+def test_entries_from_an_older_structure_are_resent_once(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    snapshot = make_snapshot(1, "100.000")
+    # Almacén escrito antes de que existiera la versión de estructura
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"1": {"hash": fingerprint_snapshot(snapshot), "propiedad": parse_property_snapshot(snapshot)}}, f)
+
+    store = FingerprintStore(path)
+    propiedades = [observe(store, snapshot)]
+    assert store.build_delta(propiedades)["resumen"]["modificadas"] == 1
+    store.save([1])
+
+    store = FingerprintStore(path)
+    propiedades = [observe(store, snapshot)]
+    assert store.build_delta(propiedades)["propiedades"] == []
+
+
+def test_changed_units_reach_the_delta(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    snapshot = make_snapshot(1, "100.000")
+    store = FingerprintStore(path)
+    observe(store, snapshot)
+    store.save([1])
+
+    store = FingerprintStore(path)
+    prop = store.lookup(1, fingerprint_snapshot(snapshot))
+    prop["unidades"] = [{"numero": "101", "disponible": True}]
+    store.mark_changed(1, prop)
+    delta = store.build_delta([structure_property(prop, 39)])
+
+    assert delta["resumen"]["modificadas"] == 1
+    assert delta["propiedades"][0]["unidades"] == [{"numero": "101", "disponible": True}]
+
+
+def test_resent_properties_carry_the_typology_fields(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    snapshot = {
+        "text": "Edificio Torre 1\nAv. Siempre Viva 1 , Santiago\nDesde $100.000 - $400.000\n2 Dormitorios | 3 Disponibles",
+        "hrefs": ["https://www.assetplan.cl/arriendo/departamento/santiago/edificio/torre/1"],
+        "images": [],
+    }
+    # Entrada enviada con la estructura 1, anterior a los campos de tipología
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"1": {"hash": fingerprint_snapshot(snapshot), "version": 1,
+                         "propiedad": parse_property_snapshot(snapshot)}}, f)
+
+    store = FingerprintStore(path)
+    prop = store.lookup(1, fingerprint_snapshot(snapshot))
+    delta = store.build_delta([structure_property(prop, 39)])
+
+    assert len(delta["propiedades"]) == 1
+    sent = delta["propiedades"][0]
+    assert sent["tipologias"][0]["dormitorios"] == 2
+    assert sent["dormitorios"] == {"min": 2, "max": 2}
+    assert sent["unidades_disponibles"] == 3
+
+
+def test_only_delivered_fingerprints_are_saved(tmp_path):
+    path = str(tmp_path / "fingerprints.json")
+    store = FingerprintStore(path)
+    propiedades = [observe(store, make_snapshot(prop_id, "100.000")) for prop_id in (1, 2, 3)]
+    # Solo 1 y 2 llegaron a la API (p. ej. 3 quedó fuera del objetivo de propiedades)
+    store.save([p["id"] for p in propiedades[:2]])
+
+    store = FingerprintStore(path)
+    propiedades = [observe(store, make_snapshot(prop_id, "100.000")) for prop_id in (1, 2, 3)]
+    delta = store.build_delta(propiedades)
+
+    assert [p["id"] for p in delta["propiedades"]] == [3]
+    assert delta["resumen"] == {"nuevas": 1, "modificadas": 0, "sin_cambios": 2, "eliminadas": 0}
@@ -0,0 +1,102 @@
+import json
+import os
+
+from listing_parser import (
+    extract_card_snapshots,
+    parse_listing_file,
+    parse_listing_files,
+    parse_typologies,
+    structure_property,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+LISTING_PAGE = os.path.join(FIXTURES_DIR, "listing_page.html")
+BASE_URL = "https://www.assetplan.cl/arriendo/departamento?page=1"
+DATASET = os.path.join(os.path.dirname(FIXTURES_DIR), "..", "propiedades_assetplan.json")
+
+
+def test_parser_matches_scraped_dataset():
+    """El parser offline produce los mismos campos que el scraper con Selenium."""
+    with open(DATASET, encoding="utf-8") as f:
+        expected = json.load(f)["propiedades"][:3]
+
+    properties = parse_listing_file(LISTING_PAGE, BASE_URL)
+
+    assert len(properties) == len(expected)
+    for prop, exp in zip(properties, expected):
+        info = exp["informacion_basica"]
+        assert prop["titulo"] == info["titulo"]
+        assert prop["direccion"] == info["direccion_completa"]
+        assert prop["link"] == info["link_propiedad"]
+        assert prop["servicios"] == exp["servicios_disponibles"]
+        assert prop["caracteristicas"] == exp["caracteristicas"]
+        assert prop["imagenes"] == exp["imagenes"][:2]
+
+
+def test_snapshots_skip_scripts_and_keep_inline_text_on_one_line():
+    html = """
+    <article class="building-card">
+      <script>var ignored = "Edificio Falso";</script>
+      <p>Desde <strong>$100.000</strong> - <strong>$200.000</strong></p>
+      <a href="/arriendo/departamento/santiago/edificio/x/1">Edificio X</a>
+    </article>
+    """
+
+    snapshots = extract_card_snapshots(html, "https://www.assetplan.cl/")
+
+    assert len(snapshots) == 1
+    assert snapshots[0]["text"].split("\n") == ["Desde $100.000 - $200.000", "Edificio X"]
+    assert snapshots[0]["hrefs"] == ["https://www.assetplan.cl/arriendo/departamento/santiago/edificio/x/1"]
+
+
+def test_process_pool_keeps_file_order():
+    paths = [LISTING_PAGE] * 4
+    results = parse_listing_files(paths, workers=2, base_url=BASE_URL)
+
+    assert len(results) == 4
+    assert all(result == results[0] for result in results)
+
+
+def test_typologies_become_numeric_records():
+    tipologias, dormitorios, disponibles = parse_typologies([
+        "Estudio | +10 Disponibles",
+        "2 Dormitorios | 3 Disponibles",
+        "+4 Dormitorios | Notificar disponibilidad",
+        "Gastos comunes incluidos",
+    ])
+
+    assert tipologias[0] == {
+        "tipologia": "Estudio", "dormitorios": 0, "dormitorios_es_minimo": False,
+        "banos": None, "disponibles": 10, "disponibles_es_minimo": True,
+    }
+    assert (tipologias[1]["dormitorios"], tipologias[1]["disponibles"]) == (2, 3)
+    assert tipologias[2]["dormitorios_es_minimo"] and tipologias[2]["disponibles"] == 0
+    assert len(tipologias) == 3
+    assert dormitorios == {"min": 0, "max": 4}
+    assert disponibles == 13
+
+
+def test_structure_property_includes_typologies():
+    prop = {
+        "titulo": "Torre", "direccion": "Calle 1 , Santiago", "precio": "Desde $100.000 - $200.000",
+        "link": "https://www.assetplan.cl/arriendo/departamento/santiago/edificio/torre/7",
+        "servicios": [], "caracteristicas": ["1 Dormitorio 1 Baño | 2 Disponibles"],
+    }
+
+    structured = structure_property(prop, 39)
+
+    assert structured["tipologias"][0]["banos"] == 1
+    assert structured["dormitorios"] == {"min": 1, "max": 1}
+    assert structured["unidades_disponibles"] == 2
+
+
+def test_structure_property_omits_units_without_a_detail_crawl():
+    prop = {
+        "titulo": "Torre", "direccion": "Calle 1 , Santiago", "precio": "Desde $100.000 - $200.000",
+        "link": "https://www.assetplan.cl/arriendo/departamento/santiago/edificio/torre/7",
+        "servicios": [], "caracteristicas": [],
+    }
+
+    # Sin la clave la API conserva las unidades guardadas en lugar de vaciarlas
+    assert "unidades" not in structure_property(prop, 39)
+    assert structure_property({**prop, "unidades": []}, 39)["unidades"] == []
@@ -0,0 +1,46 @@
+import json
+
+from metrics import RunMetrics, summarize_latencies
+
+
+class FakeDriver:
+    def execute(self, driver_command, params=None):
+        return {"value": driver_command}
+
+    def get(self, url):
+        return self.execute("get", {"url": url})
+
+
+def test_instrumented_driver_counts_commands():
+    metrics = RunMetrics()
+    driver = metrics.instrument_driver(FakeDriver())
+
+    driver.get("https://example.com")
+    driver.get("https://example.com/2")
+    driver.execute("executeScript", {"script": "return 1"})
+
+    calls = metrics.report()["llamadas_webdriver"]
+    assert calls == {"total": 3, "por_comando": {"get": 2, "executeScript": 1}}
+
+
+def test_report_contains_phases_and_card_latency(tmp_path):
+    metrics = RunMetrics()
+    with metrics.phase("parseo"):
+        pass
+    metrics.add_phase("parseo", 0.5)
+    for seconds in (0.001, 0.002, 0.003):
+        metrics.record_card(seconds)
+
+    path = tmp_path / "reporte.json"
+    metrics.write_report(str(path), propiedades=3)
+    report = json.loads(path.read_text(encoding="utf-8"))
+
+    assert report["fases"]["parseo"]["veces"] == 2
+    assert report["fases"]["parseo"]["total_s"] >= 0.5
+    assert report["tarjetas"]["cantidad"] == 3
+    assert report["tarjetas"]["p50_ms"] == 2.0
+    assert report["propiedades"] == 3
+
+
+def test_summarize_latencies_without_samples():
+    assert summarize_latencies([]) == {"cantidad": 0}
@@ -0,0 +1,73 @@
+import random
+import time
+
+from main import Scraper
+
+
+class FakeDriver:
+    def quit(self):
+        pass
+
+
+class FakeScraper(Scraper):
+    """Scraper sin Chrome: cada página devuelve propiedades sintéticas con latencia aleatoria."""
+
+    def __init__(self, properties_per_page=10, last_page=None, last_page_size=None):
+        self.properties_per_page = properties_per_page
+        self.last_page = last_page
+        self.last_page_size = last_page_size
+        self.visited = []
+        super().__init__()
+
+    def create_driver(self):
+        return FakeDriver()
+
+    def scrape_page(self, url, driver=None):
+        page = int(url.split("page=")[-1])
+        self.visited.append(page)
+        time.sleep(random.uniform(0, 0.02))
+        if self.last_page is not None and page > self.last_page:
+            return []
+        size = self.last_page_size if page == self.last_page and self.last_page_size else self.properties_per_page
+        return [{"titulo": f"p{page}-{i}"} for i in range(size)]
+
+
+def test_parallel_results_are_merged_in_page_order():
+    scraper = FakeScraper(properties_per_page=10)
+    properties = scraper.scrape_multiple_pages_parallel(
+        "https://example.test/arriendo", target_properties=35, workers=3, host_delay=0
+    )
+
+    assert len(properties) == 35
+    assert [p["titulo"] for p in properties] == [f"p{page}-{i}" for page in range(1, 5) for i in range(10)][:35]
+
+
+def test_parallel_stops_when_listing_is_exhausted():
+    scraper = FakeScraper(properties_per_page=10, last_page=2)
+    properties = scraper.scrape_multiple_pages_parallel(
+        "https://example.test/arriendo", target_properties=100, workers=2, max_pages=10, host_delay=0
+    )
+
+    assert len(properties) == 20
+    assert max(scraper.visited) < 10
+    # La página vacía puede ser un timeout: no confirma el final del listado
+    assert scraper.listing_exhausted is False
+
+
+def test_short_page_confirms_end_of_listing():
+    for scrape in ("scrape_multiple_pages", "scrape_multiple_pages_parallel"):
+        scraper = FakeScraper(properties_per_page=10, last_page=3, last_page_size=4)
+        kwargs = {"host_delay": 0, "workers": 2} if scrape.endswith("parallel") else {"page_delay": 0}
+        properties = getattr(scraper, scrape)("https://example.test/arriendo", target_properties=100, **kwargs)
+
+        assert len(properties) == 24
+        assert scraper.listing_exhausted is True
+
+
+def test_empty_page_leaves_sequential_run_incomplete():
+    scraper = FakeScraper(properties_per_page=10, last_page=2)
+    properties = scraper.scrape_multiple_pages("https://example.test/arriendo", target_properties=100, page_delay=0)
+
+    assert len(properties) == 20
+    assert scraper.visited == [1, 2, 3]
+    assert scraper.listing_exhausted is False
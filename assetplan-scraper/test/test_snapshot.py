@@ -0,0 +1,45 @@
+import json
+import os
+
+from snapshot import decode_properties, dump_snapshot, encode_properties, load_snapshot, save_snapshot
+
+DATASET = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "propiedades_assetplan.json")
+
+
+def load_dataset():
+    with open(DATASET, encoding="utf-8") as f:
+        return json.load(f)["propiedades"]
+
+
+def test_snapshot_round_trip_is_lossless_and_smaller(tmp_path):
+    propiedades = load_dataset()
+
+    path = save_snapshot(propiedades, directory=str(tmp_path))
+
+    assert load_snapshot(path) == propiedades
+    assert os.path.getsize(path) < os.path.getsize(DATASET) / 3
+
+
+def test_repeated_strings_are_dictionary_encoded():
+    propiedades = [
+        {"id": 1, "informacion_basica": {"comuna": "Santiago"}, "servicios_disponibles": ["Sin aval"]},
+        {"id": 2, "informacion_basica": {"comuna": "Santiago"}, "servicios_disponibles": ["Sin aval", "Descuento"]},
+    ]
+
+    document = encode_properties(propiedades)
+
+    assert document["diccionario"] == ["Santiago", "Sin aval", "Descuento"]
+    assert document["columnas"]["informacion_basica.comuna"] == {"tipo": "dict", "valores": [0, 0]}
+    assert document["columnas"]["servicios_disponibles"]["valores"] == [[1], [1, 2]]
+    assert document["columnas"]["id"]["tipo"] == "crudo"
+    assert decode_properties(document) == propiedades
+
+
+def test_rows_with_missing_nested_fields():
+    propiedades = [{"id": 1, "precio": {"precio_desde_uf": 10}}, {"id": 2, "precio": None}]
+
+    decoded = decode_properties(encode_properties(propiedades))
+
+    assert decoded[0] == {"id": 1, "precio": {"precio_desde_uf": 10}}
+    assert decoded[1]["precio"] == {"precio_desde_uf": None}
+    assert dump_snapshot(propiedades)[:2] == b"\x1f\x8b"
@@ -0,0 +1,107 @@
+import gzip
+import json
+
+import httpx
+
+from metrics import RunMetrics
+from uploader import ChunkedUploader, NDJSONWriter, StreamingOutput, wait_for_job
+
+
+def make_property(prop_id):
+    return {
+        "titulo": f"Edificio {prop_id}",
+        "direccion": f"Calle {prop_id} , Santiago",
+        "precio": "Desde $100.000 - $200.000",
+        "link": f"https://www.assetplan.cl/arriendo/departamento/santiago/edificio/{prop_id}",
+        "servicios": [],
+        "caracteristicas": [],
+        "imagenes": [],
+    }
+
+
+def recording_client(responses, job_statuses=()):
+    """
+    Cliente httpx que registra los bloques recibidos y responde en orden. Cada bloque
+    aceptado abre un trabajo de ingesta cuyo estado se consulta con GET.
+    """
+    received = []
+    statuses = iter(responses)
+    job_states = iter(job_statuses)
+
+    def handler(request):
+        if request.method == "GET":
+            return httpx.Response(200, json={"status": next(job_states, "completed")})
+        assert request.headers["Content-Encoding"] == "gzip"
+        received.append(json.loads(gzip.decompress(request.content)))
+        status = next(statuses, 202)
+        return httpx.Response(status, json={"task_id": f"job-{len(received)}"} if status == 202 else None)
+
+    return httpx.Client(transport=httpx.MockTransport(handler)), received
+
+
+def test_streaming_output_writes_ndjson_and_uploads_chunks(tmp_path):
+    client, received = recording_client([])
+    uploader = ChunkedUploader("http://api/load-deptos", chunk_size=2, client=client, poll_interval=0)
+    output = StreamingOutput(39, NDJSONWriter(str(tmp_path / "out.ndjson")), uploader)
+
+    output([make_property(1), make_property(2)])
+    output([make_property(3)])
+    output.close(eliminadas=[99])
+
+    with open(tmp_path / "out.ndjson", encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f]
+    assert [p["id"] for p in lines] == [1, 2, 3]
+    assert [[p["id"] for p in chunk["propiedades"]] for chunk in received] == [[1, 2], [3]]
+    assert received[-1]["eliminadas"] == [99]
+    assert uploader.chunks_sent == 2 and uploader.failed_chunks == 0
+
+
+def test_uploader_retries_transient_errors():
+    client, received = recording_client([503, 202])
+    metrics = RunMetrics()
+    uploader = ChunkedUploader("http://api/load-deptos", chunk_size=10, backoff=0, client=client, poll_interval=0,
+                               metrics=metrics)
+
+    uploader.add({"id": 1})
+    uploader.close()
+
+    assert len(received) == 2
+    assert uploader.chunks_sent == 1 and uploader.failed_chunks == 0
+    assert metrics.report()["contadores"]["reintentos_subida"] == 1
+
+
+def test_uploader_counts_chunks_whose_ingestion_job_fails():
+    client, received = recording_client([], job_statuses=["running", "completed", "failed"])
+    metrics = RunMetrics()
+    uploader = ChunkedUploader("http://api/load-deptos", chunk_size=1, client=client, poll_interval=0, metrics=metrics)
+
+    uploader.add({"id": 1})
+    uploader.add({"id": 2})
+    uploader.close()
+
+    assert len(received) == 2
+    assert uploader.chunks_sent == 2 and uploader.failed_chunks == 1
+    assert metrics.report()["contadores"] == {"bloques_enviados": 2, "trabajos_ingesta_fallidos": 1}
+
+
+def test_wait_for_job_polls_until_the_job_finishes():
+    requested = []
+
+    def handler(request):
+        requested.append(request.url.path)
+        return httpx.Response(200, json={"status": "pending" if len(requested) < 3 else "completed"})
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+
+    assert wait_for_job(client, "http://api/load-deptos", "abc", interval=0)
+    assert requested == ["/load-deptos/abc"] * 3
+
+
+def test_wait_for_job_gives_up_on_unknown_job_or_timeout():
+    client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(404)))
+    assert not wait_for_job(client, "http://api/load-deptos", "abc", interval=0)
+
+    client = httpx.Client(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, json={"status": "running"})
+    ))
+    assert not wait_for_job(client, "http://api/load-deptos", "abc", timeout=0, interval=0)
@@ -0,0 +1,224 @@
+"""
+Salida en streaming del scraper: escritura NDJSON y subida por bloques a la API.
+
+En lugar de construir todo el documento `{"propiedades": [...]}` en memoria, cada
+propiedad se escribe como una línea JSON apenas se scrapea y se envía a
+`/load-deptos` en bloques de N propiedades comprimidos con gzip, reutilizando un
+único `httpx.Client` y reintentando ante errores transitorios. La API responde 202
+y procesa cada bloque en un trabajo de ingesta: un bloque solo cuenta como entregado
+cuando su trabajo termina en `completed`.
+"""
+import gzip
+import json
+import time
+
+import httpx
+
+from fingerprints import UNCHANGED
+from listing_parser import structure_property
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Estados finales de los trabajos de ingesta de la API (`GET /load-deptos/{task_id}`)
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+
+def wait_for_job(client, url, task_id, timeout=600, interval=2.0):
+    """
+    Consulta el estado de un trabajo de ingesta hasta que termine.
+
+    Args:
+        client: `httpx.Client` con el que se envió el trabajo
+        url: URL de `/load-deptos` a la que se envió
+        task_id: ID del trabajo devuelto por la API
+        timeout: Segundos máximos de espera
+        interval: Segundos entre consultas
+
+    Returns:
+        bool: True si el trabajo quedó `completed`; False si falló, desapareció o no terminó a tiempo
+    """
+    status_url = f"{url.rstrip('/')}/{task_id}"
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            response = client.get(status_url)
+            if response.is_success:
+                job = response.json()
+                if job.get("status") == JOB_COMPLETED:
+                    return True
+                if job.get("status") == JOB_FAILED:
+                    print(f"El trabajo de ingesta {task_id} falló: {job.get('error_message')}")
+                    return False
+            elif response.status_code not in RETRY_STATUS_CODES:
+                print(f"No se pudo consultar el trabajo de ingesta {task_id}: {response.status_code}")
+                return False
+        except httpx.TransportError as e:
+            print(f"Error consultando el trabajo de ingesta {task_id}: {e}")
+
+        if time.monotonic() >= deadline:
+            print(f"El trabajo de ingesta {task_id} no terminó en {timeout}s")
+            return False
+        time.sleep(interval)
+
+
+class NDJSONWriter:
+    """Escribe una propiedad por línea (JSON Lines) a medida que llegan."""
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, obj):
+        self._file.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        self.count += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ChunkedUploader:
+    """
+    Acumula propiedades y las envía a la API en bloques de `chunk_size` como JSON
+    comprimido con gzip (`Content-Encoding: gzip`).
+
+    Los bloques aceptados quedan pendientes hasta que `close` confirma que su trabajo
+    de ingesta terminó; los que fallan ahí también cuentan en `failed_chunks`.
+    """
+
+    def __init__(self, url, chunk_size=100, max_retries=3, backoff=1.0, timeout=30, client=None, metrics=None,
+                 job_timeout=600, poll_interval=2.0):
+        self.url = url
+        self.metrics = metrics
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.client = client or httpx.Client(follow_redirects=True, timeout=timeout)
+        self.job_timeout = job_timeout
+        self.poll_interval = poll_interval
+        self._buffer = []
+        self._pending_jobs = []
+        self.chunks_sent = 0
+        self.properties_sent = 0
+        self.bytes_sent = 0
+        self.failed_chunks = 0
+
+    def add(self, prop):
+        """Agrega una propiedad al bloque actual y lo envía si está completo."""
+        self._buffer.append(prop)
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self, eliminadas=None):
+        """Envía el bloque pendiente (y, opcionalmente, los IDs eliminados)."""
+        if not self._buffer and not eliminadas:
+            return
+        payload = {"propiedades": self._buffer}
+        if eliminadas:
+            payload["eliminadas"] = list(eliminadas)
+        self._buffer = []
+
+        started = time.perf_counter()
+        task_id = self._post(payload)
+        if self.metrics is not None:
+            self.metrics.add_phase("subida", time.perf_counter() - started)
+        if task_id:
+            self._pending_jobs.append(task_id)
+            self.chunks_sent += 1
+            self.properties_sent += len(payload["propiedades"])
+            self._count("bloques_enviados")
+        else:
+            self.failed_chunks += 1
+            self._count("bloques_fallidos")
+
+    def _count(self, name, amount=1):
+        if self.metrics is not None:
+            self.metrics.increment(name, amount)
+
+    def _post(self, payload):
+        body = gzip.compress(json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.post(self.url, content=body, headers=headers)
+                if response.status_code == 202:
+                    task_id = response.json().get("task_id")
+                    self.bytes_sent += len(body)
+                    print(f"Bloque de {len(payload['propiedades'])} propiedades enviado "
+                          f"({len(body)} bytes gzip, trabajo de ingesta {task_id})")
+                    return task_id
+                if response.status_code not in RETRY_STATUS_CODES:
+                    print(f"Error al enviar bloque: {response.status_code}")
+                    return False
+                error = f"HTTP {response.status_code}"
+            except httpx.TransportError as e:
+                error = str(e)
+
+            if attempt < self.max_retries:
+                self._count("reintentos_subida")
+                delay = self.backoff * (2 ** attempt)
+                print(f"Reintentando envío del bloque en {delay:.1f}s ({error})")
+                time.sleep(delay)
+
+        print(f"No se pudo enviar el bloque después de {self.max_retries + 1} intentos")
+        return None
+
+    def wait_for_jobs(self):
+        """Espera los trabajos de ingesta pendientes y cuenta como fallidos los que no terminan."""
+        pending, self._pending_jobs = self._pending_jobs, []
+        for task_id in pending:
+            if not wait_for_job(self.client, self.url, task_id, timeout=self.job_timeout,
+                                interval=self.poll_interval):
+                self.failed_chunks += 1
+                self._count("trabajos_ingesta_fallidos")
+
+    def close(self):
+        """Envía el último bloque, espera sus trabajos de ingesta y cierra el cliente HTTP."""
+        self.flush()
+        self.wait_for_jobs()
+        self.client.close()
+
+
+class StreamingOutput:
+    """
+    Destino de las páginas scrapeadas en modo streaming: estructura cada propiedad,
+    la escribe en NDJSON y la encola para subirla. Con un almacén de huellas solo
+    se suben las propiedades nuevas o modificadas; `uploaded_ids` guarda sus IDs
+    para confirmar solo esas huellas.
+    """
+
+    def __init__(self, uf_value, writer=None, uploader=None, fingerprints=None):
+        self.uf_value = uf_value
+        self.writer = writer
+        self.uploader = uploader
+        self.fingerprints = fingerprints
+        self.count = 0
+        self.uploaded_ids = []
+
+    def __call__(self, page_properties):
+        for prop in page_properties:
+            structured = structure_property(prop, self.uf_value, self.count)
+            self.count += 1
+            if self.writer:
+                self.writer.write(structured)
+            if self.uploader and (
+                self.fingerprints is None or self.fingerprints.status(structured["id"]) != UNCHANGED
+            ):
+                self.uploader.add(structured)
+                self.uploaded_ids.append(structured["id"])
+        if self.writer:
+            self.writer.flush()
+
+    def close(self, eliminadas=None):
+        """Cierra la salida; los IDs eliminados viajan en el último bloque."""
+        if self.writer:
+            self.writer.close()
+        if self.uploader:
+            self.uploader.flush(eliminadas=eliminadas)
+            self.uploader.close()
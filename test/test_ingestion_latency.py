@@ -0,0 +1,128 @@
+import statistics
+import sys
+import time
+import uuid
+
+import requests
+
+# URLs de los servicios basadas en la configuración de docker-compose
+LOAD_API_URL = "http://localhost:8010/load-deptos/"
+USER_API_URL = "http://localhost:8010/user"
+
+# Propiedades sintéticas con IDs altos para no chocar con las reales; se eliminan al final
+SYNTHETIC_PROPERTIES = 2000
+SYNTHETIC_ID_BASE = 9_000_000
+MAX_LATENCY_S = 1.0  # Latencia máxima aceptable de los endpoints de usuario durante la ingesta
+MIN_SAMPLES = 10  # Mediciones mínimas durante la ingesta para que el resultado sea válido
+JOB_TIMEOUT_S = 600
+
+
+def make_property(i):
+    prop_id = SYNTHETIC_ID_BASE + i
+    return {
+        "id": prop_id,
+        "informacion_basica": {
+            "titulo": f"Prueba Latencia {i}",
+            "direccion_completa": f"Calle Sintética {i}, Santiago",
+            "comuna": "Santiago",
+            "link_propiedad": f"https://example.com/edificio/{prop_id}",
+        },
+        "precio": {
+            "precio_desde": str(300000 + i),
+            "precio_hasta": str(500000 + i),
+            "moneda": "CLP",
+            "precio_desde_uf": 8,
+            "precio_hasta_uf": 13,
+        },
+        "servicios_disponibles": [],
+        "caracteristicas": ["1 Dormitorio | 2 Disponibles"],
+        "imagenes": [],
+        "servicios_especiales": {},
+    }
+
+
+def wait_for_job(task_id):
+    """Consulta el estado del trabajo hasta que termine."""
+    deadline = time.time() + JOB_TIMEOUT_S
+    while time.time() < deadline:
+        job = requests.get(f"{LOAD_API_URL}{task_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.5)
+    raise TimeoutError(f"El trabajo {task_id} no terminó en {JOB_TIMEOUT_S}s")
+
+
+def timed(method, url, **kwargs):
+    started = time.perf_counter()
+    response = requests.request(method, url, **kwargs)
+    response.raise_for_status()
+    return time.perf_counter() - started, response
+
+
+def run_ingestion_latency_test():
+    """
+    Lanza una ingesta grande y, mientras corre, mide la latencia de crear usuarios y
+    sesiones. Con la ingesta fuera del event loop, estas peticiones no deben esperar a
+    MongoDB ni a ChromaDB.
+    """
+    username = f"latency_{str(uuid.uuid4())[:8]}"
+    _, user_response = timed("POST", USER_API_URL, data={"email": f"{username}@example.com", "username": username})
+    user_id = user_response.json()["user_id"]
+
+    print(f"Enviando {SYNTHETIC_PROPERTIES} propiedades sintéticas a {LOAD_API_URL}...")
+    load_response = requests.post(LOAD_API_URL, json={
+        "propiedades": [make_property(i) for i in range(SYNTHETIC_PROPERTIES)]
+    })
+    load_response.raise_for_status()
+    task_id = load_response.json()["task_id"]
+    print(f"Trabajo de ingesta encolado: {task_id}")
+
+    latencies = []
+    while True:
+        job = requests.get(f"{LOAD_API_URL}{task_id}").json()
+        if job["status"] in ("completed", "failed"):
+            break
+        elapsed, _ = timed("POST", USER_API_URL, data={"email": f"{username}@example.com", "username": username})
+        latencies.append(elapsed)
+        elapsed, _ = timed("POST", f"{USER_API_URL}/{user_id}/sessions")
+        latencies.append(elapsed)
+        time.sleep(0.1)
+
+    print(f"Ingesta terminada con estado '{job['status']}': {job.get('progress')}")
+
+    print("Eliminando las propiedades sintéticas...")
+    cleanup = requests.post(LOAD_API_URL, json={
+        "propiedades": [],
+        "eliminadas": [SYNTHETIC_ID_BASE + i for i in range(SYNTHETIC_PROPERTIES)],
+    })
+    cleanup.raise_for_status()
+    wait_for_job(cleanup.json()["task_id"])
+
+    if job["status"] != "completed":
+        print(f"Error: la ingesta falló: {job.get('error_message')}")
+        return False
+    if len(latencies) < MIN_SAMPLES:
+        print(f"Error: la ingesta terminó con solo {len(latencies)} mediciones de latencia "
+              f"(mínimo {MIN_SAMPLES}); aumenta SYNTHETIC_PROPERTIES.")
+        return False
+
+    ordered = sorted(latencies)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    print(f"\n--- Latencia de /user durante la ingesta ({len(latencies)} peticiones) ---")
+    print(f"p50: {statistics.median(latencies) * 1000:.0f} ms, p95: {p95 * 1000:.0f} ms, "
+          f"máx: {ordered[-1] * 1000:.0f} ms")
+
+    if ordered[-1] > MAX_LATENCY_S:
+        print(f"Error: una petición tardó más de {MAX_LATENCY_S}s durante la ingesta.")
+        return False
+    print("Los endpoints de usuario mantuvieron baja latencia durante la ingesta.")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        ok = run_ingestion_latency_test()
+    except requests.exceptions.RequestException as e:
+        print(f"\nError en la petición HTTP: {e}")
+        ok = False
+    sys.exit(0 if ok else 1)